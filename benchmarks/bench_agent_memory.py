@@ -0,0 +1,65 @@
+"""
+Bytes per idle agent (adapter, config and in-memory history) and the cost of a
+get_history call, for many agents created from the same settings.
+
+No requests are sent; agents point at an unused local URL.
+
+    python -m benchmarks.bench_agent_memory --agents 10000 100000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.config.roles import MessageRole
+from core.memory import InMemoryAdapter
+
+SYSTEM_PROMPT = "You are a developer. Given a task, write clean and functional Python code."
+LLM_KWARGS = {"api_key": "mock", "base_url": "http://127.0.0.1:9/v1/chat/completions", "temperature": 0.2}
+
+
+async def create_agent(index: int, turns: int) -> DeepSeekAdapter:
+    # Prompts built at runtime (e.g. read from config) are distinct string objects per agent
+    prompt = "".join([SYSTEM_PROMPT])
+    adapter = await DeepSeekAdapter.create(name=f"Agent-{index}", system_message=prompt,
+                                           memory=InMemoryAdapter(), **LLM_KWARGS)
+    for turn in range(turns):
+        await adapter.memory.add_message(MessageRole.USER, f"Task {index}.{turn}")
+        await adapter.memory.add_message(MessageRole.ASSISTANT, "print('done')")
+    return adapter
+
+
+async def measure(count: int, turns: int):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    agents = [await create_agent(index, turns) for index in range(count)]
+    create_elapsed = time.perf_counter() - start
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for agent in agents:
+        await agent.memory.get_history()
+    history_elapsed = time.perf_counter() - start
+    return used / count, create_elapsed / count, history_elapsed / count
+
+
+async def run(args):
+    # Warm up module-level state (rate limiter registry, tokenizer, pooled settings)
+    await create_agent(-1, args.turns)
+    print(f"{'agents':>8}{'bytes/agent':>14}{'create µs':>12}{'get_history µs':>16}")
+    for count in args.agents:
+        per_agent, create_time, history_time = await measure(count, args.turns)
+        print(f"{count:>8}{per_agent:>14.0f}{create_time * 1e6:>12.1f}{history_time * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--turns", type=int, default=1, help="User/assistant exchanges held by each agent.")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""
+Per-task agent setup cost: creating an agent for every task (as test2.py does) vs
+checking one out of a warm AgentPool.
+
+"Setup" includes building the provider client, which a fresh agent otherwise pays on
+its first request. No requests are sent.
+
+    python -m benchmarks.bench_agent_setup --tasks 2000
+"""
+import argparse
+import asyncio
+import time
+
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.open_ai_adapter import OpenAIAdapter
+from core.agents.agent_pool import AgentPool, AgentTemplate
+from core.agents.sk_agent import SKAgent
+
+DEV_PROMPT = "You are a developer. Given a task, write clean and functional Python code."
+
+TEMPLATES = [
+    AgentTemplate("Developer", DEV_PROMPT, DeepSeekAdapter,
+                  {"api_key": "mock", "base_url": "http://127.0.0.1:9/v1/chat/completions"}),
+    AgentTemplate("Developer", DEV_PROMPT, OpenAIAdapter,
+                  {"api_key": "mock", "base_url": "http://127.0.0.1:9/v1"}),
+]
+
+
+async def per_task_create(template: AgentTemplate, tasks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(tasks):
+        agent = await SKAgent.create(template.name, template.system_prompt, template.adapter_class,
+                                     **template.llm_kwargs)
+        await agent.adapter.warm_up()
+    return (time.perf_counter() - start) / tasks
+
+
+async def pooled(template: AgentTemplate, tasks: int) -> float:
+    pool = await AgentPool(template, size=4).start()
+    start = time.perf_counter()
+    for _ in range(tasks):
+        agent = await pool.checkout()
+        await agent.adapter.memory.get_history()
+        await pool.checkin(agent)
+    return (time.perf_counter() - start) / tasks
+
+
+async def run(args):
+    print(f"{'adapter':<18}{'create/task µs':>16}{'pool/task µs':>14}{'speedup':>10}")
+    for template in TEMPLATES:
+        created = await per_task_create(template, args.tasks)
+        pool = await pooled(template, args.tasks)
+        print(f"{template.adapter_class.__name__:<18}{created * 1e6:>16.1f}{pool * 1e6:>14.1f}{created / pool:>9.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
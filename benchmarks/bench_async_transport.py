@@ -0,0 +1,58 @@
+"""
+Requests/sec of DeepSeekAdapter and OpenAIAdapter against the local mock server
+as the number of concurrent in-flight requests on one event loop grows.
+
+    python -m benchmarks.bench_async_transport --latency 0.2 --requests 256
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.open_ai_adapter import OpenAIAdapter
+from core.adapters.http_client import close_async_clients
+
+MESSAGES = [{"role": "user", "content": "Write a function that returns the sum of two numbers."}]
+
+
+async def measure(adapter, total_requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await adapter.model_request(MESSAGES)
+
+    start = time.perf_counter()
+    replies = await asyncio.gather(*(one() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for reply in replies if reply.startswith("Error:"))
+    if errors:
+        print(f"  {errors} request(s) failed")
+    return total_requests / elapsed
+
+
+async def run(args):
+    server = MockLLMServer(latency=args.latency).start_in_thread()
+    try:
+        adapters = [
+            await DeepSeekAdapter.create(name="DeepSeekBench", system_message="bench", api_key="mock", base_url=server.chat_url),
+            await OpenAIAdapter.create(name="OpenAIBench", system_message="bench", api_key="mock", base_url=server.base_url, model="gpt-4o-mini"),
+        ]
+        print(f"mock latency={args.latency}s, requests per level={args.requests}")
+        print(f"{'adapter':<18}{'concurrency':>12}{'req/s':>10}")
+        for adapter in adapters:
+            for concurrency in args.concurrency:
+                rps = await measure(adapter, args.requests, concurrency)
+                print(f"{type(adapter).__name__:<18}{concurrency:>12}{rps:>10.1f}")
+        await close_async_clients()
+    finally:
+        server.stop_thread()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""
+Prompt tokens per turn over a long refine loop: full history vs CompactingMemoryAdapter.
+
+The summarizer is a local stand-in with a fixed delay, so the numbers show the
+memory layer's behaviour without any network.
+
+    python -m benchmarks.bench_compaction --turns 500
+"""
+import argparse
+import asyncio
+import time
+
+from core.config.roles import MessageRole
+from core.memory import CompactingMemoryAdapter, InMemoryAdapter
+from core.memory.token_counter import count_message_tokens
+
+REPLY = "def handler(event):\n    return {'status': 200, 'body': event}\n" * 8
+
+
+class LocalSummarizer:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def model_request(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "The user is iterating on an event handler; keep returning status 200 with the event body."
+
+
+async def run_turns(memory, turns: int, report_every: int, turn_delay: float):
+    tokens_per_turn = []
+    start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        await memory.add_message(MessageRole.USER, f"Refinement {turn}: tighten error handling.")
+        history = await memory.get_history(limit=10 ** 6)
+        tokens_per_turn.append(sum(count_message_tokens(message["content"]) for message in history))
+        await memory.add_message(MessageRole.ASSISTANT, REPLY)
+        # Stand-in for the main model's latency, during which compaction runs
+        await asyncio.sleep(turn_delay)
+        if turn % report_every == 0:
+            print(f"  turn {turn:>5}: {tokens_per_turn[-1]:>7} prompt tokens")
+    elapsed = time.perf_counter() - start
+    return sum(tokens_per_turn), elapsed
+
+
+async def run(args):
+    print("full history")
+    full = InMemoryAdapter(max_history=10 ** 6)
+    await full.add_message(MessageRole.SYSTEM, "You are a developer.")
+    total, elapsed = await run_turns(full, args.turns, args.report_every, args.turn_delay)
+    print(f"  total prompt tokens {total}, wall time {elapsed * 1000:.1f} ms")
+
+    print("compacting")
+    summarizer = LocalSummarizer(args.summary_delay)
+    compacting = CompactingMemoryAdapter(summarizer, compact_at=args.compact_at, keep_recent_tokens=args.compact_at // 3,
+                                         max_tokens=args.compact_at * 2)
+    await compacting.add_message(MessageRole.SYSTEM, "You are a developer.")
+    total, elapsed = await run_turns(compacting, args.turns, args.report_every, args.turn_delay)
+    await compacting.wait_for_compaction()
+    print(f"  total prompt tokens {total}, wall time {elapsed * 1000:.1f} ms, "
+          f"{compacting.compactions} compactions, {summarizer.calls} summarizer calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--compact-at", type=int, default=3000)
+    parser.add_argument("--summary-delay", type=float, default=0.01)
+    parser.add_argument("--turn-delay", type=float, default=0.005)
+    parser.add_argument("--report-every", type=int, default=100)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,83 @@
+"""
+Cold-start import time of main.py-style entry points, each timed inside fresh
+interpreters (median of --runs), with the heavy provider modules each one ends up loading.
+
+Pass --compare-ref to also measure another commit, exported to a temporary directory,
+e.g. the commit before lazy adapter imports:
+
+    python -m benchmarks.bench_import_time --compare-ref HEAD~1
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+
+# Entry point -> source to time; None for the repository's own scripts, whose top-level
+# imports are read from each measured tree so the entry point loads exactly what the script does
+ENTRY_POINTS = {
+    "core.adapters": "import core.adapters",
+    "main.py": None,
+    "local model": "from core.adapters import DeepSeekAdapter\n"
+                   "from core.memory.in_memory_adapter import InMemoryAdapter",
+    "test2.py": None,
+}
+
+
+def script_imports(path: str) -> str:
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+HEAVY_MODULES = ("openai", "httpx", "requests", "tiktoken")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+exec(compile({source!r}, "<entry>", "exec"))
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def measure(source: str, cwd: str, runs: int):
+    timings, loaded = [], ""
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", PROBE.format(source=source, heavy=HEAVY_MODULES)],
+                                   cwd=cwd, capture_output=True, text=True)
+        if completed.returncode != 0:
+            return None, completed.stderr.strip().splitlines()[-1]
+        elapsed, _, loaded = completed.stdout.strip().partition(" ")
+        timings.append(float(elapsed))
+    return statistics.median(timings), loaded or "-"
+
+
+def export_tree(ref: str, directory: str) -> str:
+    archive = subprocess.run(["git", "archive", ref], capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return directory
+
+
+def run(args):
+    trees = {"working tree": os.getcwd()}
+    with tempfile.TemporaryDirectory() as directory:
+        if args.compare_ref:
+            trees = {args.compare_ref: export_tree(args.compare_ref, directory), **trees}
+        print(f"{'entry point':<16}{'tree':<16}{'import ms':>10}  loaded")
+        for label, source in ENTRY_POINTS.items():
+            for tree, path in trees.items():
+                elapsed, loaded = measure(source or script_imports(os.path.join(path, label)), path, args.runs)
+                shown = f"{elapsed * 1000:>10.1f}" if elapsed is not None else f"{'error':>10}"
+                print(f"{label:<16}{tree:<16}{shown}  {loaded}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per entry point.")
+    parser.add_argument("--compare-ref", default=None, help="Git revision to measure as well, e.g. HEAD~1.")
+    run(parser.parse_args())
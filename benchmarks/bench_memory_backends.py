@@ -0,0 +1,59 @@
+"""
+Append and get_history throughput of InMemoryAdapter vs PersistentMemoryAdapter
+(SQLiteMessageStore) across many concurrent conversations.
+
+    python -m benchmarks.bench_memory_backends --conversations 10000 --turns 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from core.config.roles import MessageRole
+from core.memory import InMemoryAdapter, PersistentMemoryAdapter, SQLiteMessageStore
+
+
+async def measure(memories, turns: int, flush=None):
+    async def append_turns(memory):
+        for turn in range(turns):
+            role = MessageRole.USER if turn % 2 == 0 else MessageRole.ASSISTANT
+            await memory.add_message(role, f"turn {turn}: " + "x" * 200)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(append_turns(memory) for memory in memories))
+    if flush:
+        await flush()
+    append_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    histories = await asyncio.gather(*(memory.get_history(limit=10) for memory in memories))
+    read_elapsed = time.perf_counter() - start
+    assert all(len(history) == min(turns, 10) for history in histories)
+
+    appends = len(memories) * turns
+    return appends / append_elapsed, len(memories) / read_elapsed
+
+
+async def run(args):
+    print(f"{args.conversations} conversations x {args.turns} turns")
+    print(f"{'backend':<12}{'appends/s':>14}{'get_history/s':>16}")
+
+    memories = [InMemoryAdapter() for _ in range(args.conversations)]
+    appends, reads = await measure(memories, args.turns)
+    print(f"{'in-memory':<12}{appends:>14.0f}{reads:>16.0f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteMessageStore(os.path.join(directory, "memory.db"), batch_size=args.batch_size)
+        memories = [PersistentMemoryAdapter(store, f"conversation-{i}") for i in range(args.conversations)]
+        appends, reads = await measure(memories, args.turns, flush=store.flush)
+        print(f"{'sqlite':<12}{appends:>14.0f}{reads:>16.0f}")
+        await store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    asyncio.run(run(parser.parse_args()))
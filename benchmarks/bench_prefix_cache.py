@@ -0,0 +1,64 @@
+"""
+Time to first token over a long conversation with a local model that has a prefix
+(KV) cache, simulated by the mock server: plain sliding-window history vs RequestShaper
+(pinned system prompt, block trimming, keep_alive/cache_prompt hints).
+
+    python -m benchmarks.bench_prefix_cache --turns 40 --prefill-tokens-per-second 1500
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.http_client import close_async_clients
+from core.adapters.request_shaper import RequestShaper
+from core.memory import InMemoryAdapter
+from core.orchestrator import BatchStats
+
+DEV_PROMPT = "You are a developer. Given a task, write clean and functional Python code. " * 8
+REPLY = "def handler(event):\n    return {'status': 200, 'body': event}\n" * 6
+REQUEST = "Refinement {turn}: tighten the error handling and keep the public interface unchanged. " * 4
+
+
+async def conversation(server: MockLLMServer, turns: int, shaper: RequestShaper = None) -> BatchStats:
+    memory = InMemoryAdapter(max_history=shaper.history_limit) if shaper else InMemoryAdapter()
+    kwargs = {"shaper": shaper} if shaper else {}
+    adapter = await DeepSeekAdapter.create(name="Developer", system_message=DEV_PROMPT, memory=memory,
+                                           api_key="mock", base_url=server.chat_url, **kwargs)
+    stats = BatchStats()
+    for turn in range(turns):
+        start = time.perf_counter()
+        first_token = None
+        async for _ in adapter.stream_response(REQUEST.format(turn=turn)):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        stats.latencies.append(first_token)
+    return stats
+
+
+async def run(args):
+    print(f"{'history':<12}{'mean TTFT ms':>14}{'p50 ms':>10}{'p95 ms':>10}{'cached prompt %':>17}{'hinted':>8}")
+    for label, shaper in (("sliding", None), ("shaped", RequestShaper(max_messages=args.max_messages,
+                                                                        block_size=args.block_size))):
+        server = MockLLMServer(latency=args.latency, reply=REPLY,
+                               prefill_tokens_per_second=args.prefill_tokens_per_second).start_in_thread()
+        try:
+            stats = await conversation(server, args.turns, shaper)
+            await close_async_clients()
+        finally:
+            server.stop_thread()
+        mean = sum(stats.latencies) / len(stats.latencies)
+        cached = 100 * server.cached_prompt_tokens / max(1, server.prompt_tokens)
+        print(f"{label:<12}{mean * 1000:>14.1f}{stats.percentile(50) * 1000:>10.1f}"
+              f"{stats.percentile(95) * 1000:>10.1f}{cached:>17.1f}{server.hinted_requests:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=1500)
+    parser.add_argument("--max-messages", type=int, default=10)
+    parser.add_argument("--block-size", type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
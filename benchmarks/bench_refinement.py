@@ -0,0 +1,109 @@
+"""
+Tokens and latency per refinement turn on a large generated program: plain follow-ups
+(the model rewrites the whole program, which memory then keeps and resends) vs a
+CodeRefiner (the current code is sent once, the model replies with edit blocks that
+are applied locally, and memory keeps a short reference).
+
+The mock model changes one function per turn; generation and prompt processing are
+paced so latency follows the token counts.
+
+    python -m benchmarks.bench_refinement --functions 60 --turns 6
+"""
+import argparse
+import asyncio
+import re
+import time
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.http_client import close_async_clients
+from core.code_builder import CodeRefiner, extract_code
+from core.memory import InMemoryAdapter
+
+DEV_PROMPT = "You are a developer. Given a task, write clean and functional Python code."
+TASK = "Create a Python module with helper functions for the billing service."
+REFINEMENT = "Refinement {turn}: make function_{index} round its result to two decimals."
+
+
+def program(functions: int) -> str:
+    return "\n\n".join(
+        f"def function_{index}(value: float) -> float:\n"
+        f"    \"\"\"Return the adjusted amount for rule {index}.\"\"\"\n"
+        f"    factor = 1 + {index} / 100\n"
+        f"    return value * factor"
+        for index in range(functions)
+    ) + "\n"
+
+
+class ModelReplies:
+    def __init__(self, functions: int):
+        self.functions = functions
+
+    def __call__(self, payload: dict) -> str:
+        messages = payload["messages"]
+        request = messages[-1]["content"]
+        match = re.search(r"function_(\d+) round", request)
+        if match is None:
+            return f"```python\n{program(self.functions)}```"
+        index = match.group(1)
+        old = f"    factor = 1 + {index} / 100\n    return value * factor"
+        new = f"    factor = 1 + {index} / 100\n    return round(value * factor, 2)"
+        if "SEARCH" in request:
+            return f"```python\n<<<<<<< SEARCH\n{old}\n=======\n{new}\n>>>>>>> REPLACE\n```"
+        # Full rewrite of the latest code the model can see
+        code = program(self.functions)
+        for message in messages:
+            if "```" in message["content"] and "def function_0" in message["content"]:
+                code = extract_code(message["content"])[0] + "\n"
+        return f"```python\n{code.replace(old, new)}```"
+
+
+async def session(server: MockLLMServer, args, refiner=None) -> dict:
+    kwargs = {"refiner": refiner} if refiner else {}
+    adapter = await DeepSeekAdapter.create(name="Developer", system_message=DEV_PROMPT, memory=InMemoryAdapter(),
+                                           api_key="mock", base_url=server.chat_url, **kwargs)
+    reply = await adapter.generate_response(TASK)
+    latencies, prompt_tokens, completion_tokens = [], [], []
+    for turn in range(args.turns):
+        before = (server.prompt_tokens, server.completion_tokens)
+        start = time.perf_counter()
+        reply = await adapter.generate_response(REFINEMENT.format(turn=turn, index=turn * 7 % args.functions))
+        latencies.append(time.perf_counter() - start)
+        prompt_tokens.append(server.prompt_tokens - before[0])
+        completion_tokens.append(server.completion_tokens - before[1])
+    history = await adapter.memory.get_history(limit=10 ** 6)
+    return {
+        "latency": sum(latencies) / args.turns,
+        "prompt_tokens": sum(prompt_tokens) / args.turns,
+        "completion_tokens": sum(completion_tokens) / args.turns,
+        "memory_chars": sum(len(message["content"]) for message in history),
+        "rounded": extract_code(reply)[0].count("round("),
+    }
+
+
+async def run(args):
+    print(f"{'mode':<10}{'latency/turn s':>16}{'prompt tok/turn':>17}{'output tok/turn':>17}"
+          f"{'memory chars':>14}{'edits kept':>12}")
+    for label, refiner in (("rewrite", None), ("refiner", CodeRefiner())):
+        server = MockLLMServer(latency=args.latency, reply=ModelReplies(args.functions),
+                               tokens_per_second=args.tokens_per_second,
+                               prefill_tokens_per_second=args.prefill_tokens_per_second).start_in_thread()
+        try:
+            result = await session(server, args, refiner)
+            await close_async_clients()
+        finally:
+            server.stop_thread()
+        print(f"{label:<10}{result['latency']:>16.3f}{result['prompt_tokens']:>17.0f}"
+              f"{result['completion_tokens']:>17.0f}{result['memory_chars']:>14}{result['rounded']:>12}")
+        if refiner:
+            print(f"refiner stats: {refiner.stats.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=60, help="Functions in the generated program (4 lines each).")
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=2000)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=20000)
+    asyncio.run(run(parser.parse_args()))
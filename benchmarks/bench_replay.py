@@ -0,0 +1,90 @@
+"""
+Checkpointed orchestration runs against the mock LLM server:
+
+  record  run tasks with a run log (every routing decision and agent reply is appended)
+  resume  interrupt each run partway (as a crash or timeout would), then resume it with
+          the same run id; only the steps that hadn't completed call the model again
+  replay  walk every recorded run again from the log alone; the server is still up, so
+          any step the log can't serve would show up as a model request
+
+    python -m benchmarks.bench_replay --tasks 20 --latency 0.2 --backend sqlite
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.suite import TASKS, Suite, role_aware_reply
+from core.adapters.http_client import close_async_clients
+from core.orchestrator import JsonlRunLog, SQLiteRunLog
+
+
+def open_log(args, directory: str, name: str):
+    if args.backend == "sqlite":
+        return SQLiteRunLog(os.path.join(directory, f"{name}.db"))
+    return JsonlRunLog(os.path.join(directory, f"{name}.jsonl"))
+
+
+async def run_all(orchestrator, args, timeout: float = None) -> dict:
+    async def task(index: int):
+        forked = await orchestrator.fork()
+        run = forked.route_task(TASKS[index % len(TASKS)], run_id=f"task-{index}")
+        try:
+            return await (asyncio.wait_for(run, timeout) if timeout else run), forked.last_run.stats
+        except asyncio.TimeoutError:
+            return None, None
+
+    start = time.perf_counter()
+    results, stats = zip(*await asyncio.gather(*(task(index) for index in range(args.tasks))))
+    return {"elapsed": time.perf_counter() - start, "results": list(results), "stats": stats}
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        server = MockLLMServer(latency=args.latency, reply=role_aware_reply).start_in_thread()
+        suite = Suite(server, argparse.Namespace(retry_backoff=0.0))
+        try:
+            orchestrator = await suite.create_orchestrator()
+            orchestrator.run_log = open_log(args, directory, "recorded")
+            before = server.requests_served
+            recorded = await run_all(orchestrator, args)
+            record_requests = server.requests_served - before
+
+            orchestrator.run_log = open_log(args, directory, "resumed")
+            before = server.requests_served
+            # Cut every run off during its last model call (developer, verifier, executor), then resume it
+            await run_all(orchestrator, args, timeout=args.latency * 2.5)
+            # Let the server finish the requests abandoned by the cut, so they aren't counted below
+            await asyncio.sleep(args.latency * 2)
+            interrupted_requests = server.requests_served - before
+            before = server.requests_served
+            resumed = await run_all(orchestrator, args)
+            resume_requests = server.requests_served - before
+
+            orchestrator.run_log = open_log(args, directory, "recorded")
+            orchestrator.replay = True
+            before = server.requests_served
+            replayed = await run_all(orchestrator, args)
+            replay_requests = server.requests_served - before
+            await close_async_clients()
+        finally:
+            server.stop_thread()
+
+    print(f"{'phase':<10}{'elapsed s':>11}{'model requests':>16}{'same results':>14}")
+    print(f"{'record':<10}{recorded['elapsed']:>11.3f}{record_requests:>16}{'-':>14}")
+    print(f"{'resume':<10}{resumed['elapsed']:>11.3f}{resume_requests:>16}"
+          f"{str(resumed['results'] == recorded['results']):>14}   ({interrupted_requests} served in the interrupted attempt)")
+    replayed_steps = sum(stats.replayed_steps for stats in replayed["stats"])
+    same = all(stats.same_result for stats in replayed["stats"]) and replayed["results"] == recorded["results"]
+    print(f"{'replay':<10}{replayed['elapsed']:>11.3f}{replay_requests:>16}{str(same):>14}"
+          f"   ({replayed_steps} steps replayed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--backend", choices=("jsonl", "sqlite"), default="jsonl")
+    asyncio.run(run(parser.parse_args()))
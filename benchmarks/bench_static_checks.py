@@ -0,0 +1,87 @@
+"""
+Verifier calls and task time with and without the static pre-verification stage, when
+some developer replies are broken (an error string instead of code, a syntax error, or
+a forbidden call). With the checker, broken drafts go back to the developer with the
+checker's feedback instead of to the verifier LLM.
+
+    python -m benchmarks.bench_static_checks --tasks 40 --broken-rate 0.3 --latency 0.2
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.suite import CODE_REPLY, DEV_PROMPT, TASKS, VERIFIER_PROMPT, Suite, role_aware_reply
+from core.adapters.http_client import close_async_clients
+from core.executor import StaticChecker
+
+BROKEN_REPLIES = [
+    "Error: Request timed out.",
+    "```python\ndef add(a, b)\n    return a + b\n```",
+    "```python\ndef add(a, b):\n    return eval(f'{a} + {b}')\n```",
+]
+
+
+class Replies:
+    def __init__(self, broken_rate: float, seed: int):
+        self.broken_rate = broken_rate
+        self.random = random.Random(seed)
+        self.verifier_calls = 0
+
+    def __call__(self, payload: dict) -> str:
+        messages = payload.get("messages") or [{}]
+        system = messages[0].get("content")
+        if system == VERIFIER_PROMPT:
+            self.verifier_calls += 1
+            # Reviews with extra text around the verdict must still count as approvals
+            return "**APPROVED** - looks good." if "```" in messages[-1]["content"] else "REJECTED: no code."
+        if system == DEV_PROMPT:
+            if messages[-1]["content"].startswith("Your code did not pass"):
+                return CODE_REPLY
+            if self.random.random() < self.broken_rate:
+                return self.random.choice(BROKEN_REPLIES)
+        return role_aware_reply(payload)
+
+
+async def run_tasks(server: MockLLMServer, args, static_checker) -> dict:
+    suite = Suite(server, argparse.Namespace(retry_backoff=0.0))
+    orchestrator = await suite.create_orchestrator()
+    orchestrator.static_checker = static_checker
+
+    async def task(index: int) -> str:
+        forked = await orchestrator.fork()
+        return await forked.route_task(TASKS[index % len(TASKS)])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(task(index) for index in range(args.tasks)))
+    return {
+        "elapsed": time.perf_counter() - start,
+        "approved": sum(result.startswith("Code executed") for result in results),
+        "stats": orchestrator.verification_stats,
+    }
+
+
+async def run(args):
+    print(f"{'static checks':<15}{'approved':>10}{'verifier calls':>16}{'saved calls':>13}"
+          f"{'saved s (est.)':>16}{'elapsed s':>11}")
+    for label, checker in (("off", None), ("on", StaticChecker())):
+        replies = Replies(args.broken_rate, args.seed)
+        server = MockLLMServer(latency=args.latency, reply=replies).start_in_thread()
+        try:
+            result = await run_tasks(server, args, checker)
+            await close_async_clients()
+        finally:
+            server.stop_thread()
+        stats = result["stats"]
+        print(f"{label:<15}{result['approved']:>6}/{args.tasks:<3}{replies.verifier_calls:>16}"
+              f"{stats.llm_calls_saved:>13}{stats.seconds_saved:>16.2f}{result['elapsed']:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--broken-rate", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,60 @@
+"""
+Compares two result files written by `benchmarks.suite` and flags regressions.
+
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+
+Exits with status 1 when any metric got worse by more than --threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is better; every other numeric metric is "lower is better"
+HIGHER_IS_BETTER = ("throughput_per_s", "completed")
+# Workload parameters and counters that describe the run rather than measure it
+IGNORED = ("concurrency", "turns", "flows", "tasks", "agents", "failed")
+
+
+def compare(base: dict, head: dict, threshold: float):
+    """
+    Yields (workload, metric, base value, head value, relative change, regressed) for
+    every numeric metric present in both reports.
+    """
+    for workload, base_metrics in base["results"].items():
+        head_metrics = head["results"].get(workload, {})
+        for metric, base_value in base_metrics.items():
+            head_value = head_metrics.get(metric)
+            if metric in IGNORED or not isinstance(base_value, (int, float)) or head_value is None:
+                continue
+            change = (head_value - base_value) / base_value if base_value else 0.0
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            yield workload, metric, base_value, head_value, change, worse > threshold
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression.")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base['commit']} ({base['timestamp']})  ->  head {head['commit']} ({head['timestamp']})")
+    if base.get("settings") != head.get("settings"):
+        print("warning: the runs used different settings")
+    print(f"{'workload':<16}{'metric':<28}{'base':>14}{'head':>14}{'change':>10}")
+    regressions = 0
+    for workload, metric, base_value, head_value, change, regressed in compare(base, head, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{workload:<16}{metric:<28}{base_value:>14}{head_value:>14}{change:>+10.1%}{flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Local mock of an OpenAI/DeepSeek-compatible chat completions endpoint.
+
+Speaks just enough HTTP/1.1 (keep-alive, Content-Length bodies) for httpx and
+the OpenAI SDK. Every POST is answered as a chat completion after `latency` seconds
+plus the time to "generate" the reply at `tokens_per_second`; requests with
+`"stream": true` get server-sent event chunks paced at the same rate instead.
+GET /v1/models answers like the OpenAI model list, and `error_rate` injects
+failures (with a Retry-After header) for exercising retries and failover.
+With `prefill_tokens_per_second`, prompt processing time is simulated behind a
+prefix cache, so prompts that keep their leading messages answer sooner.
+
+    python -m benchmarks.mock_llm_server --port 8765 --latency 0.2 --tokens-per-second 50
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Set, Union
+
+from core.memory.token_counter import count_message_tokens
+
+# Reply text, or a callable building it from the request payload
+Reply = Union[str, Callable[[dict], str]]
+
+
+class MockLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.1, reply: Reply = "print('hello')",
+                 tokens_per_second: Optional[float] = None, error_rate: float = 0.0, error_status: int = 503,
+                 retry_after: Optional[float] = None, seed: Optional[int] = None,
+                 prefill_tokens_per_second: Optional[float] = None, prefix_cache_entries: int = 4096):
+        """
+        :param host: Interface to bind.
+        :param port: Port to bind; 0 picks a free port.
+        :param latency: Seconds to wait before answering each request (time to first token).
+        :param reply: Assistant content returned for every request, or a callable taking the
+            request payload and returning the content.
+        :param tokens_per_second: Generation rate of the reply; None answers at once after `latency`.
+        :param error_rate: Fraction of chat requests answered with `error_status` instead.
+        :param error_status: HTTP status of injected failures, e.g. 429 or 503.
+        :param retry_after: Seconds sent in the Retry-After header of injected failures.
+        :param seed: Seed for the error injection, for reproducible runs.
+        :param prefill_tokens_per_second: Prompt processing rate. When set, prompt tokens add to
+            the time to first token, except for a leading run of messages already seen at the
+            start of an earlier prompt (a simulated prefix/KV cache, as in llama.cpp or Ollama).
+        :param prefix_cache_entries: Cached prompt prefixes kept, least recently used evicted first.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.reply = reply
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.prefix_cache_entries = prefix_cache_entries
+        self.hinted_requests = 0
+        self._prefix_cache: "OrderedDict[str, None]" = OrderedDict()
+        self._random = random.Random(seed)
+        self._connections: Set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            # Idle keep-alive connections would otherwise keep wait_closed() waiting
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> "MockLLMServer":
+        """
+        Runs the server on its own event loop in a daemon thread, so the
+        benchmark's client loop is not sharing CPU time with request handling.
+        """
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if method == "GET" and path.rstrip("/").endswith("/models"):
+                    await self._write_json(writer, 200, self.models())
+                    continue
+                payload = json.loads(body or b"{}")
+                if self.error_rate and self._random.random() < self.error_rate:
+                    await self._write_error(writer)
+                elif payload.get("stream"):
+                    await self._write_stream(writer, payload)
+                else:
+                    await self._write_json(writer, 200, await self.handle_request(payload))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    def models(self) -> dict:
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "created": 0, "owned_by": "mock"}]}
+
+    def reply_for(self, payload: dict) -> str:
+        return self.reply(payload) if callable(self.reply) else self.reply
+
+    def usage_for(self, payload: dict, content: str) -> dict:
+        """Token usage as a real server would report it (approximate when tiktoken is missing)."""
+        prompt_tokens = sum(count_message_tokens(message.get("content") or "") for message in payload.get("messages", []))
+        completion_tokens = count_message_tokens(content)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _prefill_time(self, payload: dict, usage: dict) -> float:
+        """
+        Seconds spent processing the uncached part of the prompt. Prefixes are cached per
+        whole message, like a server reusing the KV cache of an identical leading run.
+        """
+        if payload.get("keep_alive") is not None or payload.get("cache_prompt") is not None:
+            self.hinted_requests += 1
+        if not self.prefill_tokens_per_second:
+            return 0.0
+        digest = hashlib.sha256()
+        cached_tokens, uncached_tokens, hit = 0, 0, True
+        for message in payload.get("messages", []):
+            digest.update(json.dumps(message, sort_keys=True).encode())
+            key = digest.hexdigest()
+            tokens = count_message_tokens(message.get("content") or "")
+            if hit and key in self._prefix_cache:
+                self._prefix_cache.move_to_end(key)
+                cached_tokens += tokens
+                continue
+            hit = False
+            uncached_tokens += tokens
+            self._prefix_cache[key] = None
+            if len(self._prefix_cache) > self.prefix_cache_entries:
+                self._prefix_cache.popitem(last=False)
+        self.cached_prompt_tokens += cached_tokens
+        usage["prompt_tokens_details"] = {"cached_tokens": cached_tokens}
+        return uncached_tokens / self.prefill_tokens_per_second
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    async def handle_request(self, payload: dict) -> dict:
+        content = self.reply_for(payload)
+        usage = self.usage_for(payload, content)
+        prefill = self._prefill_time(payload, usage)
+        await asyncio.sleep(self.latency + prefill + self._generation_time(usage["completion_tokens"]))
+        self.requests_served += 1
+        return {
+            "id": f"chatcmpl-mock-{self.requests_served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    def _stream_chunk(self, payload: dict, delta: dict, finish_reason: str = None) -> dict:
+        return {
+            "id": f"chatcmpl-mock-{self.requests_served}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, payload: dict):
+        """
+        Answers with server-sent events, one chunk per whitespace-separated piece of the reply,
+        paced at `tokens_per_second`.
+        """
+        content = self.reply_for(payload)
+        usage = self.usage_for(payload, content)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+        )
+        await asyncio.sleep(self.latency + self._prefill_time(payload, usage))
+        self.requests_served += 1
+        pieces = [piece + " " for piece in content.split(" ")]
+        pieces[-1] = pieces[-1][:-1]
+        piece_delay = self._generation_time(usage["completion_tokens"]) / len(pieces)
+        events = [self._stream_chunk(payload, {"role": "assistant", "content": ""})]
+        events += [self._stream_chunk(payload, {"content": piece}) for piece in pieces]
+        final = self._stream_chunk(payload, {}, finish_reason="stop")
+        final["usage"] = usage
+        events.append(final)
+        for index, event in enumerate(events):
+            if piece_delay and 0 < index <= len(pieces):
+                await asyncio.sleep(piece_delay)
+            self._write_chunk(writer, f"data: {json.dumps(event)}\n\n".encode())
+            await writer.drain()
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes):
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    async def _write_error(self, writer: asyncio.StreamWriter):
+        await asyncio.sleep(self.latency)
+        self.errors_injected += 1
+        headers = {"Retry-After": f"{self.retry_after:g}"} if self.retry_after is not None else {}
+        body = {"error": {"message": "Injected failure", "type": "mock_error", "code": self.error_status}}
+        await self._write_json(writer, self.error_status, body, headers)
+
+    async def _write_json(self, writer: asyncio.StreamWriter, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        extra = "".join(f"{key}: {value}\r\n" for key, value in (headers or {}).items())
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"{extra}"
+            f"Connection: keep-alive\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+
+async def _serve_forever(args):
+    server = MockLLMServer(host=args.host, port=args.port, latency=args.latency,
+                           tokens_per_second=args.tokens_per_second, error_rate=args.error_rate,
+                           error_status=args.error_status,
+                           prefill_tokens_per_second=args.prefill_tokens_per_second)
+    await server.start()
+    print(f"Mock LLM server listening on {server.chat_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=None)
+    asyncio.run(_serve_forever(parser.parse_args()))
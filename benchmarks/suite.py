@@ -0,0 +1,322 @@
+"""
+End-to-end load test against the local mock LLM server.
+
+Workloads:
+  single_adapter  concurrent model_request calls through one DeepSeekAdapter
+  memory_growth   one agent holding a long multi-turn conversation
+  orchestrator    full Orchestrator.route_task flows (router, developer, verifier, executor)
+  batch           BatchRunner over forked orchestrators
+  agent_memory    traced bytes per freshly created agent
+
+Each workload reports throughput, p50/p95/p99 latency and event-loop lag (how late a
+5 ms ticker wakes up, i.e. time the loop spent blocked). Results are written as JSON
+named after the current commit, to be compared with `python -m benchmarks.compare`.
+
+    python -m benchmarks.suite --latency 0.05 --tokens-per-second 400
+    python -m benchmarks.suite --quick --error-rate 0.05
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.http_client import close_async_clients
+from core.agents.sk_agent import SKAgent
+from core.config.roles import MessageRole
+from core.memory.in_memory_adapter import InMemoryAdapter
+from core.memory.token_counter import count_message_tokens
+from core.orchestrator import BatchRunner, BatchStats, Orchestrator
+from core.orchestrator.routing import ROUTE_RESPONSE_FORMAT
+
+ROUTER_PROMPT = "You are a routing agent. Based on the input, decide whether it needs coding, verification, or execution."
+DEV_PROMPT = "You are a developer. Given a task, write clean and functional Python code."
+VERIFIER_PROMPT = "You are a code reviewer. Review the code and return 'APPROVED' or 'REJECTED' with reasons."
+EXECUTOR_PROMPT = "You are an executor. If the code is approved, save it and confirm."
+
+CODE_REPLY = (
+    "```python\n"
+    "def add(a: int, b: int) -> int:\n"
+    "    \"\"\"Return the sum of two numbers.\"\"\"\n"
+    "    return a + b\n"
+    "\n"
+    "\n"
+    "assert add(2, 3) == 5\n"
+    "```"
+)
+
+TASKS = [
+    "Write a function that returns the sum of two numbers.",
+    "Implement a function that reverses a string.",
+    "Write a script that counts words in a text file.",
+    "Refactor this function to use a list comprehension.",
+]
+
+
+def role_aware_reply(payload: dict) -> str:
+    """Answers like the agent the request came from, based on its system prompt."""
+    if payload.get("response_format") == ROUTE_RESPONSE_FORMAT:
+        return '{"route": "coding", "confidence": 0.9}'
+    messages = payload.get("messages") or [{}]
+    system = messages[0].get("content") or ""
+    if system == VERIFIER_PROMPT:
+        return "APPROVED"
+    if system == EXECUTOR_PROMPT:
+        return "Saved and executed."
+    if system == ROUTER_PROMPT:
+        return "coding"
+    return CODE_REPLY
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.005):
+        """
+        Measures event-loop blocking: a ticker sleeps `interval` seconds and records how
+        late it wakes up. Use as `async with LoopLagMonitor() as lag:`.
+        """
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _tick(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.create_task(self._tick())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> dict:
+        stats = BatchStats(latencies=self.lags)
+        return {
+            "loop_lag_p99_ms": round(1000 * stats.percentile(99), 3),
+            "loop_lag_max_ms": round(1000 * max(self.lags, default=0.0), 3),
+            "loop_blocked_ms": round(1000 * sum(self.lags), 3),
+        }
+
+
+def summarize(latencies: List[float], failed: int, elapsed: float, lag: LoopLagMonitor) -> dict:
+    stats = BatchStats(completed=len(latencies) - failed, failed=failed, elapsed=elapsed, latencies=latencies)
+    return {
+        "completed": stats.completed,
+        "failed": stats.failed,
+        "elapsed_s": round(stats.elapsed, 3),
+        "throughput_per_s": round(stats.throughput, 3),
+        **{f"p{p}_ms": round(1000 * stats.percentile(p), 3) for p in (50, 95, 99)},
+        **lag.summary(),
+    }
+
+
+class Suite:
+    def __init__(self, server: MockLLMServer, args: argparse.Namespace):
+        self.server = server
+        self.args = args
+
+    def adapter_kwargs(self) -> dict:
+        return {
+            "api_key": "mock",
+            "base_url": self.server.chat_url,
+            "retry_backoff": self.args.retry_backoff,
+        }
+
+    async def create_agent(self, name: str, prompt: str, memory=None) -> SKAgent:
+        return await SKAgent.create(name, prompt, DeepSeekAdapter, memory=memory, **self.adapter_kwargs())
+
+    async def create_orchestrator(self) -> Orchestrator:
+        router, developer, verifier, executor = await asyncio.gather(
+            self.create_agent("Router", ROUTER_PROMPT),
+            self.create_agent("Developer", DEV_PROMPT),
+            self.create_agent("Verifier", VERIFIER_PROMPT),
+            self.create_agent("Executor", EXECUTOR_PROMPT),
+        )
+        return Orchestrator(router, developer, verifier, executor)
+
+    async def single_adapter(self) -> dict:
+        agent = await self.create_agent("Bench", DEV_PROMPT)
+        messages = [
+            {"role": "system", "content": DEV_PROMPT},
+            {"role": "user", "content": TASKS[0]},
+        ]
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        latencies, failed = [], 0
+
+        async def one():
+            nonlocal failed
+            async with semaphore:
+                start = time.perf_counter()
+                reply = await agent.adapter.model_request(messages)
+                latencies.append(time.perf_counter() - start)
+                failed += reply.startswith("Error:")
+
+        async with LoopLagMonitor() as lag:
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(self.args.requests)))
+            elapsed = time.perf_counter() - start
+        return {"concurrency": self.args.concurrency, **summarize(latencies, failed, elapsed, lag)}
+
+    async def memory_growth(self) -> dict:
+        agent = await self.create_agent("Bench", DEV_PROMPT, memory=InMemoryAdapter(max_history=10 ** 6))
+        latencies, failed, prompt_tokens = [], 0, []
+        async with LoopLagMonitor() as lag:
+            start = time.perf_counter()
+            for turn in range(self.args.turns):
+                turn_start = time.perf_counter()
+                reply = await agent.run(f"Refinement {turn}: tighten the error handling.")
+                latencies.append(time.perf_counter() - turn_start)
+                failed += reply.startswith("Error:")
+                # What the next turn sends (get_history's default window)
+                history = await agent.adapter.memory.get_history()
+                prompt_tokens.append(sum(count_message_tokens(message["content"]) for message in history))
+            elapsed = time.perf_counter() - start
+
+        # Traced separately so tracemalloc's overhead doesn't skew the latencies above: the
+        # turns are replayed into fresh memories with their own copies of every string, enough
+        # of them that allocator free lists (which tracemalloc doesn't see) don't hide anything
+        turns = (await agent.adapter.memory.get_history(limit=10 ** 6))[1:]
+        copies = 50
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        replays = [InMemoryAdapter(max_history=10 ** 6) for _ in range(copies)]
+        for replay in replays:
+            for message in turns:
+                await replay.add_message(MessageRole(message["role"]), message["content"].encode().decode())
+        history_bytes = (tracemalloc.get_traced_memory()[0] - baseline) / copies
+        tracemalloc.stop()
+        del replays
+        return {
+            "turns": self.args.turns,
+            "first_turn_prompt_tokens": prompt_tokens[0],
+            "last_turn_prompt_tokens": prompt_tokens[-1],
+            "memory_bytes_per_turn": round(history_bytes / self.args.turns),
+            **summarize(latencies, failed, elapsed, lag),
+        }
+
+    async def orchestrator(self) -> dict:
+        orchestrator = await self.create_orchestrator()
+        latencies, failed = [], 0
+        async with LoopLagMonitor() as lag:
+            start = time.perf_counter()
+            for index in range(self.args.flows):
+                flow_start = time.perf_counter()
+                worker = await orchestrator.fork()
+                result = await worker.route_task(TASKS[index % len(TASKS)])
+                latencies.append(time.perf_counter() - flow_start)
+                failed += not result.startswith("Code executed")
+            elapsed = time.perf_counter() - start
+        return {"flows": self.args.flows, **summarize(latencies, failed, elapsed, lag)}
+
+    async def batch(self) -> dict:
+        runner = BatchRunner(await self.create_orchestrator(), concurrency=self.args.concurrency)
+        tasks = [TASKS[index % len(TASKS)] for index in range(self.args.batch_size)]
+        async with LoopLagMonitor() as lag:
+            results = await runner.run_all(tasks)
+        latencies = [result.latency for result in results]
+        failed = sum(1 for result in results if not result.ok or not result.output.startswith("Code executed"))
+        return {
+            "tasks": len(tasks),
+            "concurrency": self.args.concurrency,
+            **summarize(latencies, failed, runner.stats.elapsed, lag),
+        }
+
+    async def agent_memory(self) -> dict:
+        """Traced bytes held per idle agent (adapter, config and memory with its system prompt)."""
+        await self.create_agent("Warmup", DEV_PROMPT)
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        agents = [await self.create_agent(f"Agent-{index}", DEV_PROMPT) for index in range(self.args.agents)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        del agents
+        return {"agents": self.args.agents, "bytes_per_agent": round(used / self.args.agents)}
+
+    WORKLOADS = ("single_adapter", "memory_growth", "orchestrator", "batch", "agent_memory")
+
+    async def run(self, workloads) -> Dict[str, dict]:
+        results = {}
+        for name in workloads:
+            print(f"running {name}...", flush=True)
+            results[name] = await getattr(self, name)()
+            print("  " + ", ".join(f"{key}={value}" for key, value in results[name].items()))
+        return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args):
+    if args.quick:
+        args.requests, args.turns, args.flows, args.batch_size, args.agents = 64, 20, 10, 32, 200
+    server = MockLLMServer(latency=args.latency, reply=role_aware_reply, tokens_per_second=args.tokens_per_second,
+                           error_rate=args.error_rate, retry_after=0 if args.error_rate else None,
+                           seed=args.seed).start_in_thread()
+    try:
+        results = await Suite(server, args).run(args.workloads)
+        await close_async_clients()
+    finally:
+        server.stop_thread()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "log_level")},
+        "server": {
+            "requests_served": server.requests_served,
+            "errors_injected": server.errors_injected,
+            "prompt_tokens": server.prompt_tokens,
+            "completion_tokens": server.completion_tokens,
+        },
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{commit}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=Suite.WORKLOADS, default=list(Suite.WORKLOADS))
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock time to first token, seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Mock generation rate.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests failing with 503.")
+    parser.add_argument("--retry-backoff", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--flows", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--agents", type=int, default=2000)
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run.")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results"))
+    parser.add_argument("--log-level", default="ERROR", help="Retries under error injection log at WARNING.")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    asyncio.run(run(args))
@@ -1,3 +1,38 @@
-from core.adapters.llm_adapter import LLMAdapter
-from core.adapters.deep_seek_adapter import DeepSeekAdapter
-from core.adapters.open_ai_adapter import OpenAIAdapter
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> defining module. Modules are imported on first attribute access (PEP 562),
+# so `from core.adapters import DeepSeekAdapter` doesn't also load the openai SDK.
+_EXPORTS = {
+    "LLMAdapter": "core.adapters.llm_adapter",
+    "DeepSeekAdapter": "core.adapters.deep_seek_adapter",
+    "OpenAIAdapter": "core.adapters.open_ai_adapter",
+    "AdapterPool": "core.adapters.adapter_pool",
+    "RequestShaper": "core.adapters.request_shaper",
+    "adapter_for_model": "core.adapters.registry",
+    "create_adapter": "core.adapters.registry",
+    "register_adapter": "core.adapters.registry",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from core.adapters.llm_adapter import LLMAdapter
+    from core.adapters.deep_seek_adapter import DeepSeekAdapter
+    from core.adapters.open_ai_adapter import OpenAIAdapter
+    from core.adapters.adapter_pool import AdapterPool
+    from core.adapters.request_shaper import RequestShaper
+    from core.adapters.registry import adapter_for_model, create_adapter, register_adapter
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Type, TypeVar
+
+from core.adapters.llm_adapter import LLMAdapter
+from core.config.roles import MessageRole
+from core.errors.llm_error import LLMRequestError, NoHealthyBackendError
+from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.memory.in_memory_adapter import InMemoryAdapter
+from core import telemetry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound="AdapterPool")
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        """
+        Opens after `failure_threshold` consecutive failures. After `reset_timeout`
+        seconds one trial request at a time is let through (half-open); its outcome
+        closes or re-opens the breaker.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allows_request(self) -> bool:
+        """
+        Whether a request could be sent now. Has no side effects; `acquire` claims the
+        request when it is actually dispatched.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return not self.trial_in_flight
+
+    def acquire(self) -> bool:
+        """
+        Claims a request about to be sent to the backend. Unless the breaker is closed,
+        the request becomes the half-open trial; returns False if none is allowed.
+        """
+        if not self.allows_request():
+            return False
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = True
+        return True
+
+    def release(self):
+        """
+        Gives up a claimed request that ended without an outcome (e.g. it was cancelled),
+        letting another trial through.
+        """
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Backend:
+    def __init__(self, adapter: LLMAdapter, breaker: CircuitBreaker):
+        self.adapter = adapter
+        self.breaker = breaker
+        self.outstanding = 0
+        self.ewma_latency = 0.0
+        self.latencies: Deque[float] = deque(maxlen=200)
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return self.adapter.name
+
+    def record_latency(self, latency: float):
+        self.latencies.append(latency)
+        self.ewma_latency = latency if not self.ewma_latency else 0.8 * self.ewma_latency + 0.2 * latency
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Observed latency quantile, or None until there are enough samples."""
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class AdapterPool(LLMAdapter):
+    """
+    LLMAdapter that spreads requests over several backend adapters (e.g. multiple local
+    deepseek-coder endpoints plus OpenAI), with circuit breakers, health checks, failover
+    and optional request hedging. Failures raise LLMRequestError / NoHealthyBackendError
+    instead of returning "Error: ..." strings.
+    """
+
+    @classmethod
+    async def create(cls: Type[T], name: str, system_message: str, memory: BaseMemoryAdapter = None,
+                     backends: List[LLMAdapter] = None, strategy: str = "least_outstanding",
+                     hedge: bool = False, hedge_after: Optional[float] = None, hedge_quantile: float = 0.95,
+                     failure_threshold: int = 3, reset_timeout: float = 30.0,
+                     health_check_interval: Optional[float] = None, **llm_kwargs) -> T:
+        """
+        :param backends: Fully created adapters to balance over; only their transport is used.
+        :param strategy: "least_outstanding" (fewest in-flight requests, then latency) or
+            "latency" (expected wait: observed latency times in-flight requests).
+        :param hedge: Send a duplicate request to a second backend if the first is slow;
+            the first reply wins and the other is cancelled.
+        :param hedge_after: Fixed hedge delay in seconds; by default the primary backend's
+            observed `hedge_quantile` latency is used once enough samples exist.
+        :param failure_threshold: Consecutive failures that open a backend's circuit breaker.
+        :param reset_timeout: Seconds before an open breaker lets a trial request through.
+        :param health_check_interval: Seconds between active probes of unhealthy backends,
+            or None to rely on trial requests only.
+        """
+        if not backends:
+            raise ValueError("AdapterPool needs at least one backend adapter.")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown load balancing strategy '{strategy}'.")
+
+        self: T = object.__new__(cls)
+        self.name = name
+        self.system_message = system_message
+        self.response_cache = llm_kwargs.pop("cache", None)
+        self.shaper = llm_kwargs.pop("shaper", None)
+        self.refiner = llm_kwargs.pop("refiner", None)
+        self.llm_kwargs = llm_kwargs
+        self.memory = memory or InMemoryAdapter()
+        self._check_refiner_memory(self.memory)
+        self.backends = [Backend(adapter, CircuitBreaker(failure_threshold, reset_timeout)) for adapter in backends]
+        self.strategy = strategy
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.health_check_interval = health_check_interval
+        self._health_task: Optional[asyncio.Task] = None
+
+        self.llm_config = self.build_llm_config()
+        # Backends apply their own rate limits; the pool only fails over between them
+        self.max_retries = self.llm_kwargs.get("max_retries", 1)
+        self.retry_backoff = self.llm_kwargs.get("retry_backoff", 0.5)
+        self.raise_errors = True
+        self.rate_limiter = None
+
+        await self.memory.add_message(MessageRole.SYSTEM, self.system_message)
+        return self
+
+    def build_llm_config(self) -> dict:
+        return {
+            "model": "pool(" + ",".join(backend.adapter.llm_config["model"] for backend in self.backends) + ")",
+            "temperature": self.llm_kwargs.get("temperature"),
+        }
+
+    def _ranked_backends(self) -> List[Backend]:
+        available = [backend for backend in self.backends if backend.breaker.allows_request()]
+        if self.strategy == "latency":
+            return sorted(available, key=lambda b: (b.ewma_latency * (b.outstanding + 1), b.outstanding))
+        return sorted(available, key=lambda b: (b.outstanding, b.ewma_latency))
+
+    async def _call(self, backend: Backend, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Sends the request to a backend whose breaker was acquired for it.
+        """
+        backend.outstanding += 1
+        backend.requests += 1
+        start = time.perf_counter()
+        try:
+            with telemetry.span("pool.backend", backend=backend.name):
+                await backend.adapter._acquire_rate_limit(messages_to_send)
+                message = await backend.adapter.send_request(messages_to_send, **request_options)
+        except LLMRequestError:
+            backend.failures += 1
+            backend.breaker.record_failure()
+            raise
+        finally:
+            backend.outstanding -= 1
+        backend.record_latency(time.perf_counter() - start)
+        backend.breaker.record_success()
+        return message
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return backend.latency_quantile(self.hedge_quantile)
+
+    async def send_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Sends to the best backend, hedging to the next one if it is slow and failing
+        over through the remaining backends on errors.
+        """
+        self._ensure_health_checks()
+        ranked = self._ranked_backends()
+        if not ranked:
+            raise NoHealthyBackendError(f"[{self.name}] All backends are unavailable (circuit open).")
+
+        errors = []
+        pending: Dict[asyncio.Task, Backend] = {}
+        remaining = list(ranked)
+
+        def launch():
+            # A breaker may have changed since ranking, e.g. another request took the half-open trial
+            while remaining:
+                backend = remaining.pop(0)
+                if backend.breaker.acquire():
+                    task = asyncio.create_task(self._call(backend, messages_to_send, **request_options))
+                    # A cancelled hedge says nothing about the backend; free its trial slot
+                    task.add_done_callback(lambda done, breaker=backend.breaker: done.cancelled() and breaker.release())
+                    pending[task] = backend
+                    return
+
+        launch()
+        if not pending:
+            raise NoHealthyBackendError(f"[{self.name}] All backends are unavailable (circuit open).")
+        try:
+            while pending:
+                primary = next(iter(pending.values()))
+                delay = self._hedge_delay(primary) if remaining and len(pending) == 1 else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.debug(f"[{self.name}] Hedging request from {primary.name} to {remaining[0].name}")
+                    launch()
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        return task.result()
+                    except LLMRequestError as e:
+                        logger.warning(f"[{self.name}] Backend {backend.name} failed: {e}")
+                        errors.append((backend.name, e))
+                if not pending and remaining:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise NoHealthyBackendError(f"[{self.name}] All backends failed.", errors)
+
+    async def model_stream(self, messages_to_send: List[Dict]) -> AsyncIterator[str]:
+        """
+        Streams from the best backend. A backend failing before its first delta is counted
+        against its breaker and the next one is tried; once deltas have been yielded a
+        failure is raised, since the consumer already has part of the reply.
+        """
+        self._ensure_health_checks()
+        errors = []
+        for backend in self._ranked_backends():
+            if not backend.breaker.acquire():
+                continue
+            backend.outstanding += 1
+            backend.requests += 1
+            start = time.perf_counter()
+            streamed = False
+            try:
+                await backend.adapter._acquire_rate_limit(messages_to_send)
+                async for delta in backend.adapter.model_stream(messages_to_send):
+                    streamed = True
+                    yield delta
+            except LLMRequestError as e:
+                backend.failures += 1
+                backend.breaker.record_failure()
+                if streamed:
+                    raise
+                logger.warning(f"[{self.name}] Backend {backend.name} stream failed: {e}")
+                errors.append((backend.name, e))
+                continue
+            except BaseException:
+                # Cancelled, or the consumer stopped reading: no verdict on the backend
+                backend.breaker.release()
+                raise
+            finally:
+                backend.outstanding -= 1
+            backend.record_latency(time.perf_counter() - start)
+            backend.breaker.record_success()
+            return
+        if not errors:
+            raise NoHealthyBackendError(f"[{self.name}] All backends are unavailable (circuit open).")
+        raise NoHealthyBackendError(f"[{self.name}] All backends failed.", errors)
+
+    async def health_check(self) -> bool:
+        results = await asyncio.gather(*(backend.adapter.health_check() for backend in self.backends))
+        return any(results)
+
+    def _ensure_health_checks(self):
+        if self.health_check_interval and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            unhealthy = [backend for backend in self.backends if backend.breaker.state != CircuitBreaker.CLOSED]
+            results = await asyncio.gather(*(backend.adapter.health_check() for backend in unhealthy),
+                                           return_exceptions=True)
+            for backend, healthy in zip(unhealthy, results):
+                if healthy is True:
+                    logger.info(f"[{self.name}] Backend {backend.name} is healthy again.")
+                    backend.breaker.record_success()
+
+    def stats(self) -> List[dict]:
+        return [
+            {
+                "backend": backend.name,
+                "state": backend.breaker.state,
+                "outstanding": backend.outstanding,
+                "requests": backend.requests,
+                "failures": backend.failures,
+                "ewma_latency_s": round(backend.ewma_latency, 4),
+            }
+            for backend in self.backends
+        ]
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
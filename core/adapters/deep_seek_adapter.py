@@ -1,11 +1,25 @@
 from core.adapters.llm_adapter import LLMAdapter
-import requests
+from core.adapters.http_client import HttpClientConfig, get_async_client
+import httpx
+import json
+from core import telemetry
 import logging
 from core.memory.base_memory_adapter import BaseMemoryAdapter
-from typing import List, Dict
+from core.memory.message import serialize_messages
+from core.errors.llm_error import LLMRequestError, parse_retry_after
+from typing import AsyncIterator, List, Dict
 
 logger = logging.getLogger(__name__)
 
+def _request_error(e: httpx.HTTPError) -> LLMRequestError:
+    """
+    Maps an httpx failure to LLMRequestError, keeping the status code and Retry-After hint.
+    """
+    if isinstance(e, httpx.HTTPStatusError):
+        retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+        return LLMRequestError(str(e), status_code=e.response.status_code, retry_after=retry_after)
+    return LLMRequestError(str(e) or type(e).__name__)
+
 class DeepSeekAdapter(LLMAdapter):
     @classmethod
     async def create(cls, name: str, system_message: str, memory: BaseMemoryAdapter = None, **llm_kwargs) :
@@ -21,42 +35,114 @@ class DeepSeekAdapter(LLMAdapter):
             "api_key": self.llm_kwargs["api_key"],
             "base_url": self.llm_kwargs["base_url"],
             "temperature": self.llm_kwargs.get("temperature", 0.3),
+            "timeout": self.llm_kwargs.get("timeout", 120),
+            "max_connections": self.llm_kwargs.get("max_connections", 100),
+            "max_keepalive_connections": self.llm_kwargs.get("max_keepalive_connections", 20),
         }
 
-    def model_request(self, messages_to_send: List[Dict]) -> str:
-        """
-        Make the request to the DeepSeek API and process the response.
-        """
+    def _build_payload(self, messages_to_send: List[Dict], stream: bool = False, **request_options) -> dict:
         payload = {
             "model": self.llm_config["model"],
             "temperature": self.llm_config.get("temperature", 0.3),
-            "messages": messages_to_send,
+            "messages": serialize_messages(messages_to_send),
         }
-        headers = {
+        if stream:
+            payload["stream"] = True
+        if getattr(self, "shaper", None):
+            # Local servers: keep the model loaded and reuse the cached prompt prefix
+            payload.update(self.shaper.server_hints)
+        payload.update(request_options)
+        return payload
+
+    def _build_headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.llm_config['api_key']}",
             "Content-Type": "application/json"
         }
 
+    def _get_client(self) -> httpx.AsyncClient:
+        return get_async_client(self.llm_config["base_url"], HttpClientConfig.from_llm_config(self.llm_config))
+
+    async def send_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Make the request to the DeepSeek API and process the response.
+        """
+        client = self._get_client()
+
         try:
-            response = requests.post(
-                url=self.llm_config["base_url"],
-                headers=headers,
-                json=payload,
-                timeout=120
-            )
-            response.raise_for_status()
+            with telemetry.span("request.serialize"):
+                body = json.dumps(self._build_payload(messages_to_send, **request_options)).encode("utf-8")
+            with telemetry.span("network.wait"):
+                response = await client.post(
+                    url=self.llm_config["base_url"],
+                    headers=self._build_headers(),
+                    content=body,
+                )
+                response.raise_for_status()
             data = response.json()
 
+            usage = data.get("usage") or {}
+            telemetry.record_usage(self.llm_config["model"], usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
             message = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
             if not message:
                 logger.warning(f"[{self.name}] Empty content returned from DeepSeek.")
                 return "No content returned by the model."
             return message
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"[{self.name}] DeepSeek API request failed: {e}")
-            return f"Error: {str(e)}"
-        except (KeyError, IndexError, TypeError) as e:
-            logger.error(f"[{self.name}] Unexpected DeepSeek response format: {e}")
-            return "Error: Unexpected response format from DeepSeek API."
+        except httpx.HTTPError as e:
+            logger.debug(f"[{self.name}] DeepSeek API request failed: {e}")
+            raise _request_error(e) from e
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.debug(f"[{self.name}] Unexpected DeepSeek response format: {e}")
+            raise LLMRequestError("Unexpected response format from DeepSeek API.", retryable=False) from e
+
+    async def warm_up(self, connect: bool = False):
+        self._get_client()
+        await super().warm_up(connect)
+
+    async def health_check(self) -> bool:
+        """
+        Probes the server's model list (`/v1/models` next to the chat completions URL).
+        """
+        models_url = self.llm_config["base_url"].rsplit("/chat/completions", 1)[0] + "/models"
+        try:
+            response = await self._get_client().get(models_url, headers=self._build_headers())
+            return response.status_code < 500
+        except httpx.HTTPError:
+            return False
+
+    async def model_stream(self, messages_to_send: List[Dict]) -> AsyncIterator[str]:
+        """
+        Stream the reply from the DeepSeek API, parsing the server-sent events
+        (`data: {...}` lines terminated by `data: [DONE]`) into content deltas.
+        Raises LLMRequestError if the stream fails.
+        """
+        await self._acquire_rate_limit(messages_to_send)
+        client = self._get_client()
+
+        try:
+            async with client.stream(
+                "POST",
+                self.llm_config["base_url"],
+                headers=self._build_headers(),
+                json=self._build_payload(messages_to_send, stream=True),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    delta = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
 
+        except httpx.HTTPError as e:
+            logger.debug(f"[{self.name}] DeepSeek API stream failed: {e}")
+            raise _request_error(e) from e
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.debug(f"[{self.name}] Unexpected DeepSeek stream chunk format: {e}")
+            raise LLMRequestError("Unexpected response format from DeepSeek API.", retryable=False) from e
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    """
+    Connection settings for a pooled async HTTP client.
+
+    One client is kept per (event loop, host, config), so `max_connections`
+    and `max_keepalive_connections` act as per-host limits.
+    """
+    timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+    @classmethod
+    def from_llm_config(cls, llm_config: dict) -> "HttpClientConfig":
+        """
+        Picks the transport settings out of an adapter's llm_config.
+        """
+        defaults = cls()
+        return cls(
+            timeout=float(llm_config.get("timeout") or defaults.timeout),
+            connect_timeout=float(llm_config.get("connect_timeout") or defaults.connect_timeout),
+            max_connections=int(llm_config.get("max_connections") or defaults.max_connections),
+            max_keepalive_connections=int(llm_config.get("max_keepalive_connections") or defaults.max_keepalive_connections),
+            keepalive_expiry=float(llm_config.get("keepalive_expiry") or defaults.keepalive_expiry),
+        )
+
+
+# Clients are bound to the loop they were created on, so they are tracked per loop
+# and dropped automatically when the loop goes away.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, HttpClientConfig], httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_async_client(url: str, config: HttpClientConfig = None) -> httpx.AsyncClient:
+    """
+    Returns the shared keep-alive client for the host of `url` on the running loop.
+
+    :param url: Any URL on the target host; only scheme and netloc are used.
+    :param config: Timeouts and pool limits for the client.
+    :return: A pooled httpx.AsyncClient.
+    """
+    config = config or HttpClientConfig()
+    loop = asyncio.get_running_loop()
+    clients = _clients.get(loop)
+    if clients is None:
+        clients = _clients[loop] = {}
+
+    key = (_host_key(url), config)
+    client = clients.get(key)
+    if client is None or client.is_closed:
+        logger.debug(f"Creating pooled HTTP client for {key[0]} with {config}")
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        clients[key] = client
+    return client
+
+
+async def close_async_clients():
+    """
+    Closes every pooled client created on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.pop(loop, {})
+    await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
@@ -1,19 +1,79 @@
+import asyncio
+import hashlib
 import logging
+import random
+import sys
+import weakref
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from core.models import ModelPreferences
-from typing import List, Dict, Type, TypeVar
+from types import MappingProxyType
+from typing import AsyncIterator, List, Dict, Mapping, Tuple, Type, TypeVar
 from core.config.roles import MessageRole
 from core.memory.base_memory_adapter import BaseMemoryAdapter
 from core.memory.in_memory_adapter import InMemoryAdapter
+from core.memory.compacting_memory_adapter import CompactingMemoryAdapter
+from core.memory.persistent_memory_adapter import PersistentMemoryAdapter
+from core.adapters.rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+from core.adapters.request_shaper import RequestShaper
+from core.errors.llm_error import LLMRequestError
+from core.cache.response_cache import ResponseCache
+from core.code_builder.refiner import CodeRefiner
+from core.errors.patch_error import PatchError
+from core.memory.message import Message
+from core import telemetry
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound="LLMAdapter")
 
+# Set by `raising_errors()`: adapters raise LLMRequestError whatever their `raise_errors` setting
+_raise_errors: ContextVar[bool] = ContextVar("raise_errors", default=False)
+
+
+@contextmanager
+def raising_errors():
+    """
+    Makes adapters called in this context (and in tasks started from it) raise
+    LLMRequestError instead of returning or streaming "Error: ..." strings.
+    """
+    token = _raise_errors.set(True)
+    try:
+        yield
+    finally:
+        _raise_errors.reset(token)
+
+
+def errors_raised() -> bool:
+    """
+    Whether this code runs inside `raising_errors()`.
+    """
+    return _raise_errors.get()
+
+
+# Settings hashed rather than kept in the key, so the key doesn't hold on to credentials
+_SECRET_KWARGS = ("api_key",)
+
+
+class _SharedConfig:
+    """
+    Frozen (llm_kwargs, llm_config) shared by all agents created with the same settings.
+    """
+    __slots__ = ("llm_kwargs", "llm_config", "__weakref__")
+
+    def __init__(self, llm_kwargs: Mapping, llm_config: Mapping):
+        self.llm_kwargs = llm_kwargs
+        self.llm_config = llm_config
+
+
+# (adapter class, settings) -> config; an entry lives as long as an agent uses it
+_SHARED_CONFIGS: "weakref.WeakValueDictionary[tuple, _SharedConfig]" = weakref.WeakValueDictionary()
+
 class LLMAdapter(ABC):
     """
     Abstract base for adapting different LLM providers into AssistantAgent.
-    Subclasses must implement `build_llm_config()` and `model_request()`.
+    Subclasses must implement `build_llm_config()` and `send_request()`.
     """
 
     def __init__(self):
@@ -31,17 +91,36 @@ class LLMAdapter(ABC):
         self: T = object.__new__(cls)
 
         self.name = name
-        self.system_message = system_message
-        self.llm_kwargs = llm_kwargs
+        # Agents created from the same prompt share one string
+        self.system_message = sys.intern(system_message)
+        # Opt-in response cache; not an LLM parameter, so keep it out of llm_kwargs
+        self.response_cache: ResponseCache = llm_kwargs.pop("cache", None)
+        # Opt-in prompt shaping for servers with a prefix/KV cache
+        self.shaper: RequestShaper = llm_kwargs.pop("shaper", None)
+        # Opt-in diff-based refinement of generated code
+        self.refiner: CodeRefiner = llm_kwargs.pop("refiner", None)
         self.memory = memory or InMemoryAdapter()
+        self._check_refiner_memory(self.memory)
+        if self.shaper and isinstance(self.memory, InMemoryAdapter) and self.memory.max_history < self.shaper.history_limit:
+            logger.warning(f"[{name}] Memory keeps {self.memory.max_history} messages but the request shaper reads "
+                           f"{self.shaper.history_limit}; use InMemoryAdapter(max_history={self.shaper.history_limit}) "
+                           f"for a stable prompt prefix.")
 
-        logger.debug(f"Initializing LLMAdapter: name={self.name}, params={self.llm_kwargs}")
+        logger.debug(f"Initializing LLMAdapter: name={self.name}, params={llm_kwargs}")
 
-        self._validate_llm_kwargs()
+        self._config = self._shared_config(llm_kwargs)
+        self.llm_kwargs, self.llm_config = self._config.llm_kwargs, self._config.llm_config
 
-        self.llm_config = self.build_llm_config()
-        if not self.llm_config or not isinstance(self.llm_config, dict):
-            raise ValueError("LLM config must be a valid dictionary.")
+        self.max_retries = self.llm_kwargs.get("max_retries", 3)
+        self.retry_backoff = self.llm_kwargs.get("retry_backoff", 0.5)
+        # Raise LLMRequestError instead of returning "Error: ..." strings
+        self.raise_errors = self.llm_kwargs.get("raise_errors", False)
+        self.rate_limiter: RateLimiter = get_rate_limiter(
+            self.llm_config.get("base_url"),
+            self.llm_config["model"],
+            rpm=self.llm_kwargs.get("rpm"),
+            tpm=self.llm_kwargs.get("tpm"),
+        )
 
         # self._agent = AssistantAgent(
         #     name=self.name,
@@ -54,6 +133,64 @@ class LLMAdapter(ABC):
 
         return self
 
+    async def fork(self: T, memory: BaseMemoryAdapter = None) -> T:
+        """
+        Returns a copy of this adapter that shares its config but owns its memory,
+        seeded with the current history. Lets several requests run concurrently
+        without interleaving their turns in one conversation.
+        """
+        self._check_refiner_memory(memory)
+        clone: T = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.memory = memory or InMemoryAdapter()
+        for message in await self.memory.get_history():
+            await clone.memory.add_message(MessageRole(message["role"]), message["content"])
+        if self.refiner:
+            self.refiner.copy(self.memory, clone.memory)
+        return clone
+
+    def _check_refiner_memory(self, memory: BaseMemoryAdapter):
+        """
+        A refiner keeps the code in this process and only a placeholder in memory, so it
+        can't be used with memory that outlives the process or rewrites old turns.
+        """
+        if self.refiner and isinstance(memory, (PersistentMemoryAdapter, CompactingMemoryAdapter)):
+            raise ValueError(f"[{self.name}] A CodeRefiner can't be used with {type(memory).__name__}: its artifacts "
+                             f"live only in this process, so the history would keep placeholders for lost code.")
+
+    @staticmethod
+    def _config_key(llm_kwargs: dict) -> frozenset:
+        return frozenset(
+            (name, hashlib.sha256(str(value).encode("utf-8")).hexdigest() if name in _SECRET_KWARGS else value)
+            for name, value in llm_kwargs.items()
+        )
+
+    def _shared_config(self, llm_kwargs: dict) -> _SharedConfig:
+        """
+        Returns the read-only llm_kwargs and llm_config, validated and built once per
+        adapter class and settings and then shared by every agent created with them.
+        Settings with unhashable values are validated and built per agent.
+        """
+        try:
+            key = (type(self), self._config_key(llm_kwargs))
+            shared = _SHARED_CONFIGS.get(key)
+        except TypeError:
+            key = shared = None
+        if shared is not None:
+            return shared
+
+        self.llm_kwargs = MappingProxyType(dict(llm_kwargs))
+        self._validate_llm_kwargs()
+
+        llm_config = self.build_llm_config()
+        if not llm_config or not isinstance(llm_config, dict):
+            raise ValueError("LLM config must be a valid dictionary.")
+
+        shared = _SharedConfig(self.llm_kwargs, MappingProxyType(llm_config))
+        if key is not None:
+            _SHARED_CONFIGS[key] = shared
+        return shared
+
     def _validate_llm_kwargs(self):
         model = self.llm_kwargs.get("model")
         api_key = self.llm_kwargs.get("api_key")
@@ -78,16 +215,217 @@ class LLMAdapter(ABC):
         pass
 
     @abstractmethod
-    def model_request(self, messages_to_send: List[Dict]) -> str:
+    async def send_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Performs a single provider call and returns the reply text.
+        Must raise LLMRequestError on failure.
+
+        :param request_options: Extra per-request API parameters, e.g. `response_format`
+            for JSON-schema constrained output.
+        """
         pass
 
-    async def generate_response(self, instructions: str) -> str:
+    async def health_check(self) -> bool:
+        """
+        Returns True if the provider answers. Providers override this with a cheaper probe;
+        the default sends a one-word request.
+        """
+        try:
+            await self.send_request([{"role": MessageRole.USER.value, "content": "ping"}])
+            return True
+        except LLMRequestError:
+            return False
+
+    async def warm_up(self, connect: bool = False):
+        """
+        Builds the provider client ahead of the first request, and with `connect` also
+        opens a pooled connection (TCP/TLS) by running `health_check`.
+        """
+        if connect:
+            await self.health_check()
+
+    async def _acquire_rate_limit(self, messages_to_send: List[Dict]):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(messages_to_send, self.llm_config.get("token_limit")))
+
+    async def request_with_retries(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Sends the request within the provider rate limits, retrying retryable failures
+        (429, 5xx, transport errors) with exponential backoff and jitter.
+        Raises the last LLMRequestError when retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            with telemetry.span("llm.rate_limit_wait"):
+                await self._acquire_rate_limit(messages_to_send)
+            try:
+                return await self.send_request(messages_to_send, **request_options)
+            except LLMRequestError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = e.retry_after or self.retry_backoff * (2 ** attempt) * (1 + random.random())
+                attempt += 1
+                logger.warning(f"[{self.name}] Request failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def model_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        Returns the model reply, or an "Error: ..." string if the request ultimately failed
+        (LLMRequestError is raised instead when `raise_errors` is set, or within `raising_errors()`).
+        When a response cache is configured it is consulted first; failures are never cached.
+        """
+        try:
+            return await self._request(messages_to_send, **request_options)
+        except LLMRequestError as e:
+            if self.raise_errors or _raise_errors.get():
+                raise
+            return f"Error: {e}"
+
+    async def _request(self, messages_to_send: List[Dict], **request_options) -> str:
+        """
+        `model_request` without the error string fallback: failures raise LLMRequestError.
+        """
+        with telemetry.span("llm.request", agent=self.name, model=self.llm_config["model"]) as span:
+            cache_key = None
+            if self.response_cache:
+                cache_key = self.response_cache.make_key(
+                    self.llm_config["model"], self.llm_config.get("temperature"), messages_to_send, **request_options
+                )
+                cached = await self.response_cache.get(cache_key)
+                span.set_attribute("cache_hit", cached is not None)
+                if cached is not None:
+                    logger.debug(f"[{self.name}] Response cache hit.")
+                    return cached
+
+            try:
+                message = await self.request_with_retries(messages_to_send, **request_options)
+            except LLMRequestError as e:
+                logger.error(f"[{self.name}] Request failed: {e}")
+                span.set_attribute("error", type(e).__name__)
+                raise
+
+            if cache_key:
+                await self.response_cache.set(cache_key, message)
+            return message
+
+    async def _history_to_send(self) -> List[Dict]:
+        """
+        Reads the history to send, shaped for prefix-cache reuse when a shaper is set.
+        """
+        if self.shaper is None:
+            return await self.memory.get_history()
+        history = await self.memory.get_history(limit=self.shaper.history_limit)
+        return self.shaper.shape(self.memory, history, self.system_message)
+
+    async def _messages_for(self, instructions: str, edits: bool = True) -> List:
+        """
+        Adds the instructions to memory and returns the messages to send. With a refiner
+        and a current artifact, the last message also carries the code and the reply format.
+        """
         await self.memory.add_message(MessageRole.USER, instructions)
-        messages_to_send = await self.memory.get_history()
-        print(messages_to_send)
-        message = self.model_request(messages_to_send)
-        await self.memory.add_message(MessageRole.ASSISTANT, message)
-        return message
+        messages_to_send = await self._history_to_send()
+        artifact = self.refiner.current(self.memory) if self.refiner else None
+        if artifact is not None:
+            messages_to_send = list(messages_to_send)
+            messages_to_send[-1] = Message(MessageRole.USER.value,
+                                           self.refiner.edit_request(artifact, instructions, edits=edits))
+        return messages_to_send
+
+    async def _refine(self, messages_to_send: List, reply: str, **request_options) -> Tuple[str, str]:
+        """
+        Resolves a reply against the refiner: edits are applied to the current artifact,
+        falling back to asking for the complete code if they don't apply. Returns the
+        reply for the caller (complete code) and the compact text for memory.
+        """
+        artifact = self.refiner.current(self.memory)
+        if artifact is not None and self.refiner.is_patch(reply):
+            try:
+                updated = self.refiner.apply(self.memory, artifact, reply)
+                logger.debug(f"[{self.name}] Applied edits: {updated.ref}, {updated.lines} lines.")
+                return updated.fenced(), updated.reference("edited")
+            except PatchError as e:
+                logger.warning(f"[{self.name}] Edits could not be applied ({e}); asking for a full rewrite.")
+                messages_to_send = [*messages_to_send, Message(MessageRole.ASSISTANT.value, reply),
+                                    Message(MessageRole.USER.value, self.refiner.rewrite_request(e))]
+                reply = await self._request(messages_to_send, **request_options)
+        compact, _ = self.refiner.record(self.memory, reply)
+        return reply, compact
+
+    async def generate_response(self, instructions: str, **request_options) -> str:
+        """
+        Adds the instructions to memory, requests the reply and commits it to memory. If the
+        request fails, nothing is committed and the failure is raised, or returned as an
+        "Error: ..." string unless `raise_errors` is set.
+        """
+        with telemetry.span("llm.generate", agent=self.name):
+            with telemetry.span("memory.read"):
+                messages_to_send = await self._messages_for(instructions)
+            logger.debug(f"[{self.name}] Sending {len(messages_to_send)} message(s).")
+            try:
+                message = await self._request(messages_to_send, **request_options)
+                stored = message
+                if self.refiner:
+                    with telemetry.span("code.refine", agent=self.name):
+                        message, stored = await self._refine(messages_to_send, message, **request_options)
+            except LLMRequestError as e:
+                # As with streams, a failed reply must not become history the next turns build on
+                if self.raise_errors or _raise_errors.get():
+                    raise
+                return f"Error: {e}"
+            await self.memory.add_message(MessageRole.ASSISTANT, stored)
+            return message
+
+    async def model_stream(self, messages_to_send: List[Dict]) -> AsyncIterator[str]:
+        """
+        Yields the reply as content deltas and raises LLMRequestError if the stream fails.
+        Providers with a streaming mode override this, taking their rate limit slot before
+        opening the stream; the default yields the full reply as a single chunk.
+        """
+        yield await self._request(messages_to_send)
+
+    async def stream_response(self, instructions: str) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of `generate_response`. Yields deltas as they arrive and
+        commits the assembled message to memory once the stream ends. If the stream fails,
+        nothing is committed and the failure is raised, or yielded as a final "Error: ..."
+        delta unless `raise_errors` is set.
+        """
+        # Spans are started explicitly rather than entered: a generator must not change
+        # the consumer's current span between yields.
+        stream_span = telemetry.start_span("llm.stream", agent=self.name, model=self.llm_config["model"])
+        read_span = telemetry.start_span("memory.read", agent=self.name)
+        # Streamed deltas can't be patched, so a refiner's artifact is sent for a full rewrite
+        messages_to_send = await self._messages_for(instructions, edits=False)
+        read_span.end()
+        first_token_span = telemetry.start_span("llm.time_to_first_token", agent=self.name)
+        parts: List[str] = []
+        failed = False
+        try:
+            async for delta in self.model_stream(messages_to_send):
+                if not parts:
+                    first_token_span.end()
+                parts.append(delta)
+                yield delta
+        except LLMRequestError as e:
+            # A partial reply must not become history the next turns build on
+            failed = True
+            logger.error(f"[{self.name}] Stream failed after {len(parts)} chunk(s): {e}")
+            stream_span.set_attribute("error", type(e).__name__)
+            if self.raise_errors or _raise_errors.get():
+                raise
+            yield f"Error: {e}"
+        finally:
+            if not failed:
+                # Commit even if the consumer stops early, so the history keeps user/assistant pairs
+                message = "".join(parts)
+                if self.refiner:
+                    message, _ = self.refiner.record(self.memory, message)
+                await self.memory.add_message(MessageRole.ASSISTANT, message)
+            if not parts:
+                first_token_span.set_attribute("empty", True)
+            first_token_span.end()
+            stream_span.set_attribute("chunks", len(parts))
+            stream_span.end()
 
     # @property
     # def agent(self) -> AssistantAgent:
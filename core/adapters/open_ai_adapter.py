@@ -1,18 +1,35 @@
 import logging
 import openai
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from core.adapters.llm_adapter import LLMAdapter  # Adjust the import path as needed
+from core.adapters.http_client import HttpClientConfig, get_async_client
+from core import telemetry
 from core.config.roles import MessageRole
+from core.errors.llm_error import LLMRequestError, parse_retry_after
 from core.memory.base_memory_adapter import BaseMemoryAdapter  # Import the Memory class
+from core.memory.message import serialize_messages
 
 logger = logging.getLogger(__name__)
 
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+def _request_error(e: openai.OpenAIError) -> LLMRequestError:
+    """
+    Maps an OpenAI SDK failure to LLMRequestError, keeping the status code and Retry-After hint.
+    """
+    if isinstance(e, openai.APIStatusError):
+        retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+        return LLMRequestError(str(e), status_code=e.status_code, retry_after=retry_after)
+    if isinstance(e, openai.APIConnectionError):
+        return LLMRequestError(str(e))
+    return LLMRequestError(str(e), retryable=False)
+
 class OpenAIAdapter(LLMAdapter):
     @classmethod
     async def create(cls, name: str, system_message: str, memory: BaseMemoryAdapter = None, **llm_kwargs):
         llm_kwargs.setdefault("model", "gpt-4o-mini")
-        return await super().create(name=name, system_message=system_message, memory=memory, **llm_kwargs) 
-     
+        return await super().create(name=name, system_message=system_message, memory=memory, **llm_kwargs)
+
     def build_llm_config(self) -> dict:
         """
         Builds the config required for OpenAI API usage.
@@ -20,22 +37,46 @@ class OpenAIAdapter(LLMAdapter):
         return {
             "model": self.llm_kwargs["model"],
             "api_key": self.llm_kwargs["api_key"],  # OpenAI API key
+            "base_url": self.llm_kwargs.get("base_url", OPENAI_BASE_URL),
             "temperature": self.llm_kwargs.get("temperature", 0.7),
             "token_limit":self.llm_kwargs.get("token_limit", None),
+            "timeout": self.llm_kwargs.get("timeout", 120),
+            "max_connections": self.llm_kwargs.get("max_connections", 100),
+            "max_keepalive_connections": self.llm_kwargs.get("max_keepalive_connections", 20),
         }
 
-    def model_request(self, messages_to_send: List[Dict]) -> str:
-        # Prepare the OpenAI API client with the API key
-        openai.api_key = self.llm_config["api_key"]
+    def _get_client(self) -> openai.AsyncOpenAI:
+        """
+        Returns an AsyncOpenAI client backed by the shared pooled HTTP client.
+        The SDK client is rebuilt only when the pooled client changes (e.g. a new event loop).
+        """
+        http_client = get_async_client(self.llm_config["base_url"], HttpClientConfig.from_llm_config(self.llm_config))
+        if getattr(self, "_client", None) is None or self._http_client is not http_client:
+            self._client = openai.AsyncOpenAI(
+                api_key=self.llm_config["api_key"],
+                base_url=self.llm_config["base_url"],
+                timeout=self.llm_config["timeout"],
+                max_retries=0,  # retries and backoff are handled by LLMAdapter.request_with_retries
+                http_client=http_client,
+            )
+            self._http_client = http_client
+        return self._client
+
+    async def send_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        client = self._get_client()
 
         try:
             # Make the API call using the OpenAI chat completions method
-            api_response = openai.chat.completions.create(
-                model=self.llm_config["model"],
-                messages=messages_to_send,
-                temperature=self.llm_config.get("temperature", 0.7),
-                max_tokens= self.llm_config.get("token_limit")
-            )
+            with telemetry.span("network.wait"):
+                api_response = await client.chat.completions.create(
+                    model=self.llm_config["model"],
+                    messages=serialize_messages(messages_to_send),
+                    temperature=self.llm_config.get("temperature", 0.7),
+                    max_tokens= self.llm_config.get("token_limit"),
+                    **request_options
+                )
+            if api_response.usage:
+                telemetry.record_usage(api_response.model, api_response.usage.prompt_tokens, api_response.usage.completion_tokens)
 
             # Extract the assistant's reply from the response
             assistant_reply = api_response.choices[0].message.content
@@ -45,8 +86,44 @@ class OpenAIAdapter(LLMAdapter):
             return assistant_reply
 
         except openai.OpenAIError as e:
-            logger.error(f"[{self.name}] OpenAI API request failed: {e}")
-            return f"Error: {str(e)}"
+            logger.debug(f"[{self.name}] OpenAI API request failed: {e}")
+            raise _request_error(e) from e
+        except Exception as e:
+            logger.debug(f"[{self.name}] OpenAI API Generic request failed: {e}")
+            raise LLMRequestError(str(e), retryable=False) from e
+
+    async def warm_up(self, connect: bool = False):
+        self._get_client()
+        await super().warm_up(connect)
+
+    async def health_check(self) -> bool:
+        try:
+            await self._get_client().models.list()
+            return True
+        except openai.APIStatusError as e:
+            return e.status_code < 500
+        except openai.OpenAIError:
+            return False
+
+    async def model_stream(self, messages_to_send: List[Dict]) -> AsyncIterator[str]:
+        await self._acquire_rate_limit(messages_to_send)
+        client = self._get_client()
+
+        try:
+            stream = await client.chat.completions.create(
+                model=self.llm_config["model"],
+                messages=serialize_messages(messages_to_send),
+                temperature=self.llm_config.get("temperature", 0.7),
+                max_tokens= self.llm_config.get("token_limit"),
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except openai.OpenAIError as e:
+            logger.debug(f"[{self.name}] OpenAI API stream failed: {e}")
+            raise _request_error(e) from e
         except Exception as e:
-            logger.error(f"[{self.name}] OpenAI API Generic request failed: {e}")
-            return f"Error: {str(e)}"
+            logger.debug(f"[{self.name}] OpenAI API Generic stream failed: {e}")
+            raise LLMRequestError(str(e), retryable=False) from e
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        :param per_minute: Refill rate, in units per minute.
+        :param capacity: Burst size; defaults to one minute's worth.
+        """
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        Waits until `amount` units are available and takes them. Requests larger
+        than the bucket are clamped to its capacity so they can't wait forever.
+        Waiters are served in arrival order.
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+class RateLimiter:
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Enforces requests-per-minute and tokens-per-minute quotas.
+
+        :param rpm: Requests per minute, or None for no request limit.
+        :param tpm: Tokens per minute (prompt + expected completion), or None for no token limit.
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, tokens: int = 0):
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens and tokens:
+            await self.tokens.acquire(tokens)
+
+
+# Quotas belong to the provider account, so every adapter talking to the same
+# endpoint and model shares one limiter.
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(base_url: str, model: str, rpm: Optional[float] = None, tpm: Optional[float] = None) -> Optional[RateLimiter]:
+    """
+    Returns the shared limiter for (base_url, model), creating it on first use.
+    Returns None when neither quota is set.
+    """
+    if not rpm and not tpm:
+        return None
+    key = (base_url or "", model)
+    limiter = _limiters.get(key)
+    if limiter is None or (limiter.rpm, limiter.tpm) != (rpm, tpm):
+        logger.debug(f"Creating rate limiter for {key}: rpm={rpm}, tpm={tpm}")
+        limiter = _limiters[key] = RateLimiter(rpm=rpm, tpm=tpm)
+    return limiter
+
+
+def estimate_tokens(messages: List[Dict], completion_tokens: int = 0) -> int:
+    """
+    Cheap upper-bound style estimate (~4 characters per token plus per-message overhead)
+    used to charge the tokens-per-minute bucket before the request is sent.
+    """
+    prompt_tokens = sum(len(message.get("content") or "") // 4 + 4 for message in messages)
+    return prompt_tokens + (completion_tokens or 0)
@@ -0,0 +1,63 @@
+import importlib
+import logging
+from typing import Dict, Union
+from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.models import ModelPreferences
+
+logger = logging.getLogger(__name__)
+
+# Model prefix -> adapter class, or "module:Class" imported the first time a model with
+# that prefix is used, so a process only loads the provider SDKs it needs.
+_ADAPTERS: Dict[str, Union[str, type]] = {
+    "gpt-3.5": "core.adapters.open_ai_adapter:OpenAIAdapter",
+    "gpt-4": "core.adapters.open_ai_adapter:OpenAIAdapter",
+    # Local models are served through OpenAI-compatible chat completion endpoints (Ollama, llama.cpp)
+    "llama": "core.adapters.deep_seek_adapter:DeepSeekAdapter",
+    "deepseek-coder": "core.adapters.deep_seek_adapter:DeepSeekAdapter",
+    "codellama:13b-python": "core.adapters.deep_seek_adapter:DeepSeekAdapter",
+}
+
+
+def register_adapter(prefix: str, adapter: Union[str, type]):
+    """
+    Maps models starting with `prefix` to an adapter class, given as the class itself or
+    as "module:Class" to import it lazily. New prefixes become valid models.
+    """
+    if isinstance(adapter, str) and ":" not in adapter:
+        raise ValueError(f"Adapter path '{adapter}' must look like 'package.module:ClassName'.")
+    _ADAPTERS[prefix] = adapter
+    if prefix not in ModelPreferences.VALID_MODEL_PREFIXES:
+        ModelPreferences.VALID_MODEL_PREFIXES += (prefix,)
+
+
+def adapter_for_model(model: str) -> type:
+    """
+    Returns the adapter class serving `model`, importing its provider module on first use.
+    The longest matching prefix wins.
+    """
+    prefixes = [prefix for prefix in ModelPreferences.VALID_MODEL_PREFIXES if model.startswith(prefix)]
+    if not prefixes:
+        raise ValueError(f"Unsupported model '{model}'. Supported models must start with one of: "
+                         f"{ModelPreferences.VALID_MODEL_PREFIXES}")
+    prefix = max(prefixes, key=len)
+    adapter = _ADAPTERS.get(prefix)
+    if adapter is None:
+        raise ValueError(f"No adapter is registered for models starting with '{prefix}'.")
+    if isinstance(adapter, str):
+        module_name, class_name = adapter.split(":")
+        logger.debug(f"Loading adapter {adapter} for model '{model}'.")
+        adapter = getattr(importlib.import_module(module_name), class_name)
+        # Resolve each path once
+        for key, value in _ADAPTERS.items():
+            if value == f"{module_name}:{class_name}":
+                _ADAPTERS[key] = adapter
+    return adapter
+
+
+async def create_adapter(name: str, system_message: str, model: str, memory: BaseMemoryAdapter = None,
+                         **llm_kwargs):
+    """
+    Creates an adapter of the class registered for `model`.
+    """
+    return await adapter_for_model(model).create(name=name, system_message=system_message, memory=memory,
+                                                 model=model, **llm_kwargs)
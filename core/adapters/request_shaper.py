@@ -0,0 +1,98 @@
+import weakref
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Sequence, Union
+from core.config.roles import MessageRole
+from core.memory.message import Message
+from core.memory.token_counter import count_message_tokens, get_token_counter
+
+# Understood by Ollama (keep the model loaded) and llama.cpp's server (reuse the KV cache
+# of the slot's previous prompt); other OpenAI-compatible servers ignore unknown fields.
+DEFAULT_SERVER_HINTS = {"keep_alive": "30m", "cache_prompt": True}
+
+
+class RequestShaper:
+    def __init__(self, max_messages: int = 10, max_tokens: Optional[int] = None, block_size: Optional[int] = None,
+                 server_hints: Mapping = DEFAULT_SERVER_HINTS, counter: Callable[[str], int] = None):
+        """
+        Turns a memory's history into the messages sent to the model so that the prompt
+        prefix stays the same from turn to turn, letting local servers reuse their
+        prefix/KV cache instead of re-processing the whole history.
+
+        The system prompt is pinned first. The window of older turns starts at an anchor
+        message that only moves when the window outgrows its budget, and then far enough
+        to leave a block of headroom, so the prefix changes once every few turns instead
+        of on every turn.
+
+        :param max_messages: Most non-system messages sent. The memory should keep at least
+            `history_limit` messages, or the anchor can drop out of sight.
+        :param max_tokens: Optional token budget for the whole prompt, system prompt included.
+        :param block_size: Headroom, in messages, left after trimming; defaults to half of
+            `max_messages`. Larger blocks mean fewer cache misses but less context.
+        :param server_hints: Extra payload fields for local servers (see DEFAULT_SERVER_HINTS).
+        :param counter: Function returning the token count of a string, used with `max_tokens`.
+        """
+        if block_size is None:
+            block_size = max(1, max_messages // 2)
+        if block_size < 1 or max_messages < 1:
+            raise ValueError("max_messages and block_size must be at least 1.")
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.block_size = block_size
+        self.server_hints = MappingProxyType(dict(server_hints or {}))
+        self.counter = counter or get_token_counter()
+        self.prefix_changes = 0
+        # Window anchor per conversation; shapers are shared by forked and pooled agents
+        self._anchors: "weakref.WeakKeyDictionary[object, Message]" = weakref.WeakKeyDictionary()
+
+    @property
+    def history_limit(self) -> int:
+        """Messages to read from memory: the budget plus a block, so the anchor is still visible."""
+        return self.max_messages + self.block_size + 1
+
+    def _over_budget(self, pinned: List, window: Sequence) -> bool:
+        if len(window) > self.max_messages:
+            return True
+        if self.max_tokens is None:
+            return False
+        tokens = sum(count_message_tokens(message["content"], self.counter) for message in [*pinned, *window])
+        return tokens > self.max_tokens
+
+    @staticmethod
+    def _find(body: Sequence, anchor: Message) -> Optional[int]:
+        for index, message in enumerate(body):
+            if message is anchor:
+                return index
+        # Stores that build new records on every read (e.g. SQLite) are matched by value
+        for index in range(len(body) - 1, -1, -1):
+            if body[index] == anchor:
+                return index
+        return None
+
+    def shape(self, conversation, history: Sequence[Union[Message, dict]], system_message: Optional[str]) -> List:
+        """
+        :param conversation: Object identifying the conversation, normally its memory.
+        :param history: Recent messages, oldest first, e.g. `memory.get_history(limit=history_limit)`.
+        :param system_message: The agent's system prompt, pinned first even if memory evicted it.
+        """
+        pinned = [Message(MessageRole.SYSTEM.value, system_message)] if system_message else []
+        body = [message for message in history
+                if not (message["role"] == MessageRole.SYSTEM.value and message["content"] == system_message)]
+
+        anchor = self._anchors.get(conversation)
+        # Without its anchor (first turn, or the memory was cleared) the window restarts
+        start = self._find(body, anchor) if anchor is not None else None
+        window = body[start or 0:]
+        if self._over_budget(pinned, window):
+            # Trim down to leave `block_size` messages of headroom before the next trim
+            window = window[-max(1, self.max_messages - self.block_size):]
+            while len(window) > 1 and self._over_budget(pinned, window):
+                window = window[min(self.block_size, len(window) - 1):]
+            # Chat templates expect the turns after the system prompt to open with the user
+            while len(window) > 1 and window[0]["role"] == MessageRole.ASSISTANT.value:
+                window = window[1:]
+
+        if window and window[0] is not anchor and window[0] != anchor:
+            if anchor is not None:
+                self.prefix_changes += 1
+            self._anchors[conversation] = window[0]
+        return pinned + window
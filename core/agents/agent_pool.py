@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, List, Mapping, Optional, Set, Tuple, Type
+from core.adapters.llm_adapter import LLMAdapter
+from core.agents.sk_agent import SKAgent
+from core.config.roles import MessageRole
+from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.memory.in_memory_adapter import InMemoryAdapter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AgentTemplate:
+    """
+    Declarative description of an agent: everything `SKAgent.create` needs, plus
+    messages (e.g. few-shot examples) seeded after the system prompt.
+    """
+    name: str
+    system_prompt: str
+    adapter_class: Type[LLMAdapter]
+    llm_kwargs: Mapping[str, Any] = field(default_factory=dict)
+    seed_messages: Tuple[Tuple[MessageRole, str], ...] = ()
+    memory_factory: Callable[[], BaseMemoryAdapter] = InMemoryAdapter
+
+    def __post_init__(self):
+        object.__setattr__(self, "llm_kwargs", MappingProxyType(dict(self.llm_kwargs)))
+        object.__setattr__(self, "seed_messages", tuple(self.seed_messages))
+
+    async def create(self) -> SKAgent:
+        """
+        Builds a new agent from scratch (validation, config, client and seeded memory).
+        """
+        agent = await SKAgent.create(self.name, self.system_prompt, self.adapter_class,
+                                     memory=self.memory_factory(), **self.llm_kwargs)
+        for role, content in self.seed_messages:
+            await agent.adapter.memory.add_message(role, content)
+        return agent
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    checkout_seconds: float = 0.0
+
+    @property
+    def mean_checkout_ms(self) -> float:
+        return 1000 * self.checkout_seconds / self.checkouts if self.checkouts else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "created": self.created,
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "mean_checkout_ms": round(self.mean_checkout_ms, 4),
+        }
+
+
+class AgentPool:
+    def __init__(self, template: AgentTemplate, size: int = 4, max_size: Optional[int] = None,
+                 warm_connections: bool = False):
+        """
+        Keeps pre-initialized agents of one template ready to check out.
+
+        The template is built once into a prototype; pooled agents are forks of it, so they
+        share its validated config and warm provider client, and start with the seeded
+        memory. On check-in an agent's memory is reset to the system prompt and seed messages.
+
+        :param template: Template every pooled agent is created from.
+        :param size: Agents created up front by `start()`.
+        :param max_size: Upper bound on agents; checkouts wait when all are in use.
+            Defaults to no bound (new agents are forked on demand).
+        :param warm_connections: Also open a pooled connection to the provider on start,
+            so the first request doesn't pay for TCP/TLS setup.
+        """
+        if max_size is not None and max_size < max(size, 1):
+            raise ValueError("max_size must be at least size and at least 1.")
+        self.template = template
+        self.size = size
+        self.max_size = max_size
+        self.warm_connections = warm_connections
+        self.stats = PoolStats()
+        self._prototype: Optional[SKAgent] = None
+        self._seed_history: List = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._members: Set[SKAgent] = set()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self) -> "AgentPool":
+        async with self._start_lock:
+            if self._started:
+                return self
+            self._prototype = await self.template.create()
+            self._seed_history = list(await self._prototype.adapter.memory.get_history(limit=10 ** 6))
+            await self._prototype.adapter.warm_up(connect=self.warm_connections)
+            for _ in range(self.size):
+                self._idle.put_nowait(await self._spawn())
+            self._started = True
+            logger.debug(f"Agent pool '{self.template.name}' started with {self.size} agent(s).")
+        return self
+
+    async def _spawn(self) -> SKAgent:
+        # Counted before forking so concurrent checkouts can't overshoot max_size
+        self.stats.created += 1
+        try:
+            agent = SKAgent(await self._prototype.adapter.fork(memory=self.template.memory_factory()))
+        except BaseException:
+            self.stats.created -= 1
+            raise
+        self._members.add(agent)
+        return agent
+
+    async def _reset(self, agent: SKAgent):
+        memory = agent.adapter.memory
+        await memory.clear_history()
+        if agent.adapter.refiner:
+            agent.adapter.refiner.forget(memory)
+        for message in self._seed_history:
+            await memory.add_message(MessageRole(message["role"]), message["content"])
+
+    async def checkout(self) -> SKAgent:
+        """
+        Returns an idle agent, forking a new one if none is idle and the pool may grow,
+        otherwise waiting for a check-in.
+        """
+        if not self._started:
+            await self.start()
+        start = time.perf_counter()
+        try:
+            agent = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if self.max_size is None or self.stats.created < self.max_size:
+                agent = await self._spawn()
+            else:
+                self.stats.waits += 1
+                agent = await self._idle.get()
+        self.stats.checkouts += 1
+        self.stats.checkout_seconds += time.perf_counter() - start
+        return agent
+
+    async def checkin(self, agent: SKAgent):
+        """
+        Resets the agent's memory to the seeded history and makes it available again.
+        """
+        if agent not in self._members:
+            raise ValueError(f"Agent '{agent.name}' was not checked out from this pool.")
+        try:
+            await self._reset(agent)
+        except Exception as e:
+            # Don't hand out an agent with unknown state; replace it with a fresh fork
+            logger.error(f"Replacing pooled agent '{agent.name}': memory reset failed: {e}")
+            self._members.discard(agent)
+            self.stats.created -= 1
+            agent = await self._spawn()
+        self._idle.put_nowait(agent)
+
+    @asynccontextmanager
+    async def agent(self) -> AsyncIterator[SKAgent]:
+        """
+        `async with pool.agent() as agent:` checks an agent out and back in.
+        """
+        agent = await self.checkout()
+        try:
+            yield agent
+        finally:
+            await self.checkin(agent)
+
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
@@ -1,4 +1,6 @@
+from typing import AsyncIterator
 from core.adapters.llm_adapter import LLMAdapter
+from core.adapters.registry import adapter_for_model
 from core.memory.in_memory_adapter import InMemoryAdapter
 from core.config.roles import MessageRole
 
@@ -7,7 +9,14 @@ class SKAgent:
         self.adapter = adapter
 
     @classmethod
-    async def create(cls, name: str, system_prompt: str, adapter_class, memory=None, **kwargs):
+    async def create(cls, name: str, system_prompt: str, adapter_class=None, memory=None, **kwargs):
+        """
+        Without `adapter_class`, the adapter registered for `kwargs["model"]` is used.
+        """
+        if adapter_class is None:
+            if not kwargs.get("model"):
+                raise ValueError("Pass adapter_class or a model to pick the adapter from.")
+            adapter_class = adapter_for_model(kwargs["model"])
         adapter = await adapter_class.create(
             name=name,
             system_message=system_prompt,
@@ -16,5 +25,29 @@ class SKAgent:
         )
         return cls(adapter)
 
-    async def run(self, input_text: str) -> str:
-        return await self.adapter.generate_response(input_text)
+    async def run(self, input_text: str, **request_options) -> str:
+        return await self.adapter.generate_response(input_text, **request_options)
+
+    async def fork(self) -> "SKAgent":
+        """
+        Returns an independent copy of this agent with its own copy of the memory.
+        """
+        return type(self)(await self.adapter.fork())
+
+    async def remember(self, input_text: str, output_text: str):
+        """
+        Records an exchange produced elsewhere (e.g. by a fork, or replayed from a run log)
+        in this agent's memory. With a refiner, the code in the output becomes the current
+        artifact, as if the agent had written it, and memory gets the compact reference.
+        """
+        if self.adapter.refiner:
+            output_text, _ = self.adapter.refiner.record(self.adapter.memory, output_text)
+        await self.adapter.memory.add_message(MessageRole.USER, input_text)
+        await self.adapter.memory.add_message(MessageRole.ASSISTANT, output_text)
+
+    def stream(self, input_text: str) -> AsyncIterator[str]:
+        return self.adapter.stream_response(input_text)
+
+    @property
+    def name(self) -> str:
+        return self.adapter.name
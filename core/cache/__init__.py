@@ -0,0 +1 @@
+from core.cache.response_cache import ResponseCache, CacheStats
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from core.memory.message import serialize_messages
+
+logger = logging.getLogger(__name__)
+
+# Replies that describe a failure rather than model output; caching them would replay the failure.
+UNCACHEABLE_PREFIXES = ("Error:", "No content returned by the model.")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, path: Optional[str] = None,
+                 max_disk_entries: int = 100_000):
+        """
+        Two-tier cache of LLM replies: an in-memory LRU in front of an optional SQLite file.
+
+        :param max_entries: Size of the in-memory LRU tier.
+        :param ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+        :param path: SQLite file for the on-disk tier, or None for memory only.
+        :param max_disk_entries: Size of the on-disk tier; least recently used rows are evicted.
+            Expired rows are dropped when read, and swept once the tier is full.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # Rows in the disk tier, counted once on connect and kept up to date by this instance
+        self._disk_rows = 0
+        # One thread owns the connection, which also serialises disk access
+        self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache") if path else None
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], messages: List[Dict], **extra) -> str:
+        """
+        Hashes everything that determines the reply: model, temperature and the exact
+        message list (plus any extra request options that change the output).
+        """
+        payload = {"model": model, "temperature": temperature, "messages": serialize_messages(messages), **extra}
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, created = entry
+            if not self._expired(created):
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._memory[key]
+
+        if self._disk_executor:
+            entry = await self._run_disk(self._disk_get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                return entry[0]
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        if not value or value.startswith(UNCACHEABLE_PREFIXES):
+            return
+        created = time.time()
+        self._remember(key, value, created)
+        self.stats.stores += 1
+        if self._disk_executor:
+            await self._run_disk(self._disk_set, key, value, created)
+
+    async def clear(self):
+        self._memory.clear()
+        if self._disk_executor:
+            await self._run_disk(self._disk_clear)
+
+    def close(self):
+        if self._disk_executor:
+            self._disk_executor.submit(self._disk_close).result()
+            self._disk_executor.shutdown()
+            self._disk_executor = None
+
+    def _remember(self, key: str, value: str, created: float):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _run_disk(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._disk_executor, fn, *args)
+
+    # The methods below run on the disk executor thread only.
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        db = self._connection()
+        row = db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            self._disk_rows -= db.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+            db.commit()
+            return None
+        db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return row[0], row[1]
+
+    def _disk_set(self, key: str, value: str, created: float):
+        db = self._connection()
+        exists = db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, created, created),
+        )
+        self._disk_rows += not exists
+        if self._disk_rows > self.max_disk_entries and self.ttl is not None:
+            self._disk_rows -= db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)).rowcount
+        overflow = self._disk_rows - self.max_disk_entries
+        if overflow > 0:
+            evicted = db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (overflow,),
+            ).rowcount
+            self._disk_rows -= evicted
+            self.stats.evictions += evicted
+        db.commit()
+
+    def _disk_clear(self):
+        db = self._connection()
+        db.execute("DELETE FROM responses")
+        db.commit()
+        self._disk_rows = 0
+
+    def _disk_close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1 +1,4 @@
-from core.code_builder.code_extractor import extract_code
\ No newline at end of file
+from core.code_builder.code_extractor import extract_code
+from core.code_builder.fence_parser import IncrementalCodeExtractor, CodeBlock, extract_code_stream, normalize_language
+from core.code_builder.patcher import apply_patch, apply_edit_blocks, apply_unified_diff, has_patch
+from core.code_builder.refiner import CodeRefiner, Artifact, RefinementStats
\ No newline at end of file
@@ -1,22 +1,29 @@
-import re
-import re
+from core.code_builder.fence_parser import IncrementalCodeExtractor, normalize_language
+from core import telemetry
 
 def extract_code(text, language="python"):
     """
     Extracts code of the specified language from a text.
 
     If the text is already clean (no backticks), return it as a single code block.
+    Language tags are matched through their aliases (```py, ```python3, ...). If no block
+    has the requested language, untagged blocks are returned instead.
 
     :param text: The text containing the code.
     :param language: The programming language of the code inside the backticks (default is "python").
     :return: List of extracted code snippets.
     """
     # If the text contains no code fences, assume it's already a clean code snippet
-    if "```" not in text:
+    if "```" not in text and "~~~" not in text:
         return [text.strip()]
-    
-    # Regex pattern that matches code blocks with the specified language
-    pattern = r'```' + re.escape(language) + r'\n(.*?)\n```'
-    matches = re.findall(pattern, text, re.DOTALL)
 
-    return [match.strip() for match in matches] if matches else [text.strip()]
+    with telemetry.span("code.extract", chars=len(text)):
+        extractor = IncrementalCodeExtractor()
+        blocks = extractor.feed(text) + extractor.close()
+
+    target = normalize_language(language)
+    matches = [block.code for block in blocks if block.language == target]
+    if not matches:
+        matches = [block.code for block in blocks if not block.language]
+
+    return matches if matches else [text.strip()]
@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+# Canonical language name -> tags models use for it in fence info strings
+LANGUAGE_ALIASES: Dict[str, tuple] = {
+    "python": ("python", "py", "python3", "py3", "pycon"),
+    "javascript": ("javascript", "js", "node", "jsx", "mjs"),
+    "typescript": ("typescript", "ts", "tsx"),
+    "bash": ("bash", "sh", "shell", "zsh", "console"),
+    "json": ("json", "jsonc"),
+    "yaml": ("yaml", "yml"),
+    "cpp": ("cpp", "c++", "cc", "cxx"),
+    "csharp": ("csharp", "cs", "c#"),
+    "go": ("go", "golang"),
+    "rust": ("rust", "rs"),
+}
+_ALIAS_TO_LANGUAGE = {alias: language for language, aliases in LANGUAGE_ALIASES.items() for alias in aliases}
+
+
+def normalize_language(tag: Optional[str]) -> str:
+    """
+    Maps a fence info string (e.g. "py", "Python3", "python title=x.py") to its canonical name.
+    Unknown tags are returned lower-cased; a missing tag gives "".
+    """
+    if not tag:
+        return ""
+    word = tag.split()[0].strip("{}.").lower()
+    return _ALIAS_TO_LANGUAGE.get(word, word)
+
+
+@dataclass
+class CodeBlock:
+    language: str
+    code: str
+    complete: bool = True
+
+
+class IncrementalCodeExtractor:
+    def __init__(self, language: Optional[str] = None):
+        """
+        Fenced code block parser that accepts text in arbitrary chunks.
+
+        Each block is emitted as soon as its closing fence arrives. Handles ``` and ~~~
+        fences with an optional language tag, CRLF line endings, and fences inside
+        blocks (a block only closes on a fence of the same character at least as long
+        as the one that opened it). Work is linear in the input size.
+
+        :param language: Only emit blocks in this language (aliases accepted); None emits all.
+        """
+        self.language = normalize_language(language) if language else None
+        self._partial: List[str] = []
+        self._fence: Optional[str] = None
+        self._block_language = ""
+        self._lines: List[str] = []
+
+    def feed(self, chunk: str) -> List[CodeBlock]:
+        """
+        Consumes a chunk and returns the blocks it completed.
+        """
+        if "\n" not in chunk:
+            self._partial.append(chunk)
+            return []
+
+        head, tail = chunk.rsplit("\n", 1)
+        self._partial.append(head)
+        text = "".join(self._partial)
+        self._partial = [tail] if tail else []
+
+        blocks = []
+        for line in text.split("\n"):
+            block = self._process_line(line.rstrip("\r"))
+            if block is not None:
+                blocks.append(block)
+        return blocks
+
+    def close(self) -> List[CodeBlock]:
+        """
+        Ends the input. Returns any block completed by the last line, plus an
+        unterminated block (complete=False) if the text stopped inside one.
+        """
+        blocks = []
+        if self._partial:
+            block = self._process_line("".join(self._partial).rstrip("\r"))
+            self._partial = []
+            if block is not None:
+                blocks.append(block)
+        if self._fence is not None:
+            block = self._finish_block(complete=False)
+            if block is not None:
+                blocks.append(block)
+        return blocks
+
+    def _process_line(self, line: str) -> Optional[CodeBlock]:
+        stripped = line.strip()
+        if self._fence is None:
+            fence = self._opening_fence(stripped)
+            if fence is not None:
+                self._fence = fence
+                self._block_language = normalize_language(stripped[len(fence):])
+                self._lines = []
+            return None
+
+        if stripped and stripped[0] == self._fence[0] and len(stripped) >= len(self._fence) \
+                and stripped == stripped[0] * len(stripped):
+            return self._finish_block(complete=True)
+        self._lines.append(line)
+        return None
+
+    @staticmethod
+    def _opening_fence(stripped: str) -> Optional[str]:
+        for char in "`~":
+            if stripped.startswith(char * 3):
+                length = len(stripped) - len(stripped.lstrip(char))
+                # A backtick fence's info string may not contain backticks (that's inline code)
+                if char == "`" and "`" in stripped[length:]:
+                    return None
+                return char * length
+        return None
+
+    def _finish_block(self, complete: bool) -> Optional[CodeBlock]:
+        block = CodeBlock(language=self._block_language, code="\n".join(self._lines).strip(), complete=complete)
+        self._fence = None
+        self._lines = []
+        if self.language is not None and block.language != self.language:
+            return None
+        return block
+
+
+async def extract_code_stream(deltas: AsyncIterator[str], language: Optional[str] = None) -> AsyncIterator[CodeBlock]:
+    """
+    Yields code blocks from a stream of deltas (e.g. `SKAgent.stream`) as soon as each one closes.
+    """
+    extractor = IncrementalCodeExtractor(language)
+    async for delta in deltas:
+        for block in extractor.feed(delta):
+            yield block
+    for block in extractor.close():
+        yield block
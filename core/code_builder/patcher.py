@@ -0,0 +1,136 @@
+import re
+from typing import List, Optional, Tuple
+from core.errors.patch_error import PatchError
+
+EDIT_BLOCK_FORMAT = (
+    "<<<<<<< SEARCH\n"
+    "exact lines from the current code\n"
+    "=======\n"
+    "the lines that replace them\n"
+    ">>>>>>> REPLACE"
+)
+
+_EDIT_BLOCK_PATTERN = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$", re.MULTILINE | re.DOTALL
+)
+_HUNK_HEADER_PATTERN = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+def has_patch(text: str) -> bool:
+    """
+    True if the text contains edit blocks or unified diff hunks.
+    """
+    text = text.replace("\r\n", "\n")
+    return bool(_EDIT_BLOCK_PATTERN.search(text)) or any(
+        _HUNK_HEADER_PATTERN.match(line) for line in text.splitlines()
+    )
+
+
+def _find_lines(lines: List[str], target: List[str], start: int = 0) -> List[int]:
+    """
+    Positions where `target` occurs in `lines`, ignoring trailing whitespace.
+    """
+    target = [line.rstrip() for line in target]
+    size = len(target)
+    return [index for index in range(start, len(lines) - size + 1)
+            if [line.rstrip() for line in lines[index:index + size]] == target]
+
+
+def apply_edit_blocks(code: str, text: str) -> str:
+    """
+    Applies SEARCH/REPLACE edit blocks in order. Each SEARCH section must match the code
+    exactly once (trailing whitespace is ignored); an empty one appends to the code.
+    """
+    text = text.replace("\r\n", "\n")
+    blocks = _EDIT_BLOCK_PATTERN.findall(text)
+    if not blocks:
+        raise PatchError("The reply contains no edit blocks.")
+
+    for number, (search, replace) in enumerate(blocks, start=1):
+        if not search.strip():
+            code = code + ("" if not code or code.endswith("\n") else "\n") + replace
+            continue
+        count = code.count(search)
+        if count == 1:
+            code = code.replace(search, replace, 1)
+            continue
+        if count > 1:
+            raise PatchError(f"SEARCH section of edit block {number} matches the code {count} times.")
+        lines = code.split("\n")
+        search_lines = search.rstrip("\n").split("\n")
+        positions = _find_lines(lines, search_lines)
+        if len(positions) != 1:
+            problem = "does not match" if not positions else f"matches {len(positions)} places in"
+            raise PatchError(f"SEARCH section of edit block {number} {problem} the current code.")
+        index = positions[0]
+        lines[index:index + len(search_lines)] = replace.rstrip("\n").split("\n") if replace.strip() else []
+        code = "\n".join(lines)
+    return code
+
+
+def _parse_hunks(text: str) -> List[Tuple[int, List[str], List[str]]]:
+    """
+    Returns (old start line, old lines, new lines) per hunk.
+    """
+    hunks = []
+    current: Optional[Tuple[int, List[str], List[str]]] = None
+    for line in text.replace("\r\n", "\n").split("\n"):
+        header = _HUNK_HEADER_PATTERN.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+        elif current is None or line.startswith(("--- ", "+++ ", "diff ", "```", "~~~")):
+            current = None
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        else:
+            # Context line; models often drop the leading space of blank lines
+            current[1].append(line[1:])
+            current[2].append(line[1:])
+    for _, old, new in hunks:
+        # A hunk ends before the blank line that separates it from what follows
+        while old and new and old[-1] == new[-1] == "":
+            old.pop()
+            new.pop()
+    return hunks
+
+
+def apply_unified_diff(code: str, text: str) -> str:
+    """
+    Applies unified diff hunks. Line numbers in hunk headers are only a hint: each hunk
+    is placed where its context and removed lines match, nearest to the stated line.
+    """
+    hunks = _parse_hunks(text)
+    if not hunks:
+        raise PatchError("The reply contains no diff hunks.")
+
+    lines = code.split("\n")
+    offset = 0
+    position = 0
+    for number, (start, old, new) in enumerate(hunks, start=1):
+        expected = max(0, start - 1 + offset)
+        if not old:
+            index = min(expected, len(lines))
+        else:
+            positions = _find_lines(lines, old, position)
+            if not positions:
+                raise PatchError(f"Hunk {number} (line {start}) does not match the current code.")
+            index = min(positions, key=lambda candidate: abs(candidate - expected))
+        lines[index:index + len(old)] = new
+        offset += len(new) - len(old)
+        position = index + len(new)
+    return "\n".join(lines)
+
+
+def apply_patch(code: str, text: str) -> str:
+    """
+    Applies a model reply made of SEARCH/REPLACE edit blocks or a unified diff to `code`.
+    Raises PatchError if the reply contains neither or they don't apply.
+    """
+    if _EDIT_BLOCK_PATTERN.search(text.replace("\r\n", "\n")):
+        return apply_edit_blocks(code, text)
+    return apply_unified_diff(code, text)
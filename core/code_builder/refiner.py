@@ -0,0 +1,176 @@
+import logging
+import re
+import weakref
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from core.code_builder.code_extractor import extract_code
+from core.code_builder.patcher import EDIT_BLOCK_FORMAT, apply_patch, has_patch
+from core.errors.patch_error import PatchError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("edit_blocks", "unified_diff")
+
+_FORMAT_INSTRUCTIONS = {
+    "edit_blocks": (
+        "Reply only with the changes, as one or more edit blocks:\n"
+        f"{EDIT_BLOCK_FORMAT}\n"
+        "Each SEARCH section must copy the current code exactly and match it only once."
+    ),
+    "unified_diff": (
+        "Reply only with the changes, as a unified diff (```diff) against the current code, "
+        "with a few lines of context around each change."
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Artifact:
+    version: int
+    code: str
+    language: str = "python"
+
+    @property
+    def ref(self) -> str:
+        return f"artifact v{self.version}"
+
+    @property
+    def lines(self) -> int:
+        return self.code.count("\n") + 1
+
+    def fenced(self) -> str:
+        return f"```{self.language}\n{self.code}\n```"
+
+    def reference(self, note: str = "") -> str:
+        """
+        What memory keeps in place of the code.
+        """
+        note = f", {note}" if note else ""
+        return f"[{self.ref}: {self.lines} lines of {self.language}{note}; sent in full with the next request]"
+
+
+@dataclass
+class RefinementStats:
+    turns: int = 0
+    patched: int = 0
+    rewrites: int = 0
+    fallbacks: int = 0
+
+    def summary(self) -> dict:
+        return {"turns": self.turns, "patched": self.patched, "rewrites": self.rewrites, "fallbacks": self.fallbacks}
+
+
+class CodeRefiner:
+    def __init__(self, format: str = "edit_blocks", min_lines: int = 20, language: str = "python",
+                 validate: bool = True):
+        """
+        Diff-based refinement of a generated program. Once a reply contains a program of at
+        least `min_lines` lines, it becomes the conversation's artifact: memory keeps a short
+        reference instead of the code, and follow-up requests send the current code once and
+        ask for edit blocks or a unified diff, which are applied locally.
+
+        :param format: "edit_blocks" (SEARCH/REPLACE) or "unified_diff"; replies in either
+            format are applied.
+        :param min_lines: Smaller programs are kept in memory and rewritten as usual.
+        :param language: Language of the code blocks tracked.
+        :param validate: Reject patched Python that no longer compiles, so the adapter falls
+            back to a full rewrite.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown refinement format '{format}'. Use one of: {FORMATS}")
+        self.format = format
+        self.min_lines = min_lines
+        self.language = language
+        self.validate = validate
+        self.stats = RefinementStats()
+        # Artifact per conversation; refiners are shared by forked and pooled agents
+        self._artifacts: "weakref.WeakKeyDictionary[object, Artifact]" = weakref.WeakKeyDictionary()
+
+    def current(self, conversation) -> Optional[Artifact]:
+        return self._artifacts.get(conversation)
+
+    def forget(self, conversation):
+        """
+        Drops the conversation's artifact, e.g. after its memory was cleared.
+        """
+        self._artifacts.pop(conversation, None)
+
+    def copy(self, source, target):
+        """
+        Gives a forked conversation the artifact of the one it was forked from.
+        """
+        artifact = self._artifacts.get(source)
+        if artifact is not None:
+            self._artifacts[target] = artifact
+
+    def edit_request(self, artifact: Artifact, instructions: str, edits: bool = True) -> str:
+        """
+        The user message actually sent for a follow-up turn: the current code, the
+        instructions and the reply format. Memory keeps only the instructions.
+        """
+        reply_format = _FORMAT_INSTRUCTIONS[self.format] if edits else "Reply with the complete updated code."
+        return f"Current code ({artifact.ref}):\n{artifact.fenced()}\n\n{instructions}\n\n{reply_format}"
+
+    def rewrite_request(self, error: PatchError) -> str:
+        """
+        Follow-up asking for the complete code after an edit reply could not be applied.
+        """
+        self.stats.fallbacks += 1
+        return f"Your changes could not be applied: {error}\nReply with the complete updated code instead."
+
+    def is_patch(self, reply: str) -> bool:
+        return has_patch(reply)
+
+    def apply(self, conversation, artifact: Artifact, reply: str) -> Artifact:
+        """
+        Applies an edit reply to `artifact` and makes the result the conversation's artifact.
+        Raises PatchError if the edits don't apply or the result doesn't compile.
+        """
+        code = apply_patch(artifact.code, reply)
+        if code == artifact.code:
+            raise PatchError("The edits don't change the code.")
+        if self.validate and self.language == "python" and self._compiles(artifact.code):
+            try:
+                compile(code, artifact.ref, "exec")
+            except (SyntaxError, ValueError) as e:
+                raise PatchError(f"The patched code does not compile: {getattr(e, 'msg', e)} "
+                                 f"(line {getattr(e, 'lineno', '?')}).")
+        self.stats.turns += 1
+        self.stats.patched += 1
+        return self._commit(conversation, code, artifact.version + 1)
+
+    def record(self, conversation, reply: str) -> Tuple[str, Optional[Artifact]]:
+        """
+        Handles a reply carrying complete code: if it holds a program big enough to track,
+        it becomes the conversation's new artifact. Returns the text for memory (the reply
+        with the code replaced by a reference) and the artifact, if any.
+        """
+        if "```" not in reply and "~~~" not in reply:
+            return reply, None
+        code = extract_code(reply, self.language)[0]
+        if code.count("\n") + 1 < self.min_lines or code == reply.strip():
+            return reply, None
+
+        previous = self._artifacts.get(conversation)
+        if previous is not None:
+            self.stats.turns += 1
+            self.stats.rewrites += 1
+        artifact = self._commit(conversation, code, previous.version + 1 if previous else 1)
+        # Replace the whole fenced block, fences included
+        block = re.compile(r"(`{3,}|~{3,})[^\n]*\n" + re.escape(code) + r"\s*\1")
+        compact, replaced = block.subn(lambda match: artifact.reference(), reply, count=1)
+        return (compact if replaced else artifact.reference()), artifact
+
+    def _commit(self, conversation, code: str, version: int) -> Artifact:
+        artifact = Artifact(version, code, self.language)
+        self._artifacts[conversation] = artifact
+        logger.debug(f"Refiner: {artifact.ref} ({artifact.lines} lines).")
+        return artifact
+
+    @staticmethod
+    def _compiles(code: str) -> bool:
+        try:
+            compile(code, "<artifact>", "exec")
+            return True
+        except (SyntaxError, ValueError):
+            return False
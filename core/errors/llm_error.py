@@ -0,0 +1,51 @@
+from typing import Optional
+
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+class LLMRequestError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: Optional[bool] = None,
+                 retry_after: Optional[float] = None):
+        """
+        :param message: Human readable reason for the failure.
+        :param status_code: HTTP status returned by the provider, if any.
+        :param retryable: Whether retrying may succeed. Defaults to True for transport
+            errors (no status) and for 408/409/429/5xx responses.
+        :param retry_after: Seconds the provider asked us to wait, if it said so.
+        """
+        self.message = message
+        self.status_code = status_code
+        self.retryable = retryable if retryable is not None else (status_code is None or status_code in RETRYABLE_STATUS_CODES)
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+    def __str__(self):
+        if self.status_code is None:
+            return self.message
+        return f"{self.message} (status {self.status_code})"
+
+
+class NoHealthyBackendError(LLMRequestError):
+    def __init__(self, message: str, errors: Optional[list] = None):
+        """
+        Raised by AdapterPool when every backend is unavailable or failed the request.
+
+        :param errors: (backend name, LLMRequestError) pairs for the attempts that were made.
+        """
+        self.errors = errors or []
+        super().__init__(message, retryable=True)
+
+    def __str__(self):
+        if not self.errors:
+            return self.message
+        details = "; ".join(f"{name}: {error}" for name, error in self.errors)
+        return f"{self.message} ({details})"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given in seconds; HTTP-date values are ignored.
+    """
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
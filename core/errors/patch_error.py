@@ -0,0 +1,8 @@
+class PatchError(Exception):
+    def __init__(self, message: str):
+        """
+        Raised when a model's edit blocks or diff can't be applied to the code they target,
+        or the patched code doesn't compile.
+        """
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,10 @@
+class ReplayError(Exception):
+    def __init__(self, message: str, run_id: str, step: str = None):
+        """
+        Raised in offline replay when the run log has no recorded result for a step,
+        i.e. the orchestrator took a path the recorded run didn't.
+        """
+        self.message = message
+        self.run_id = run_id
+        self.step = step
+        super().__init__(self.message)
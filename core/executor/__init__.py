@@ -0,0 +1,2 @@
+from core.executor.sandbox import SandboxExecutor, SandboxLimits, ExecutionResult
+from core.executor.static_checker import StaticChecker, StaticReport, StaticIssue, check_source
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SOLUTION_FILE = "solution.py"
+TESTS_FILE = "test_solution.py"
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    timeout: float = 10.0
+    cpu_seconds: int = 5
+    memory_mb: int = 512
+    max_output_bytes: int = 64_000
+
+
+@dataclass
+class ExecutionResult:
+    status: str  # "passed", "failed", "timeout" or "error"
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    duration: float
+    tests_run: bool = False
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "passed"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self, max_chars: int = 2000) -> str:
+        """
+        Short plain-text report, suitable for a verifier prompt.
+        """
+        what = "Code and tests" if self.tests_run else "Code"
+        lines = [f"Execution result: {what} {self.status} (exit code {self.returncode}, {self.duration:.2f}s)."]
+        if self.stdout.strip():
+            lines.append(f"stdout:\n{self.stdout.strip()[-max_chars:]}")
+        if self.stderr.strip():
+            lines.append(f"stderr:\n{self.stderr.strip()[-max_chars:]}")
+        return "\n".join(lines)
+
+
+def _warm_up():
+    """
+    Pool initializer: imports what generated code commonly uses, so every job
+    forked from this worker starts with those modules already loaded.
+    """
+    import json, re, math, collections, itertools, functools, unittest, dataclasses, typing  # noqa: F401
+
+
+def _apply_limits(limits: SandboxLimits):
+    import resource
+    memory = limits.memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits.max_output_bytes * 16, limits.max_output_bytes * 16))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _run_child(workdir: str, has_tests: bool, limits: SandboxLimits):
+    """
+    Body of the forked job process. Never returns.
+    """
+    code = 1
+    try:
+        os.setsid()
+        os.chdir(workdir)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(os.open("stdout.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC), 1)
+        os.dup2(os.open("stderr.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC), 2)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", closefd=False)
+        _apply_limits(limits)
+
+        import runpy
+        import traceback
+        sys.path.insert(0, workdir)
+        sys.argv = [SOLUTION_FILE]
+        try:
+            runpy.run_path(SOLUTION_FILE, run_name="__main__")
+            if has_tests:
+                sys.argv = [TESTS_FILE]
+                runpy.run_path(TESTS_FILE, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def _read_output(path: str, limit: int) -> str:
+    try:
+        with open(path, "rb") as file:
+            return file.read(limit).decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def _wait(pid: int, timeout: float) -> Optional[int]:
+    """
+    Waits for the job process; kills its process group and returns None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        finished, status = os.waitpid(pid, os.WNOHANG)
+        if finished:
+            return os.waitstatus_to_exitcode(status)
+        if time.monotonic() >= deadline:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 0.02)
+
+
+def _execute(code: str, tests: Optional[str], limits: SandboxLimits) -> dict:
+    """
+    Runs one job inside a pool worker and returns an ExecutionResult as a dict.
+
+    On POSIX the warm worker forks a child per job, which applies the CPU, memory and
+    file-size limits to itself before running the code; elsewhere a fresh isolated
+    interpreter is started with only the wall-clock timeout enforced.
+    """
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    start = time.perf_counter()
+    try:
+        with open(os.path.join(workdir, SOLUTION_FILE), "w", encoding="utf-8") as file:
+            file.write(code)
+        if tests:
+            with open(os.path.join(workdir, TESTS_FILE), "w", encoding="utf-8") as file:
+                file.write(tests)
+
+        if hasattr(os, "fork"):
+            pid = os.fork()
+            if pid == 0:
+                _run_child(workdir, bool(tests), limits)
+            returncode = _wait(pid, limits.timeout)
+            stdout = _read_output(os.path.join(workdir, "stdout.txt"), limits.max_output_bytes)
+            stderr = _read_output(os.path.join(workdir, "stderr.txt"), limits.max_output_bytes)
+        else:
+            command = [sys.executable, "-I", "-c",
+                       f"import runpy; runpy.run_path({SOLUTION_FILE!r}, run_name='__main__')"
+                       + (f"; runpy.run_path({TESTS_FILE!r}, run_name='__main__')" if tests else "")]
+            try:
+                completed = subprocess.run(command, cwd=workdir, capture_output=True, timeout=limits.timeout,
+                                           stdin=subprocess.DEVNULL)
+                returncode = completed.returncode
+                stdout = completed.stdout[:limits.max_output_bytes].decode("utf-8", errors="replace")
+                stderr = completed.stderr[:limits.max_output_bytes].decode("utf-8", errors="replace")
+            except subprocess.TimeoutExpired:
+                returncode, stdout, stderr = None, "", ""
+
+        if returncode is None or returncode == -getattr(signal, "SIGXCPU", 0):
+            status = "timeout"
+        elif returncode == 0:
+            status = "passed"
+        else:
+            status = "failed"
+        return ExecutionResult(status, returncode, stdout, stderr, time.perf_counter() - start, bool(tests)).to_dict()
+    except Exception as e:
+        return ExecutionResult("error", None, "", f"Sandbox error: {e}", time.perf_counter() - start, bool(tests)).to_dict()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class SandboxExecutor:
+    def __init__(self, workers: Optional[int] = None, limits: SandboxLimits = SandboxLimits()):
+        """
+        Runs generated code for real in a pool of pre-started, warm worker processes.
+
+        Each job gets its own temporary directory and process with CPU, memory and
+        wall-clock limits, so many candidates can be executed in parallel without
+        affecting the caller. This isolates resources, not the network or filesystem;
+        run the service itself in a container if the code is untrusted.
+
+        :param workers: Number of worker processes; defaults to the CPU count.
+        :param limits: Default limits applied to every job.
+        """
+        self.workers = workers or os.cpu_count() or 2
+        self.limits = limits
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # start() may run in several threads at once (see run())
+        self._start_lock = threading.Lock()
+
+    def start(self) -> "SandboxExecutor":
+        """
+        Starts and warms the workers up front so the first jobs don't pay interpreter startup.
+        Blocks until the workers are up; `run()` calls it off the event loop if needed.
+        """
+        with self._start_lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                # forkserver gives clean single-threaded workers even if the caller runs threads
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_warm_up)
+                for future in [pool.submit(time.sleep, 0) for _ in range(self.workers)]:
+                    future.result()
+                self._pool = pool
+        return self
+
+    async def run(self, code: str, tests: Optional[str] = None, limits: Optional[SandboxLimits] = None) -> ExecutionResult:
+        """
+        Executes `code` (then `tests`, if given, in the same process with the code importable
+        as `solution`) and returns a structured result.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pool is None:
+            # Starting the workers blocks for a while; keep it off the event loop
+            await loop.run_in_executor(None, self.start)
+        result = await loop.run_in_executor(self._pool, _execute, code, tests, limits or self.limits)
+        return ExecutionResult(**result)
+
+    async def run_many(self, jobs: Iterable[Tuple[str, Optional[str]]]) -> List[ExecutionResult]:
+        """
+        Executes (code, tests) pairs in parallel across the pool.
+        """
+        return list(await asyncio.gather(*(self.run(code, tests) for code, tests in jobs)))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
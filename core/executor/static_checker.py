@@ -0,0 +1,267 @@
+import ast
+import asyncio
+import importlib.util
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from core.code_builder import extract_code
+
+logger = logging.getLogger(__name__)
+
+# Calls that generated code should not make: arbitrary code execution and shelling out.
+DEFAULT_FORBIDDEN_CALLS = frozenset({
+    "eval", "exec", "__import__",
+    "os.system", "os.popen", "os.execv", "os.execvp", "os.spawnl", "os.fork",
+    "subprocess.run", "subprocess.call", "subprocess.check_call", "subprocess.check_output", "subprocess.Popen",
+    "shutil.rmtree",
+})
+
+# Replies that are a failure report rather than code, e.g. what `model_request` returns on errors
+_NOT_CODE_PATTERN = re.compile(r"^(error\s*:|no content returned\b)", re.IGNORECASE)
+_TOOL_LINE_PATTERN = re.compile(r"^[^:\n]+:(\d+):(?:(\d+):)?\s*(?:error:\s*)?(.*)$")
+
+
+@dataclass(frozen=True)
+class StaticIssue:
+    check: str  # "not-code", "syntax", "compile", "forbidden-import", "forbidden-call", "import", "lint" or "type"
+    message: str
+    line: Optional[int] = None
+    severity: str = "error"  # "error" blocks the code, "warning" is only reported
+
+    def __str__(self) -> str:
+        where = f"line {self.line}: " if self.line else ""
+        return f"{where}[{self.check}] {self.message}"
+
+
+@dataclass
+class StaticReport:
+    issues: List[StaticIssue] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    @property
+    def errors(self) -> List[StaticIssue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self, max_issues: int = 10) -> str:
+        """
+        One line per issue, errors first.
+        """
+        issues = sorted(self.issues, key=lambda issue: issue.severity != "error")
+        lines = [f"Static checks {'passed' if self.passed else 'failed'} "
+                 f"({len(self.errors)} error(s), {len(self.issues) - len(self.errors)} warning(s))."]
+        lines += [f"- {issue}" for issue in issues[:max_issues]]
+        if len(issues) > max_issues:
+            lines.append(f"- ... and {len(issues) - max_issues} more")
+        return "\n".join(lines)
+
+    def feedback(self) -> str:
+        """
+        Concise instructions for the developer to fix the code.
+        """
+        return (f"Your code did not pass the automatic checks.\n{self.summary()}\n"
+                "Fix these issues and reply with the complete corrected code.")
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _scan(tree: ast.AST, forbidden_imports: FrozenSet[str], forbidden_calls: FrozenSet[str],
+          check_imports: bool) -> List[StaticIssue]:
+    """
+    Reports forbidden or unresolvable imports and forbidden calls, following import aliases
+    (`import subprocess as sp; sp.run(...)`, `from os import system`).
+    """
+    issues = []
+    aliases: Dict[str, str] = {}
+    modules: List[Tuple[str, int]] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                modules.append((alias.name, node.lineno))
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+            modules.append((node.module, node.lineno))
+
+    for module, line in modules:
+        root = module.split(".")[0]
+        if module in forbidden_imports or root in forbidden_imports:
+            issues.append(StaticIssue("forbidden-import", f"importing '{module}' is not allowed", line))
+        elif check_imports and root not in sys.builtin_module_names and importlib.util.find_spec(root) is None:
+            issues.append(StaticIssue("import", f"module '{root}' is not installed", line, "warning"))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            name = _dotted_name(node.func)
+            if name is None:
+                continue
+            head, _, rest = name.partition(".")
+            resolved = f"{aliases[head]}.{rest}" if head in aliases and rest else aliases.get(head, name)
+            if resolved in forbidden_calls:
+                issues.append(StaticIssue("forbidden-call", f"calling '{resolved}()' is not allowed", node.lineno))
+    return issues
+
+
+def check_source(code: str, forbidden_imports: Iterable[str] = (),
+                 forbidden_calls: Iterable[str] = DEFAULT_FORBIDDEN_CALLS, check_imports: bool = True) -> StaticReport:
+    """
+    Runs the in-process checks: AST parse, compile and the import/call scan.
+    Stops at the first check that fails, since later checks need a valid tree.
+    """
+    start = time.perf_counter()
+    report = StaticReport()
+    stripped = code.strip()
+    if not stripped or _NOT_CODE_PATTERN.match(stripped):
+        first_line = stripped.splitlines()[0][:200] if stripped else "empty reply"
+        report.issues.append(StaticIssue("not-code", f"the reply contains no code: {first_line}"))
+    else:
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError) as e:
+            text = (getattr(e, "text", None) or "").strip()[:80]
+            message = getattr(e, "msg", str(e)) + (f" ({text!r})" if text else "")
+            report.issues.append(StaticIssue("syntax", message, getattr(e, "lineno", None)))
+        else:
+            try:
+                # Catches what the parser accepts but the compiler doesn't ('return' outside function, ...)
+                compile(tree, "<generated>", "exec")
+            except (SyntaxError, ValueError) as e:
+                report.issues.append(StaticIssue("compile", getattr(e, "msg", str(e)), getattr(e, "lineno", None)))
+            else:
+                report.issues += _scan(tree, frozenset(forbidden_imports), frozenset(forbidden_calls), check_imports)
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def _run_tool(command: List[str], code: str, check: str, timeout: float) -> List[StaticIssue]:
+    """
+    Runs an external checker on a temporary copy of the code and parses its `file:line:col: message` output.
+    """
+    fd, path = tempfile.mkstemp(suffix=".py", prefix="static-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(code)
+        completed = subprocess.run([*command, path], capture_output=True, text=True, timeout=timeout,
+                                   stdin=subprocess.DEVNULL)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Static check '{check}' could not run: {e}")
+        return []
+    finally:
+        os.unlink(path)
+
+    issues = []
+    for line in completed.stdout.splitlines():
+        match = _TOOL_LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        message = match.group(3).strip()
+        # Undefined names fail at runtime; everything else is style or a likely false positive
+        severity = "error" if check == "lint" and "undefined name" in message.lower() else "warning"
+        issues.append(StaticIssue(check, message, int(match.group(1)), severity))
+    return issues
+
+
+def _lint_command() -> Optional[List[str]]:
+    if shutil.which("ruff"):
+        return ["ruff", "check", "--quiet", "--output-format=concise", "--select=F", "--no-cache"]
+    if importlib.util.find_spec("pyflakes") is not None:
+        return [sys.executable, "-m", "pyflakes"]
+    return None
+
+
+def _type_command() -> Optional[List[str]]:
+    if importlib.util.find_spec("mypy") is not None:
+        return [sys.executable, "-m", "mypy", "--ignore-missing-imports", "--no-error-summary",
+                "--show-column-numbers", "--no-incremental"]
+    return None
+
+
+class StaticChecker:
+    def __init__(self, forbidden_imports: Iterable[str] = (), forbidden_calls: Iterable[str] = DEFAULT_FORBIDDEN_CALLS,
+                 check_imports: bool = True, lint: bool = False, type_check: bool = False, workers: int = 4,
+                 tool_timeout: float = 30.0):
+        """
+        Fast local checks on generated code, run before it is sent to an LLM reviewer:
+        AST parse, compile, forbidden import/call scan and, optionally, lint and type checks.
+
+        The checks run in a thread pool so they don't block the event loop; lint (ruff or
+        pyflakes) and type checks (mypy) run as subprocesses in parallel, and are skipped
+        with a warning when the tool is not installed.
+
+        :param forbidden_imports: Modules the code must not import (e.g. {"jwt"}).
+        :param forbidden_calls: Dotted call names the code must not make; see DEFAULT_FORBIDDEN_CALLS.
+        :param check_imports: Warn about imports that are not installed locally.
+        :param lint: Run a linter; undefined names are reported as errors.
+        :param type_check: Run mypy; its findings are reported as warnings.
+        :param workers: Threads for the checks and tool subprocesses.
+        :param tool_timeout: Seconds an external tool may run.
+        """
+        self.forbidden_imports = frozenset(forbidden_imports)
+        self.forbidden_calls = frozenset(forbidden_calls)
+        self.check_imports = check_imports
+        self.tool_timeout = tool_timeout
+        self.workers = workers
+        self._tools: List[Tuple[str, List[str]]] = []
+        for check, enabled, command in (("lint", lint, _lint_command), ("type", type_check, _type_command)):
+            if not enabled:
+                continue
+            found = command()
+            if found is None:
+                logger.warning(f"Static check '{check}' is enabled but no tool for it is installed; skipping it.")
+            else:
+                self._tools.append((check, found))
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="static-check")
+        return self._pool
+
+    async def run(self, text: str) -> StaticReport:
+        """
+        Checks the first Python block of a model reply (or the reply itself when it has no fences).
+        """
+        start = time.perf_counter()
+        code = extract_code(text)[0]
+        loop = asyncio.get_running_loop()
+        report = await loop.run_in_executor(self._executor(), check_source, code, self.forbidden_imports,
+                                            self.forbidden_calls, self.check_imports)
+        if report.passed and self._tools:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor(), _run_tool, command, code, check, self.tool_timeout)
+                for check, command in self._tools
+            ))
+            for issues in results:
+                report.issues += issues
+        report.duration = time.perf_counter() - start
+        return report
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
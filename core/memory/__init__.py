@@ -1 +1,7 @@
 from core.memory.in_memory_adapter import InMemoryAdapter
+from core.memory.token_window_adapter import TokenWindowMemoryAdapter
+from core.memory.persistent_memory_adapter import PersistentMemoryAdapter
+from core.memory.message_store import BaseMessageStore
+from core.memory.sqlite_message_store import SQLiteMessageStore
+from core.memory.compacting_memory_adapter import CompactingMemoryAdapter
+from core.memory.message import Message, HistoryView, serialize_messages
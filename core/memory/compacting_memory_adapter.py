@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from core.config.roles import MessageRole
+from core.memory.message import Message
+from core.memory.token_counter import count_message_tokens
+from core.memory.token_window_adapter import TokenWindowMemoryAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_PROMPT = (
+    "Summarize the conversation below for an assistant that will continue it. "
+    "Keep requirements, decisions, names, file names and unresolved issues; drop pleasantries. "
+    "Be concise."
+)
+
+class CompactingMemoryAdapter(TokenWindowMemoryAdapter):
+    def __init__(self, summarizer, compact_at: int = 3000, keep_recent_tokens: int = 1000,
+                 max_tokens: int = 8192, counter: Callable[[str], int] = None,
+                 summary_prompt: str = DEFAULT_SUMMARY_PROMPT):
+        """
+        Token-window memory that folds older turns into a running summary instead of dropping them.
+
+        Once the history grows past `compact_at` tokens, the oldest turns (everything but the
+        most recent `keep_recent_tokens`) are summarised in a background task by `summarizer`,
+        typically a small, cheap model. Reads never wait for it: until the summary is ready the
+        full window is returned, and `max_tokens` stays a hard cap.
+
+        :param summarizer: LLMAdapter used for summaries; only its `model_request` is called,
+            so its own memory is left untouched.
+        :param compact_at: History size, in tokens, that triggers a compaction.
+        :param keep_recent_tokens: Tokens of the most recent turns kept verbatim.
+        :param max_tokens: Hard budget; oldest turns are evicted if compaction falls behind.
+        :param counter: Function returning the token count of a string.
+        :param summary_prompt: Instructions given to the summarizer.
+        """
+        super().__init__(max_tokens=max_tokens, counter=counter)
+        if keep_recent_tokens >= compact_at:
+            raise ValueError("keep_recent_tokens must be smaller than compact_at.")
+        self.summarizer = summarizer
+        self.compact_at = compact_at
+        self.keep_recent_tokens = keep_recent_tokens
+        self.summary_prompt = summary_prompt
+        self.summary_message: Optional[Message] = None
+        self.summary_tokens = 0
+        self.compactions = 0
+        # Tokens of the history returned on each read, for per-turn accounting
+        self.prompt_token_log: Deque[int] = deque(maxlen=10_000)
+        self._compaction: Optional[asyncio.Task] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.system_tokens + self.summary_tokens + self.window_tokens
+
+    async def _add_message(self, role: MessageRole, content: str):
+        await super()._add_message(role, content)
+        if self.total_tokens > self.compact_at and (self._compaction is None or self._compaction.done()):
+            self._compaction = asyncio.create_task(self._compact())
+
+    async def _compact(self):
+        # Take the oldest messages, leaving at least `keep_recent_tokens` verbatim
+        folded: List[Message] = []
+        remaining = self.window_tokens
+        for message, tokens in self.messages:
+            if remaining - tokens < self.keep_recent_tokens:
+                break
+            folded.append(message)
+            remaining -= tokens
+        if not folded:
+            return
+
+        transcript = "\n\n".join(f"{message['role']}: {message['content']}" for message in folded)
+        if self.summary_message:
+            transcript = f"{self.summary_message['content']}\n\n{transcript}"
+        try:
+            summary = await self.summarizer.model_request([
+                {"role": MessageRole.SYSTEM.value, "content": self.summary_prompt},
+                {"role": MessageRole.USER.value, "content": transcript},
+            ])
+        except Exception as e:
+            logger.error(f"Conversation compaction failed: {e}")
+            return
+        if not summary or summary.startswith("Error:"):
+            logger.warning(f"Conversation compaction skipped: {summary}")
+            return
+
+        # Drop the folded messages that are still in the window; some may already have
+        # been evicted by the hard budget while the summary was being written.
+        folded_ids = {id(message) for message in folded}
+        while self.messages and id(self.messages[0][0]) in folded_ids:
+            _, tokens = self.messages.popleft()
+            self.window_tokens -= tokens
+
+        content = f"Summary of the earlier conversation:\n{summary}"
+        self.summary_message = Message(MessageRole.SYSTEM.value, content)
+        self.summary_tokens = count_message_tokens(content, self.counter)
+        self.compactions += 1
+        logger.debug(f"Compacted {len(folded)} message(s) into a {self.summary_tokens}-token summary.")
+
+    async def wait_for_compaction(self):
+        """
+        Waits for a running compaction, if any. Useful for tests and benchmarks.
+        """
+        if self._compaction is not None:
+            await asyncio.shield(self._compaction)
+
+    async def get_history(self, limit: Optional[int] = None) -> List[Message]:
+        history = await super().get_history(limit)
+        if self.summary_message:
+            history.insert(1 if self.system_message else 0, self.summary_message)
+        self.prompt_token_log.append(self.total_tokens)
+        return history
+
+    async def clear_history(self):
+        if self._compaction is not None:
+            self._compaction.cancel()
+            self._compaction = None
+        await super().clear_history()
+        self.summary_message = None
+        self.summary_tokens = 0
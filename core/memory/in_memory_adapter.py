@@ -1,6 +1,8 @@
-from typing import List, Dict
+import sys
+from typing import List
 from core.config.roles import MessageRole
 from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.memory.message import HistoryView, Message
 
 class InMemoryAdapter(BaseMemoryAdapter):
     def __init__(self, max_history: int = 10):
@@ -10,27 +12,33 @@ class InMemoryAdapter(BaseMemoryAdapter):
         :param max_history: Maximum number of messages to store in memory.
         """
         self.max_history = max_history
-        self.messages: List[Dict] = []
+        self.messages: List[Message] = []
 
     async def _add_message(self, role: MessageRole, content: str):
         """
         Adds a message to memory with strict role validation.
         """
-        # Store the message in the in-memory list
-        self.messages.append({"role": role.value, "content": content})
-        
-        # Ensure the memory doesn't exceed the max history
-        if len(self.messages) > self.max_history:
-            self.messages.pop(0)
+        if role is MessageRole.SYSTEM:
+            # Agents created from the same prompt share one string
+            content = sys.intern(content)
+        self.messages.append(Message(role.value, content))
 
-    async def get_history(self, limit: int = 10) -> List[Dict]:
+        # Ensure the memory doesn't exceed the max history. Old messages are dropped a few
+        # at a time into a new list, never in place, so views from get_history stay valid.
+        if len(self.messages) > self.max_history + max(1, self.max_history // 4):
+            self.messages = self.messages[-self.max_history:]
+
+    async def get_history(self, limit: int = 10) -> HistoryView:
         """
-        Returns the last N messages from memory.
+        Returns a read-only view of the last N messages in memory.
         """
-        return self.messages[-limit:].copy()
+        messages = self.messages
+        stop = len(messages)
+        start = stop - (limit if limit < self.max_history else self.max_history)
+        return HistoryView(messages, start if start > 0 else 0, stop)
 
     async def clear_history(self):
         """
         Clears the entire message history.
         """
-        self.messages.clear()
+        self.messages = []
@@ -0,0 +1,96 @@
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+
+class Message:
+    """
+    Chat message record. Uses `__slots__` instead of a per-message dict, and reads like
+    the {"role": ..., "content": ...} dict it replaces. Treated as immutable, since
+    history views share the records with the memory.
+    """
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+    def __getitem__(self, key: str) -> str:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ("role", "content")
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Message):
+            return self.role == other.role and self.content == other.content
+        if isinstance(other, dict):
+            return other == self.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content!r})"
+
+
+class HistoryView(Sequence):
+    """
+    Read-only window over a memory's message list, handed out instead of a copy.
+
+    Memories only ever append to a list they have shared; trimming replaces the list,
+    so a view keeps showing the messages it was created with.
+    """
+    __slots__ = ("_messages", "_start", "_stop")
+
+    def __init__(self, messages: List[Message], start: int = 0, stop: int = None):
+        self._messages = messages
+        self._start = start
+        self._stop = len(messages) if stop is None else stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return HistoryView(self._messages, self._start + start, self._start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._messages[self._start + index]
+
+    def __iter__(self) -> Iterator[Message]:
+        return islice(self._messages, self._start, self._stop)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HistoryView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HistoryView({list(self)!r})"
+
+    def to_list(self) -> List[Dict[str, str]]:
+        return serialize_messages(self)
+
+
+def serialize_messages(messages: Iterable[Union[Message, Dict]]) -> List[Dict]:
+    """
+    Converts a history (Message records, plain dicts or a HistoryView) into the list of
+    dicts that provider APIs and JSON expect.
+    """
+    return [message.to_dict() if isinstance(message, Message) else message for message in messages]
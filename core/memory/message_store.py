@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class BaseMessageStore(ABC):
+    """
+    Storage seam for persistent conversation memory, keyed by conversation id.
+
+    Implementations only need ordered append, last-N reads and per-conversation
+    clear, which map directly onto SQL tables (see SQLiteMessageStore) or onto a
+    Redis-style list per conversation (RPUSH / LRANGE -N -1 / DEL).
+    """
+
+    @abstractmethod
+    async def append(self, conversation_id: str, role: str, content: str):
+        """
+        Appends a message. Implementations may buffer writes, but a later
+        `fetch_last` for the same conversation must see it.
+        """
+        pass
+
+    @abstractmethod
+    async def fetch_last(self, conversation_id: str, limit: int) -> List[Dict]:
+        """
+        Returns the last `limit` messages of the conversation, oldest first.
+        """
+        pass
+
+    @abstractmethod
+    async def clear(self, conversation_id: str):
+        pass
+
+    async def flush(self):
+        """
+        Makes buffered writes durable. No-op for unbuffered stores.
+        """
+        pass
+
+    async def close(self):
+        await self.flush()
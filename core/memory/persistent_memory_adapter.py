@@ -0,0 +1,62 @@
+from typing import List, Dict, Optional
+from core.config.roles import MessageRole
+from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.memory.message_store import BaseMessageStore
+
+class PersistentMemoryAdapter(BaseMemoryAdapter):
+    def __init__(self, store: BaseMessageStore, conversation_id: str):
+        """
+        Conversation memory kept in a shared message store, so it survives restarts
+        and can be read by other worker processes.
+
+        :param store: Backend holding the messages, e.g. SQLiteMessageStore; may be shared by many adapters.
+        :param conversation_id: Key of this conversation (e.g. an agent or session id).
+
+        The system message is pinned: it is kept under its own key, stored again only when
+        it changes (so an agent re-created on every restart doesn't pile up copies), and
+        always returned first, however long the conversation gets.
+        """
+        self.store = store
+        self.conversation_id = conversation_id
+        self._system_key = f"{conversation_id}:system"
+        self._system_message: Optional[str] = None
+        self._system_loaded = False
+
+    async def _system(self) -> Optional[str]:
+        if not self._system_loaded:
+            stored = await self.store.fetch_last(self._system_key, 1)
+            self._system_message = stored[0]["content"] if stored else None
+            self._system_loaded = True
+        return self._system_message
+
+    async def _add_message(self, role: MessageRole, content: str):
+        if role is not MessageRole.SYSTEM:
+            await self.store.append(self.conversation_id, role.value, content)
+            return
+        if content == await self._system():
+            return
+        await self.store.clear(self._system_key)
+        await self.store.append(self._system_key, role.value, content)
+        self._system_message = content
+
+    async def get_history(self, limit: int = 10) -> List[Dict]:
+        """
+        Returns the system message followed by the last N messages of the conversation.
+        """
+        system = await self._system()
+        history = await self.store.fetch_last(self.conversation_id, limit)
+        if system is None:
+            return history
+        # Conversations written before the system message was pinned still hold it inline
+        return [{"role": MessageRole.SYSTEM.value, "content": system},
+                *(message for message in history
+                  if not (message["role"] == MessageRole.SYSTEM.value and message["content"] == system))]
+
+    async def clear_history(self):
+        """
+        Clears the conversation, including the system message.
+        """
+        await self.store.clear(self.conversation_id)
+        await self.store.clear(self._system_key)
+        self._system_message = None
+        self._system_loaded = True
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from core.memory.message_store import BaseMessageStore
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS messages ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id TEXT NOT NULL, "
+    "role TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation_id, id)",
+)
+
+
+class SQLiteMessageStore(BaseMessageStore):
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 0.01, read_threads: int = 4):
+        """
+        Conversation store on a SQLite file in WAL mode, safe to share between processes.
+
+        Appends are buffered and committed in one transaction per batch on a single
+        writer thread; reads run on a small pool of reader threads with their own
+        connections, so neither blocks the event loop and readers don't wait on writers.
+
+        :param path: SQLite database file.
+        :param batch_size: Buffered appends that trigger an immediate flush.
+        :param flush_interval: Seconds a buffered append may wait for more writes to batch with.
+        :param read_threads: Number of concurrent reader connections.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-memory-writer")
+        self._readers = ThreadPoolExecutor(max_workers=read_threads, thread_name_prefix="sqlite-memory-reader")
+        self._local = threading.local()
+        # Every thread's connection, so close() can release them all
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._buffer: List[Tuple[str, str, str, float]] = []
+        self._batch: Optional[asyncio.Future] = None
+        # Conversation id -> commit future of the batch holding its latest unflushed append
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._writer.submit(self._connection).result()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Per-thread connection. Each one is only used by the thread that made it; they are
+        opened without the same-thread check so `close` can close them once the threads are gone.
+        """
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                db.execute(statement)
+            db.commit()
+            self._local.db = db
+            with self._connections_lock:
+                self._connections.append(db)
+        return db
+
+    async def append(self, conversation_id: str, role: str, content: str):
+        loop = asyncio.get_running_loop()
+        if self._batch is None:
+            self._batch = loop.create_future()
+        self._buffer.append((conversation_id, role, content, time.time()))
+        self._pending[conversation_id] = self._batch
+
+        if len(self._buffer) >= self.batch_size:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush_now)
+
+    def _flush_now(self) -> Optional[asyncio.Future]:
+        """
+        Hands the current buffer to the writer thread and returns its commit future.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer:
+            return None
+
+        rows, batch = self._buffer, self._batch
+        self._buffer, self._batch = [], None
+        written = asyncio.get_running_loop().run_in_executor(self._writer, self._write, rows)
+
+        def done(future: asyncio.Future):
+            for conversation_id in {row[0] for row in rows}:
+                if self._pending.get(conversation_id) is batch:
+                    del self._pending[conversation_id]
+            if future.cancelled():
+                logger.error(f"Writing {len(rows)} message(s) was cancelled.")
+                batch.cancel()
+            elif future.exception() is not None:
+                logger.error(f"Failed to persist {len(rows)} message(s): {future.exception()}")
+                batch.set_exception(future.exception())
+                # Logged above; waiters still get the error, but an unawaited batch shouldn't warn
+                batch.exception()
+            else:
+                batch.set_result(len(rows))
+
+        written.add_done_callback(done)
+        return batch
+
+    def _write(self, rows: List[Tuple[str, str, str, float]]):
+        db = self._connection()
+        with db:
+            db.executemany("INSERT INTO messages (conversation_id, role, content, created) VALUES (?, ?, ?, ?)", rows)
+
+    def _read(self, conversation_id: str, limit: int) -> List[Dict]:
+        rows = self._connection().execute(
+            "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+            (conversation_id, limit),
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def _delete(self, conversation_id: str):
+        db = self._connection()
+        with db:
+            db.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+
+    async def _wait_for_pending(self, conversation_id: str):
+        batch = self._pending.get(conversation_id)
+        if batch is not None:
+            # Someone is waiting on this batch, so don't hold it back for more writes
+            if batch is self._batch:
+                self._flush_now()
+            await asyncio.shield(batch)
+
+    async def fetch_last(self, conversation_id: str, limit: int) -> List[Dict]:
+        await self._wait_for_pending(conversation_id)
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._read, conversation_id, limit)
+
+    async def clear(self, conversation_id: str):
+        await self._wait_for_pending(conversation_id)
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._delete, conversation_id)
+
+    async def flush(self):
+        batch = self._flush_now()
+        if batch is not None:
+            await asyncio.shield(batch)
+        # Wait for batches already handed to the writer
+        await asyncio.gather(*set(self._pending.values()), return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        self._writer.shutdown()
+        self._readers.shutdown()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
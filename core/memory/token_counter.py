@@ -0,0 +1,39 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Role/formatting tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def _approximate_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate: words and punctuation, with long words split roughly
+    every four characters the way BPE vocabularies tend to.
+    """
+    return sum(1 + (len(piece) - 1) // 4 for piece in _WORD_PATTERN.findall(text))
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(encoding_name: str = "cl100k_base") -> Callable[[str], int]:
+    """
+    Returns a function counting tokens with the local tiktoken encoding, falling back
+    to an approximation when tiktoken or its encoding file isn't available.
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding '{encoding_name}' unavailable ({e}); using approximate token counts.")
+        return _approximate_tokens
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(content: Optional[str], counter: Callable[[str], int] = None) -> int:
+    counter = counter or get_token_counter()
+    return counter(content or "") + MESSAGE_OVERHEAD_TOKENS
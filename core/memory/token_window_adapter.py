@@ -0,0 +1,68 @@
+import sys
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, List, Optional, Tuple
+from core.config.roles import MessageRole
+from core.memory.base_memory_adapter import BaseMemoryAdapter
+from core.memory.message import Message
+from core.memory.token_counter import count_message_tokens, get_token_counter
+
+class TokenWindowMemoryAdapter(BaseMemoryAdapter):
+    def __init__(self, max_tokens: int = 4096, counter: Callable[[str], int] = None):
+        """
+        Conversation memory bounded by a token budget instead of a message count.
+
+        The system message is pinned outside the window and never evicted. Other
+        messages live in a deque with their token counts cached, so each turn costs
+        one count for the new message and O(1) per evicted message.
+
+        :param max_tokens: Budget for the whole history, system message included.
+        :param counter: Function returning the token count of a string; defaults to the local tokenizer.
+        """
+        self.max_tokens = max_tokens
+        self.counter = counter or get_token_counter()
+        self.system_message: Optional[Message] = None
+        self.system_tokens = 0
+        self.messages: Deque[Tuple[Message, int]] = deque()
+        self.window_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.system_tokens + self.window_tokens
+
+    async def _add_message(self, role: MessageRole, content: str):
+        """
+        Adds a message, evicting the oldest non-system messages until the budget fits.
+        The newest message is always kept, even if it alone exceeds the budget.
+        """
+        tokens = count_message_tokens(content, self.counter)
+
+        if role is MessageRole.SYSTEM:
+            self.system_message = Message(role.value, sys.intern(content))
+            self.system_tokens = tokens
+        else:
+            self.messages.append((Message(role.value, content), tokens))
+            self.window_tokens += tokens
+
+        while self.total_tokens > self.max_tokens and len(self.messages) > 1:
+            _, evicted_tokens = self.messages.popleft()
+            self.window_tokens -= evicted_tokens
+
+    async def get_history(self, limit: Optional[int] = None) -> List[Message]:
+        """
+        Returns the pinned system message followed by the messages in the window,
+        or only the last `limit` of them when given.
+        """
+        start = 0 if limit is None else max(0, len(self.messages) - limit)
+        history = [self.system_message] if self.system_message else []
+        history.extend(message for message, _ in islice(self.messages, start, None))
+        return history
+
+    async def clear_history(self):
+        """
+        Clears the entire message history, including the system message.
+        """
+        self.system_message = None
+        self.system_tokens = 0
+        self.messages.clear()
+        self.window_tokens = 0
@@ -0,0 +1,5 @@
+from core.orchestrator.orchestrator import Orchestrator
+from core.orchestrator.batch_runner import BatchRunner, BatchResult, BatchStats
+from core.orchestrator.routing import RoutingEngine, RoutingDecision, KeywordClassifier
+from core.orchestrator.review import VerificationStats, is_approved
+from core.orchestrator.run_log import RunRecorder, RunEvent, RunStats, BaseRunLog, JsonlRunLog, SQLiteRunLog
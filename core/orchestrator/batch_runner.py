@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class BatchResult:
+    index: int
+    task: str
+    output: Optional[str] = None
+    error: Optional[BaseException] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    completed: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    def record(self, result: BatchResult):
+        self.latencies.append(result.latency)
+        if result.ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    @property
+    def throughput(self) -> float:
+        """Finished tasks per second."""
+        return (self.completed + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of task latency, in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def summary(self) -> dict:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_per_s": round(self.throughput, 3),
+            "p50_s": round(self.percentile(50), 3),
+            "p95_s": round(self.percentile(95), 3),
+            "p99_s": round(self.percentile(99), 3),
+        }
+
+
+async def _aiter(tasks: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(tasks, "__aiter__"):
+        async for task in tasks:
+            yield task
+    else:
+        for task in tasks:
+            yield task
+
+
+class BatchRunner:
+    def __init__(self, target: Any, concurrency: int = 8):
+        """
+        Runs many tasks through an Orchestrator, SKAgent or LLMAdapter with bounded concurrency.
+
+        Every task runs on `await target.fork()`, so each one gets its own copy of the
+        agents' memory (normally just the system prompt) and tasks never see each
+        other's turns. An AgentPool target instead lends each task a pre-initialized
+        agent whose memory is reset when it is checked back in. Provider rate limits
+        and retries are applied by the adapters.
+
+        :param target: An Orchestrator, SKAgent or LLMAdapter used as the per-task template,
+            or an AgentPool.
+        :param concurrency: Maximum number of tasks in flight.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.target = target
+        self.concurrency = concurrency
+        self.stats = BatchStats()
+
+    async def _handle(self, task: str) -> str:
+        if hasattr(self.target, "checkout"):
+            async with self.target.agent() as worker:
+                return await self._dispatch(worker, task)
+        return await self._dispatch(await self.target.fork(), task)
+
+    @staticmethod
+    async def _dispatch(worker: Any, task: str) -> str:
+        if hasattr(worker, "route_task"):
+            return await worker.route_task(task)
+        if hasattr(worker, "run"):
+            return await worker.run(task)
+        return await worker.generate_response(task)
+
+    async def _run_one(self, index: int, task: str) -> BatchResult:
+        start = time.perf_counter()
+        try:
+            output = await self._handle(task)
+            return BatchResult(index=index, task=task, output=output, latency=time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Batch task {index} failed: {e}")
+            return BatchResult(index=index, task=task, error=e, latency=time.perf_counter() - start)
+
+    async def run(self, tasks: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[BatchResult]:
+        """
+        Yields a BatchResult per task in completion order. Tasks are pulled from
+        `tasks` only when a slot is free, so async task streams are consumed lazily.
+        Run statistics are available on `self.stats` while and after iterating.
+        """
+        self.stats = BatchStats()
+        start = time.perf_counter()
+        source = _aiter(tasks)
+        results: asyncio.Queue = asyncio.Queue()
+        source_lock = asyncio.Lock()
+        counter = iter(range(1 << 62))
+
+        async def next_task():
+            async with source_lock:
+                try:
+                    return next(counter), await source.__anext__()
+                except StopAsyncIteration:
+                    return None
+
+        async def worker():
+            while True:
+                item = await next_task()
+                if item is None:
+                    return
+                await results.put(await self._run_one(*item))
+
+        workers = asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        workers.add_done_callback(lambda _: results.put_nowait(_DONE))
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                self.stats.record(result)
+                self.stats.elapsed = time.perf_counter() - start
+                yield result
+            # Surface errors raised by the task source itself
+            await workers
+        finally:
+            workers.cancel()
+            self.stats.elapsed = time.perf_counter() - start
+
+    async def run_all(self, tasks: Union[Iterable[str], AsyncIterable[str]]) -> List[BatchResult]:
+        """
+        Runs the whole batch and returns the results in input order.
+        """
+        results = [result async for result in self.run(tasks)]
+        return sorted(results, key=lambda result: result.index)
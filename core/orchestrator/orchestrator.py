@@ -1,39 +1,411 @@
+import ast
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Optional, Tuple
+from core.adapters.llm_adapter import raising_errors
 from core.agents.sk_agent import SKAgent
+from core.code_builder import extract_code
+from core.executor.sandbox import SandboxExecutor
+from core.executor.static_checker import StaticChecker, StaticReport
+from core.orchestrator.review import VerificationStats, is_approved
+from core.orchestrator.routing import RoutingDecision, RoutingEngine
+from core.orchestrator.run_log import BaseRunLog, RunRecorder
+from core import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Called with (agent name, delta) for every streamed chunk; may be sync or async.
+TokenCallback = Callable[[str, str], object]
+
+# Static check savings of the task being routed; its draft and candidates run in copies of its context
+_task_verification: ContextVar[Optional[VerificationStats]] = ContextVar("task_verification", default=None)
+# Run being recorded or replayed by the task being routed; per task, so concurrent runs don't mix
+_recording: ContextVar[Optional[RunRecorder]] = ContextVar("recording", default=None)
+
+
+def _contains_code(text: str) -> bool:
+    """
+    Whether a task carries code to verify or run: a fenced block, or text that parses as
+    Python and is more than a bare name or literal.
+    """
+    if "```" in text or "~~~" in text:
+        return True
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return False
+    return any(not (isinstance(node, ast.Expr) and isinstance(node.value, (ast.Name, ast.Constant)))
+               for node in tree.body)
 
 class Orchestrator:
-    def __init__(self, router: SKAgent, developer: SKAgent, verifier: SKAgent, executor: SKAgent = None):
+    def __init__(self, router: SKAgent, developer: SKAgent, verifier: SKAgent, executor: SKAgent = None,
+                 on_token: Optional[TokenCallback] = None, speculative: bool = False, candidates: int = 1,
+                 sandbox: Optional[SandboxExecutor] = None, routing: Optional[RoutingEngine] = None,
+                 static_checker: Optional[StaticChecker] = None, fix_attempts: int = 1,
+                 run_log: Optional[BaseRunLog] = None, replay: bool = False):
+        """
+        :param on_token: Optional callback receiving (agent name, delta) for streamed replies.
+        :param speculative: Start drafting code while the router is still deciding; the draft
+            is cancelled if the task is not routed to coding.
+        :param candidates: Number of developer candidates drafted and verified concurrently.
+            The first APPROVED candidate wins and the others are cancelled.
+        :param sandbox: Executes extracted code locally; its result is appended to what the
+            verifier reviews, and it replaces the executor agent for execution tasks.
+        :param routing: Routing engine deciding each task's route; defaults to a keyword
+            classifier that falls back to the router agent when it isn't confident. Tasks
+            routed to verification or execution without any code are reported as misroutes;
+            report others through `report_misroute`.
+        :param static_checker: Checks code locally before the verifier sees it. Code that fails
+            goes back to the developer with the checker's feedback; if it still fails after
+            `fix_attempts` rounds it is rejected without calling the verifier.
+        :param fix_attempts: Developer retries on static check feedback per draft.
+        :param run_log: Records every routing decision and agent reply of a run as it completes.
+            Calling `route_task` again with the same `run_id` resumes the run: recorded steps
+            are reused instead of calling the agents again.
+        :param replay: Serve every step from `run_log` and never call an agent, for offline,
+            deterministic re-runs of recorded runs; a step missing from the log raises ReplayError.
+        """
+        if candidates < 1:
+            raise ValueError("candidates must be at least 1.")
+        if fix_attempts < 0:
+            raise ValueError("fix_attempts must not be negative.")
+        if replay and run_log is None:
+            raise ValueError("replay needs a run_log to replay from.")
         self.router = router
         self.developer = developer
         self.verifier = verifier
         self.executor = executor
+        self.on_token = on_token
+        self.speculative = speculative
+        self.candidates = candidates
+        self.sandbox = sandbox
+        self.routing = routing or RoutingEngine(router)
+        self.static_checker = static_checker
+        self.fix_attempts = fix_attempts
+        self.verification_stats = VerificationStats()
+        self.run_log = run_log
+        self.replay = replay
+        # Recorder of the most recently started run, for its stats
+        self.last_run: Optional[RunRecorder] = None
+
+    async def fork(self) -> "Orchestrator":
+        """
+        Returns an orchestrator with the same settings running on forked agents,
+        so concurrent tasks get isolated memory.
+        """
+        agents = [self.router, self.developer, self.verifier, self.executor]
+        router, developer, verifier, executor = await asyncio.gather(
+            *(agent.fork() if agent else asyncio.sleep(0) for agent in agents)
+        )
+        orchestrator = type(self)(router, developer, verifier, executor, on_token=self.on_token,
+                                  speculative=self.speculative, candidates=self.candidates, sandbox=self.sandbox,
+                                  routing=self.routing.fork(router), static_checker=self.static_checker,
+                                  fix_attempts=self.fix_attempts, run_log=self.run_log, replay=self.replay)
+        # Forks report into the same stats
+        orchestrator.verification_stats = self.verification_stats
+        return orchestrator
+
+    async def _run(self, agent: SKAgent, input_text: str) -> str:
+        """
+        Runs an agent, streaming its reply through `on_token` when a callback is set.
+        During a recorded run, a reply already in the run log is reused and put into the
+        agent's memory instead.
+        """
+        recording = _recording.get()
+        if recording is None:
+            return await self._call(agent, input_text)
+
+        async def replayed(output: str):
+            await agent.remember(input_text, output)
+            if self.on_token is not None:
+                result = self.on_token(agent.name, output)
+                if inspect.isawaitable(result):
+                    await result
+
+        return await recording.step(agent.name, input_text, lambda: self._call(agent, input_text), replayed)
+
+    async def _call(self, agent: SKAgent, input_text: str) -> str:
+        if self.on_token is None:
+            return await agent.run(input_text)
+
+        parts = []
+        async for delta in agent.stream(input_text):
+            parts.append(delta)
+            result = self.on_token(agent.name, delta)
+            if inspect.isawaitable(result):
+                await result
+        return "".join(parts)
 
-    async def route_task(self, input_text: str):
+    async def _static_check(self, code: str) -> StaticReport:
+        with telemetry.span("orchestrator.static_check") as span:
+            report = await self.static_checker.run(code)
+            span.set_attribute("passed", report.passed)
+        stats = self.verification_stats
+        stats.static_checks += 1
+        stats.static_seconds += report.duration
+        if not report.passed:
+            stats.static_failures += 1
+        logger.info(f"Static checks: {'passed' if report.passed else f'{len(report.errors)} error(s)'} "
+                    f"in {report.duration * 1000:.1f}ms")
+        return report
+
+    def _count_static_rejection(self):
+        """
+        Counts code rejected on its static check report, i.e. a verifier call saved.
+        """
+        self.verification_stats.static_rejections += 1
+        task_stats = _task_verification.get()
+        if task_stats is not None:
+            task_stats.static_rejections += 1
+
+    async def _develop(self, developer: SKAgent, input_text: str) -> Tuple[str, Optional[StaticReport]]:
+        """
+        Runs the developer. With a static checker, code that fails the checks is sent back
+        to the developer with the checker's feedback, up to `fix_attempts` times; the last
+        report is returned alongside the code.
+        """
+        with telemetry.span("orchestrator.develop"):
+            code = await self._run(developer, input_text)
+        if self.static_checker is None:
+            return code, None
+
+        for attempt in range(1, self.fix_attempts + 1):
+            report = await self._static_check(code)
+            if report.passed:
+                return code, report
+            logger.info(f"Developer: Fixing static check errors (attempt {attempt}/{self.fix_attempts})...")
+            with telemetry.span("orchestrator.develop", fix_attempt=attempt):
+                code = await self._run(developer, report.feedback())
+        return code, await self._static_check(code)
+
+    async def _review(self, verifier: SKAgent, code: str) -> str:
+        """
+        Sends code to the verifier, together with the sandbox execution report when a sandbox is set.
+        """
+        if self.sandbox is not None:
+            with telemetry.span("sandbox.run") as span:
+                result = await self.sandbox.run(extract_code(code)[0])
+                span.set_attribute("status", result.status)
+            logger.info(f"Sandbox: {result.status} in {result.duration:.2f}s")
+            code = f"{code}\n\n{result.summary()}"
+        return await self._verify(verifier, code)
+
+    async def _verify(self, verifier: SKAgent, text: str) -> str:
+        start = time.perf_counter()
+        with telemetry.span("orchestrator.verify"):
+            review = await self._run(verifier, text)
+        self.verification_stats.llm_reviews += 1
+        self.verification_stats.llm_review_seconds += time.perf_counter() - start
+        return review
+
+    async def _develop_and_review(self, developer: SKAgent, verifier: SKAgent, input_text: str) -> Tuple[str, str]:
+        """
+        Develops the code and reviews it; code failing the static checks is rejected
+        with the checker's report instead of being sent to the verifier.
+        """
+        code, report = await self._develop(developer, input_text)
+        if report is not None and not report.passed:
+            self._count_static_rejection()
+            return code, f"REJECTED - {report.summary()}"
+        return code, await self._review(verifier, code)
+
+    async def _develop_and_verify(self, input_text: str) -> Tuple[str, str]:
+        """
+        Runs developer then verifier on the agents themselves.
+        """
+        logger.info("Developer: Writing the code...")
+        code, review = await self._develop_and_review(self.developer, self.verifier, input_text)
+        logger.info(f"Code created: {code}")
+        logger.info(f"Code review: {review}")
+        return code, review
+
+    async def _candidate(self, input_text: str) -> Tuple[str, str]:
+        """
+        Drafts and reviews one candidate on forked agents, so concurrent candidates
+        don't share conversation state.
+        """
+        developer, verifier = await asyncio.gather(self.developer.fork(), self.verifier.fork())
+        return await self._develop_and_review(developer, verifier, input_text)
+
+    async def _fan_out(self, input_text: str, adopt: bool = True) -> Tuple[str, str]:
+        """
+        Races `candidates` drafts. Returns the first approved one, or the first rejection
+        if none is approved; the remaining drafts are cancelled.
+
+        :param adopt: Put the result into the agents' own conversations. A speculative
+            draft leaves that to `_route`, which adopts it only if the task is routed to coding.
+        """
+        logger.info(f"Developer: Drafting {self.candidates} candidate(s)...")
+        tasks = [asyncio.create_task(self._candidate(input_text)) for _ in range(self.candidates)]
+        rejected = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                code, review = await next_done
+                if is_approved(review):
+                    break
+                rejected = rejected or (code, review)
+            else:
+                code, review = rejected
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if adopt:
+            await self._adopt(input_text, code, review)
+        return code, review
+
+    async def _adopt(self, input_text: str, code: str, review: str):
+        """
+        Keeps the agents' own conversations in step with a candidate drafted on forks.
+        """
+        await self.developer.remember(input_text, code)
+        await self.verifier.remember(code, review)
+        logger.info(f"Code created: {code}")
+        logger.info(f"Code review: {review}")
+
+    async def route_task(self, input_text: str, run_id: Optional[str] = None):
         """
         Start the orchestration flow where tasks are handled in iteration.
+
+        :param run_id: With a run log, identifies the run to record or resume; a new id
+            is generated (and logged) when omitted.
+
+        During a recorded run a failed model call raises LLMRequestError instead of
+        becoming an "Error: ..." reply, and nothing is recorded for it; calling again with
+        the same run_id resumes from the last recorded step. A finished run returns its
+        recorded result, except in replay mode, which walks its recorded steps again.
+        """
+        recording = None
+        if self.run_log is not None:
+            recording = await RunRecorder.open(self.run_log, run_id or uuid.uuid4().hex, self.replay)
+            if recording.result is not None and not self.replay:
+                logger.info(f"Run {recording.run_id} already finished; returning its recorded result.")
+                return recording.result
+            logger.info(f"Run {recording.run_id}: {'replaying' if self.replay else 'recording'} "
+                        f"({'resumed' if recording.started else 'new'}).")
+            await recording.start(input_text)
+            self.last_run = recording
+        # Set before the draft starts, so its static rejections are counted for this task too
+        task_stats = VerificationStats()
+        task_token = _task_verification.set(task_stats)
+        recording_token = _recording.set(recording)
+        errors = raising_errors() if recording is not None else nullcontext()
+        draft = None
+        try:
+            with errors, telemetry.span("orchestrator.task", speculative=self.speculative,
+                                        candidates=self.candidates) as span:
+                if self.speculative:
+                    # Start drafting before the router has decided; the draft is dropped unless routed to coding
+                    draft = asyncio.create_task(self._fan_out(input_text, adopt=False))
+                try:
+                    result = await self._route(input_text, draft)
+                    if recording is not None:
+                        await recording.finish(result)
+                        if not recording.unrecorded:
+                            logger.info(f"Run {recording.run_id} finished: {recording.stats.summary()}")
+                    return result
+                finally:
+                    if self.static_checker is not None:
+                        span.set_attribute("verifier_calls_saved", task_stats.llm_calls_saved)
+                        self._report_savings(task_stats)
+        finally:
+            _task_verification.reset(task_token)
+            _recording.reset(recording_token)
+            if draft is not None:
+                await self._drop(draft)
+
+    @staticmethod
+    async def _drop(draft: asyncio.Task):
         """
+        Cancels a speculative draft and waits for it, so it makes no further calls and a
+        failure isn't left unretrieved.
+        """
+        draft.cancel()
+        try:
+            await draft
+        except asyncio.CancelledError:
+            if not draft.cancelled():
+                # Our own cancellation, not the draft's
+                raise
+        except Exception as e:
+            logger.debug(f"Dropped speculative draft failed: {e}")
+
+    def _report_savings(self, task_stats: VerificationStats):
+        stats = self.verification_stats
+        saved = task_stats.llm_calls_saved
+        seconds = saved * stats.mean_llm_review_seconds
+        logger.info(f"Static checks saved {saved} verifier call(s) (~{seconds:.1f}s) on this task; "
+                    f"{stats.llm_calls_saved} call(s) (~{stats.seconds_saved:.1f}s) in total.")
+
+    def report_misroute(self, input_text: str, correct_route: Optional[str] = None):
+        """
+        Tells the routing engine a task was routed wrongly, e.g. from user feedback.
+        """
+        self.routing.report_misroute(input_text, correct_route)
+
+    def _check_route(self, input_text: str, decision: RoutingDecision):
+        """
+        Verification and execution work on existing code; a task without any was misrouted.
+        """
+        if decision.route in ("verification", "execution") and not _contains_code(input_text):
+            logger.warning(f"Task routed to {decision.route} carries no code; reporting a misroute.")
+            self.report_misroute(input_text)
+
+    async def _decide(self, input_text: str) -> RoutingDecision:
+        """
+        Routes the task; during a recorded run the decision is checkpointed like an agent step.
+        A decision without a route (the router failed or answered nonsense) isn't recorded,
+        so resuming the run asks again.
+        """
+        recording = _recording.get()
+        if recording is None:
+            return await self.routing.route(input_text)
+
+        async def route() -> str:
+            decision = await self.routing.route(input_text)
+            return json.dumps({"route": decision.route, "confidence": decision.confidence, "source": decision.source})
+
+        recorded = json.loads(await recording.step(
+            "route", input_text, route, keep=lambda output: json.loads(output)["route"] is not None))
+        return RoutingDecision(recorded["route"], recorded["confidence"], recorded["source"])
+
+    async def _route(self, input_text: str, draft: Optional[asyncio.Task]):
         task_in_progress = True
         while task_in_progress:
             # Step 1: Router decides what needs to be done (Plan)
-            routing_decision = await self.router.run(input_text)
-            print(f"Routing decision: {routing_decision}")
+            with telemetry.span("orchestrator.route") as span:
+                decision = await self._decide(input_text)
+                span.set_attribute("route", decision.route)
+                span.set_attribute("source", decision.source)
+            logger.info(f"Routing decision: {decision.route} ({decision.source}, confidence {decision.confidence:.2f})")
+            self._check_route(input_text, decision)
+            if draft is not None and decision.route != "coding":
+                # Stop drafting now rather than after the other route has finished
+                await self._drop(draft)
+                draft = None
 
             # Determine the action based on the routing decision
-            if "coding" in routing_decision.lower():
-                # Step 2: Developer writes the code
-                print("Developer: Writing the code...")
-                code = await self.developer.run(input_text)
-                print(f"Code created: {code}")
-
-                # Step 3: Verifier reviews the code
-                print("Verifier: Reviewing the code...")
-                review = await self.verifier.run(code)
-                print(f"Code review: {review}")
-
-                if review == "APPROVED":
+            if decision.route == "coding":
+                # Steps 2 and 3: Developer writes the code, Verifier reviews it
+                if draft:
+                    code, review = await draft
+                    await self._adopt(input_text, code, review)
+                elif self.candidates > 1:
+                    code, review = await self._fan_out(input_text)
+                else:
+                    code, review = await self._develop_and_verify(input_text)
+
+                if is_approved(review):
                     # Step 4: Executor saves the code if approved
                     if self.executor:
-                        print("Executor: Saving and executing the code...")
-                        await self.executor.run(code)
+                        logger.info("Executor: Saving and executing the code...")
+                        await self._run(self.executor, code)
                         return "Code executed and saved successfully."
                     else:
                         return "No executor available to execute the code."
@@ -41,20 +413,30 @@ class Orchestrator:
                 else:
                     return f"Code rejected: {review}"
 
-            elif "verification" in routing_decision.lower():
+            elif decision.route == "verification":
                 # If it's just verification, verify the existing code
-                print("Verifier: Verifying the code...")
-                review = await self.verifier.run(input_text)
-                if review == "APPROVED":
+                if self.static_checker is not None:
+                    report = await self._static_check(input_text)
+                    if not report.passed:
+                        self._count_static_rejection()
+                        return f"Code rejected: {report.summary()}"
+                logger.info("Verifier: Verifying the code...")
+                review = await self._verify(self.verifier, input_text)
+                if is_approved(review):
                     return "Code verified and approved."
                 else:
                     return f"Code rejected: {review}"
             
-            elif "execution" in routing_decision.lower():
+            elif decision.route == "execution":
                 # If it's an execution task, run the code
-                print("Executor: Executing the code...")
-                if self.executor:
-                    await self.executor.run(input_text)
+                logger.info("Executor: Executing the code...")
+                if self.sandbox:
+                    result = await self.sandbox.run(extract_code(input_text)[0])
+                    if result.passed:
+                        return "Code executed successfully."
+                    return f"Code execution failed: {result.summary()}"
+                elif self.executor:
+                    await self._run(self.executor, input_text)
                     return "Code executed successfully."
                 else:
                     return "No executor available for execution."
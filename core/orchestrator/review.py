@@ -0,0 +1,73 @@
+import re
+from dataclasses import dataclass
+
+# A rejection anywhere in the review wins over any approval
+_REJECTION_PATTERN = re.compile(r"\b(rejected|disapproved|unapproved|not\s+approved)\b", re.IGNORECASE)
+_APPROVAL_PATTERN = re.compile(r"\bapproved\b", re.IGNORECASE)
+# An explicit label, e.g. "Verdict: APPROVED" or "**Verdict:**" followed by the verdict on the next line
+_VERDICT_LABEL_PATTERN = re.compile(r"^\W*verdict\W*:\W*(.*)$", re.IGNORECASE | re.MULTILINE)
+# "approved" itself negated or made conditional: "cannot be approved", "not yet approved",
+# "would be approved if ...", "approved once the tests pass". The qualifier must be in the
+# same clause, at most two words away, so "No issues found. APPROVED" stays an approval.
+_QUALIFIED_APPROVAL_PATTERN = re.compile(
+    r"\b(?:not|never|cannot|can't|won't|wouldn't|isn't|aren't|wasn't|would|could|should|might|once|if|unless|until)"
+    r"\b(?:[ \t*_]+\w+){0,2}[ \t*_]+approved\b"
+    r"|\bapproved[ \t*_]+(?:if|once|unless|until|provided|pending|after|when)\b",
+    re.IGNORECASE,
+)
+
+
+def is_approved(review: str) -> bool:
+    """
+    Reads the verifier's verdict. Accepts approvals with extra text or formatting
+    ("APPROVED.", "**Approved** - looks good", "Verdict: APPROVED", reasoning followed by
+    "APPROVED"). The verdict is the "Verdict:" label if there is one, otherwise the first
+    line mentioning approval. Any rejection word in the review, or a negated or conditional
+    approval in the verdict ("not yet approved", "would be approved if fixed"), rejects.
+    """
+    review = review or ""
+    if _REJECTION_PATTERN.search(review):
+        return False
+    label = _VERDICT_LABEL_PATTERN.search(review)
+    if label:
+        verdict = label.group(1)
+    else:
+        verdict = next((line for line in review.splitlines() if _APPROVAL_PATTERN.search(line)), "")
+    return bool(_APPROVAL_PATTERN.search(verdict)) and not _QUALIFIED_APPROVAL_PATTERN.search(verdict)
+
+
+@dataclass
+class VerificationStats:
+    static_checks: int = 0
+    static_failures: int = 0
+    static_rejections: int = 0
+    static_seconds: float = 0.0
+    llm_reviews: int = 0
+    llm_review_seconds: float = 0.0
+
+    @property
+    def llm_calls_saved(self) -> int:
+        """
+        Drafts rejected on the static checks alone. Failures that the developer then fixed
+        still reach the verifier, so they don't count.
+        """
+        return self.static_rejections
+
+    @property
+    def mean_llm_review_seconds(self) -> float:
+        return self.llm_review_seconds / self.llm_reviews if self.llm_reviews else 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated from the mean verifier latency observed so far, minus the time spent on static checks."""
+        return max(0.0, self.llm_calls_saved * self.mean_llm_review_seconds - self.static_seconds)
+
+    def summary(self) -> dict:
+        return {
+            "static_checks": self.static_checks,
+            "static_failures": self.static_failures,
+            "static_rejections": self.static_rejections,
+            "llm_reviews": self.llm_reviews,
+            "llm_calls_saved": self.llm_calls_saved,
+            "seconds_saved": round(self.seconds_saved, 3),
+        }
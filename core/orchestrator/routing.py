@@ -0,0 +1,245 @@
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from core.adapters.llm_adapter import errors_raised, raising_errors
+from core.errors.llm_error import LLMRequestError
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ("coding", "verification", "execution")
+
+# Structured output contract for the router LLM (OpenAI `response_format`, also accepted
+# by OpenAI-compatible local servers).
+ROUTE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "routing_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "route": {"type": "string", "enum": [*ROUTES, "unknown"]},
+                "confidence": {"type": "number"},
+            },
+            "required": ["route", "confidence"],
+            "additionalProperties": False,
+        },
+    },
+}
+# Tried in order when a model rejects the current format with a 400: many (gpt-4, gpt-3.5-turbo)
+# don't support json_schema, some don't support JSON mode either; the prompt alone asks for JSON.
+ROUTE_RESPONSE_FORMATS = (ROUTE_RESPONSE_FORMAT, {"type": "json_object"}, None)
+
+ROUTE_INSTRUCTIONS = (
+    "Classify the task below as one of: coding (write or change code), verification "
+    "(review existing code), execution (run or save existing code), or unknown. "
+    'Answer only with JSON like {"route": "coding", "confidence": 0.9}.\n\nTask:\n'
+)
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+@dataclass
+class RoutingDecision:
+    route: Optional[str]  # one of ROUTES, or None when the task could not be routed
+    confidence: float
+    source: str  # "rules", "llm" or "cache"
+    latency: float = 0.0
+
+
+@dataclass
+class RoutingStats:
+    decisions: int = 0
+    rule_decisions: int = 0
+    llm_decisions: int = 0
+    cache_hits: int = 0
+    invalid_llm_outputs: int = 0
+    misroutes: int = 0
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {"rules": [], "llm": [], "cache": []})
+
+    def record(self, decision: RoutingDecision):
+        self.decisions += 1
+        if decision.source == "rules":
+            self.rule_decisions += 1
+        elif decision.source == "llm":
+            self.llm_decisions += 1
+        else:
+            self.cache_hits += 1
+        self.latencies[decision.source].append(decision.latency)
+
+    @property
+    def misroute_rate(self) -> float:
+        return self.misroutes / self.decisions if self.decisions else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "decisions": self.decisions,
+            "rule_decisions": self.rule_decisions,
+            "llm_decisions": self.llm_decisions,
+            "cache_hits": self.cache_hits,
+            "invalid_llm_outputs": self.invalid_llm_outputs,
+            "misroute_rate": round(self.misroute_rate, 4),
+            **{
+                f"mean_{source}_latency_ms": round(1000 * sum(values) / len(values), 3)
+                for source, values in self.latencies.items() if values
+            },
+        }
+
+
+class KeywordClassifier:
+    DEFAULT_RULES: Dict[str, Dict[str, float]] = {
+        "coding": {
+            "write": 1.5, "implement": 2.0, "create": 1.0, "build": 1.0, "generate": 1.0, "refactor": 2.0,
+            "function": 1.0, "program": 1.0, "script": 1.0, "class": 0.5, "add": 0.5, "fix": 1.0, "code": 0.5,
+        },
+        "verification": {
+            "review": 2.0, "verify": 2.0, "check": 1.0, "audit": 2.0, "validate": 1.5, "approve": 1.5,
+            "correct": 0.5, "inspect": 1.5,
+        },
+        "execution": {
+            "run": 2.0, "execute": 2.0, "save": 1.5, "deploy": 1.5, "launch": 1.5, "start": 0.5,
+        },
+    }
+
+    def __init__(self, rules: Dict[str, Dict[str, float]] = None, saturation: float = 2.0):
+        """
+        Weighted keyword scorer. Confidence is the winner's share of the total score,
+        scaled down when the winner's own score is below `saturation`.
+        """
+        self.rules = rules or self.DEFAULT_RULES
+        self.saturation = saturation
+
+    def __call__(self, text: str) -> Tuple[Optional[str], float]:
+        scores = {route: 0.0 for route in self.rules}
+        for word in _WORD_PATTERN.findall(text.lower()):
+            for route, keywords in self.rules.items():
+                scores[route] += keywords.get(word, 0.0)
+
+        route, top = max(scores.items(), key=lambda item: item[1])
+        total = sum(scores.values())
+        if top <= 0:
+            return None, 0.0
+        return route, (top / total) * min(1.0, top / self.saturation)
+
+
+class RoutingEngine:
+    def __init__(self, router=None, classifier: Callable[[str], Tuple[Optional[str], float]] = None,
+                 threshold: float = 0.6, cache_size: int = 1024):
+        """
+        Decides the route for a task: a fast local classifier first, the router LLM
+        (with JSON-schema constrained output, or the closest format the model supports)
+        only when the classifier isn't confident.
+        Decisions are cached per normalized input; inputs that could not be routed (e.g. the
+        router call failed or returned invalid output) are not, so the next call asks again.
+
+        :param router: SKAgent consulted when the classifier's confidence is below `threshold`.
+        :param classifier: Callable returning (route or None, confidence in [0, 1]); defaults to
+            KeywordClassifier. An embedding-based classifier can be plugged in here.
+        :param threshold: Minimum classifier confidence to skip the LLM.
+        :param cache_size: Number of normalized inputs whose decision is remembered.
+        """
+        self.router = router
+        self.classifier = classifier or KeywordClassifier()
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.stats = RoutingStats()
+        # Response format the router model accepted; steps down through ROUTE_RESPONSE_FORMATS
+        self.response_format: Optional[dict] = ROUTE_RESPONSE_FORMAT
+        self._cache: "OrderedDict[str, RoutingDecision]" = OrderedDict()
+
+    def fork(self, router) -> "RoutingEngine":
+        """
+        Returns an engine using another router agent but sharing this engine's cache and stats.
+        """
+        engine = type(self)(router, self.classifier, self.threshold, self.cache_size)
+        engine.stats = self.stats
+        engine.response_format = self.response_format
+        engine._cache = self._cache
+        return engine
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    async def route(self, input_text: str) -> RoutingDecision:
+        start = time.perf_counter()
+        key = self.normalize(input_text)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            decision = RoutingDecision(cached.route, cached.confidence, "cache", time.perf_counter() - start)
+            self.stats.record(decision)
+            return decision
+
+        route, confidence = self.classifier(input_text)
+        source = "rules"
+        if (route is None or confidence < self.threshold) and self.router is not None:
+            llm_route, llm_confidence = await self._ask_router(input_text)
+            if llm_route is not None or route is None:
+                route, confidence = llm_route, llm_confidence
+            source = "llm"
+
+        decision = RoutingDecision(route, confidence, source, time.perf_counter() - start)
+        self.stats.record(decision)
+        if route is not None:
+            self._cache[key] = decision
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return decision
+
+    async def _router_reply(self, instructions: str) -> str:
+        """
+        Asks the router. When the model rejects the response format with a 400, retries with
+        the next one in ROUTE_RESPONSE_FORMATS and keeps using whichever is accepted.
+        """
+        raise_errors = errors_raised() or self.router.adapter.raise_errors
+        while True:
+            request_options = {"response_format": self.response_format} if self.response_format else {}
+            try:
+                with raising_errors():
+                    return await self.router.run(instructions, **request_options)
+            except LLMRequestError as e:
+                if e.status_code != 400 or self.response_format is None:
+                    if raise_errors:
+                        raise
+                    return f"Error: {e}"
+                fallback = ROUTE_RESPONSE_FORMATS[ROUTE_RESPONSE_FORMATS.index(self.response_format) + 1]
+                logger.warning(f"Router rejected response_format {self.response_format['type']!r} ({e}); "
+                               f"retrying with {fallback['type'] if fallback else 'no response_format'!r}.")
+                self.response_format = fallback
+
+    async def _ask_router(self, input_text: str) -> Tuple[Optional[str], float]:
+        reply = await self._router_reply(ROUTE_INSTRUCTIONS + input_text)
+        try:
+            # Tolerate servers that ignore the schema and wrap the JSON in prose
+            match = re.search(r"\{.*\}", reply, re.DOTALL)
+            data = json.loads(match.group(0) if match else reply)
+            route = data.get("route")
+            confidence = float(data.get("confidence", 0.0))
+        except (ValueError, TypeError, AttributeError):
+            route, confidence = None, 0.0
+
+        if route not in ROUTES:
+            if route != "unknown":
+                self.stats.invalid_llm_outputs += 1
+                logger.warning(f"Router returned an invalid decision: {reply!r}")
+            return None, 0.0
+        return route, confidence
+
+    def report_misroute(self, input_text: str, correct_route: Optional[str] = None):
+        """
+        Records that a decision was wrong, correcting the cached decision when the right route is known.
+        The Orchestrator reports tasks routed to verification or execution that carry no code;
+        callers that learn of other misroutes (e.g. from user feedback) report them here.
+        """
+        self.stats.misroutes += 1
+        key = self.normalize(input_text)
+        if correct_route in ROUTES:
+            self._cache[key] = RoutingDecision(correct_route, 1.0, "cache")
+        else:
+            self._cache.pop(key, None)
@@ -0,0 +1,340 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from core import telemetry
+from core.errors.replay_error import ReplayError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunEvent:
+    run_id: str
+    seq: int
+    kind: str  # "run_started", "step" or "run_finished"
+    step: str = ""  # agent name, or "route" for routing decisions
+    input: str = ""
+    output: str = ""
+    usage: Dict[str, Any] = field(default_factory=dict)
+    started_at: float = 0.0  # wall clock, seconds since the epoch
+    duration: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BaseRunLog(ABC):
+    """
+    Append-only log of orchestration events, keyed by run id.
+    """
+
+    @abstractmethod
+    async def append(self, event: RunEvent):
+        """
+        Appends an event; it must be durable once this returns.
+        """
+        pass
+
+    @abstractmethod
+    async def events(self, run_id: str) -> List[RunEvent]:
+        """
+        Returns the run's events in the order they were appended.
+        """
+        pass
+
+    @abstractmethod
+    async def runs(self) -> List[str]:
+        """
+        Returns the ids of all recorded runs, oldest first.
+        """
+        pass
+
+    async def close(self):
+        pass
+
+
+class JsonlRunLog(BaseRunLog):
+    def __init__(self, path: str):
+        """
+        Run log in a JSON Lines file, one event per line, fsynced on every append.
+        A line cut short by a crash is ignored when reading.
+
+        Reads go through an index of each run's line offsets, built on the first read and
+        extended with whatever was appended since (by this or another process), so reading
+        one run doesn't parse the whole file again.
+        """
+        self.path = path
+        # One thread keeps appends ordered and off the event loop
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-log")
+        # Run id -> byte offsets of its lines, covering the file up to `_indexed`
+        self._index: Dict[str, List[int]] = {}
+        self._indexed = 0
+
+    def _write(self, line: str):
+        with open(self.path, "ab+") as file:
+            size = file.seek(0, os.SEEK_END)
+            if size:
+                file.seek(size - 1)
+                if file.read(1) != b"\n":
+                    # A crash cut the last append short; start a new line
+                    line = "\n" + line
+            file.write(line.encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _refresh_index(self) -> bool:
+        """
+        Indexes the complete lines appended since the last call; returns False if there is no log yet.
+        """
+        if not os.path.exists(self.path):
+            return False
+        if os.path.getsize(self.path) < self._indexed:
+            # Replaced or truncated behind our back; start over
+            self._index, self._indexed = {}, 0
+        with open(self.path, "rb") as file:
+            file.seek(self._indexed)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Still being written, or cut short; the next append terminates it
+                    break
+                try:
+                    run_id = RunEvent(**json.loads(line)).run_id
+                    self._index.setdefault(run_id, []).append(self._indexed)
+                except (ValueError, TypeError):
+                    logger.warning(f"Skipping unreadable run log line at byte {self._indexed} in {self.path}.")
+                self._indexed += len(line)
+        return True
+
+    def _read(self, run_id: str) -> List[RunEvent]:
+        if not self._refresh_index():
+            return []
+        events = []
+        with open(self.path, "rb") as file:
+            for offset in self._index.get(run_id, ()):
+                file.seek(offset)
+                events.append(RunEvent(**json.loads(file.readline())))
+        return events
+
+    def _run_ids(self) -> List[str]:
+        self._refresh_index()
+        return list(self._index)
+
+    async def append(self, event: RunEvent):
+        line = json.dumps(event.to_dict(), ensure_ascii=False) + "\n"
+        await asyncio.get_running_loop().run_in_executor(self._io, self._write, line)
+
+    async def events(self, run_id: str) -> List[RunEvent]:
+        return await asyncio.get_running_loop().run_in_executor(self._io, self._read, run_id)
+
+    async def runs(self) -> List[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._io, self._run_ids)
+
+    async def close(self):
+        self._io.shutdown()
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS run_events ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, seq INTEGER NOT NULL, kind TEXT NOT NULL, "
+    "step TEXT NOT NULL, input TEXT NOT NULL, output TEXT NOT NULL, usage TEXT NOT NULL, "
+    "started_at REAL NOT NULL, duration REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS run_events_run ON run_events (run_id, id)",
+)
+
+
+class SQLiteRunLog(BaseRunLog):
+    def __init__(self, path: str):
+        """
+        Run log in a SQLite file (WAL mode), committed on every append. All access runs
+        on one thread, so it never blocks the event loop.
+        """
+        self.path = path
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-log")
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                db.execute(statement)
+            db.commit()
+            self._local.db = db
+        return db
+
+    def _write(self, event: RunEvent):
+        db = self._connection()
+        with db:
+            db.execute(
+                "INSERT INTO run_events (run_id, seq, kind, step, input, output, usage, started_at, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (event.run_id, event.seq, event.kind, event.step, event.input, event.output,
+                 json.dumps(event.usage), event.started_at, event.duration),
+            )
+
+    def _read(self, run_id: str) -> List[RunEvent]:
+        rows = self._connection().execute(
+            "SELECT run_id, seq, kind, step, input, output, usage, started_at, duration "
+            "FROM run_events WHERE run_id = ? ORDER BY id", (run_id,),
+        ).fetchall()
+        return [RunEvent(*row[:6], json.loads(row[6]), *row[7:]) for row in rows]
+
+    def _run_ids(self) -> List[str]:
+        rows = self._connection().execute("SELECT run_id FROM run_events GROUP BY run_id ORDER BY MIN(id)").fetchall()
+        return [row[0] for row in rows]
+
+    async def append(self, event: RunEvent):
+        await asyncio.get_running_loop().run_in_executor(self._io, self._write, event)
+
+    async def events(self, run_id: str) -> List[RunEvent]:
+        return await asyncio.get_running_loop().run_in_executor(self._io, self._read, run_id)
+
+    async def runs(self) -> List[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._io, self._run_ids)
+
+    def _disconnect(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(self._io, self._disconnect)
+        self._io.shutdown()
+
+
+@dataclass
+class RunStats:
+    recorded_steps: int = 0
+    replayed_steps: int = 0
+    tokens_saved: int = 0
+    seconds_saved: float = 0.0
+    # Replay only: whether walking the steps again reproduced the recorded result
+    same_result: Optional[bool] = None
+
+    def summary(self) -> dict:
+        return {
+            "recorded_steps": self.recorded_steps,
+            "replayed_steps": self.replayed_steps,
+            "tokens_saved": self.tokens_saved,
+            "seconds_saved": round(self.seconds_saved, 3),
+            "same_result": self.same_result,
+        }
+
+
+def _step_key(step: str, input_text: str) -> Tuple[str, str]:
+    return step, hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+
+
+class RunRecorder:
+    def __init__(self, log: BaseRunLog, run_id: str, events: List[RunEvent], replay: bool = False):
+        """
+        Checkpoints one orchestration run: completed steps found in the log are returned
+        without calling the agent again, new ones are appended as they complete. Use
+        `await RunRecorder.open(...)`.
+
+        Steps are matched by name and input, then in recorded order, so concurrent steps
+        (e.g. fanned-out candidates) resume correctly whatever order they finish in.
+
+        `result` holds the recorded result of a finished run. A replay writes nothing and
+        compares the result it reaches with that one.
+        """
+        self.log = log
+        self.run_id = run_id
+        self.replay = replay
+        self.stats = RunStats()
+        self.result: Optional[str] = None
+        self.started = False
+        # Steps whose output wasn't worth keeping; a run with any isn't recorded as finished
+        self.unrecorded = 0
+        self._recorded: Dict[Tuple[str, str], Deque[RunEvent]] = defaultdict(deque)
+        for event in events:
+            if event.kind == "step":
+                self._recorded[_step_key(event.step, event.input)].append(event)
+            elif event.kind == "run_started":
+                self.started = True
+            elif event.kind == "run_finished":
+                self.result = event.output
+        self._seq = max((event.seq for event in events), default=-1) + 1
+
+    @classmethod
+    async def open(cls, log: BaseRunLog, run_id: str, replay: bool = False) -> "RunRecorder":
+        events = await log.events(run_id)
+        if replay and not events:
+            raise ReplayError(f"No recorded run '{run_id}' to replay.", run_id)
+        return cls(log, run_id, events, replay)
+
+    async def _append(self, kind: str, step: str = "", input_text: str = "", output: str = "",
+                      usage: Dict[str, Any] = None, started_at: float = 0.0, duration: float = 0.0):
+        event = RunEvent(self.run_id, self._seq, kind, step, input_text, output, usage or {}, started_at, duration)
+        self._seq += 1
+        await self.log.append(event)
+
+    async def start(self, input_text: str):
+        if not self.started:
+            self.started = True
+            await self._append("run_started", input_text=input_text, started_at=time.time())
+
+    async def finish(self, result: str):
+        """
+        Records the run's result, unless some of its steps weren't recorded: then the
+        run stays open, so resuming it redoes those steps rather than returning this result.
+        """
+        if self.replay:
+            if self.result is not None:
+                self.stats.same_result = result == self.result
+                if not self.stats.same_result:
+                    logger.warning(f"Run {self.run_id}: replay ended with a different result than recorded.")
+            return
+        self.result = result
+        if self.unrecorded:
+            logger.info(f"Run {self.run_id}: {self.unrecorded} step(s) weren't recorded; "
+                        f"leaving the run open so resuming it retries them.")
+            return
+        await self._append("run_finished", output=result, started_at=time.time())
+
+    async def step(self, step: str, input_text: str, call: Callable[[], Awaitable[str]],
+                   on_replay: Callable[[str], Awaitable[Any]] = None,
+                   keep: Callable[[str], bool] = None) -> str:
+        """
+        Returns the recorded output of the step, or runs `call` and records its output,
+        token usage and timing. `on_replay` receives a recorded output, e.g. to put the
+        exchange into the agent's memory as if it had just happened. Outputs `keep`
+        rejects (e.g. a transient failure) are returned without being recorded.
+
+        A `call` that raises records nothing, so resuming the run retries the step.
+        """
+        recorded = self._recorded.get(_step_key(step, input_text))
+        if recorded:
+            event = recorded.popleft()
+            self.stats.replayed_steps += 1
+            self.stats.tokens_saved += event.usage.get("prompt_tokens", 0) + event.usage.get("completion_tokens", 0)
+            self.stats.seconds_saved += event.duration
+            logger.debug(f"Run {self.run_id}: reusing recorded step {event.seq} ({step}).")
+            if on_replay is not None:
+                await on_replay(event.output)
+            return event.output
+        if self.replay:
+            raise ReplayError(f"Run '{self.run_id}' has no recorded '{step}' step for this input.", self.run_id, step)
+
+        started_at, start = time.time(), time.perf_counter()
+        with telemetry.collect_usage() as usage:
+            output = await call()
+        if keep is not None and not keep(output):
+            self.unrecorded += 1
+            logger.info(f"Run {self.run_id}: not recording the '{step}' step; it will run again on resume.")
+            return output
+        await self._append("step", step, input_text, output, usage, started_at, time.perf_counter() - start)
+        self.stats.recorded_steps += 1
+        return output
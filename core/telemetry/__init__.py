@@ -0,0 +1,3 @@
+from core.telemetry.tracer import Tracer, Span, configure, get_tracer, set_tracer, span, start_span, record_usage, collect_usage
+from core.telemetry.exporters import InMemoryExporter, LoggingExporter, OpenTelemetryExporter, PrometheusExporter
+from core.telemetry.pricing import estimate_cost
@@ -0,0 +1,110 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List
+from core.telemetry.tracer import Span
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryExporter:
+    def __init__(self, keep_spans: int = 10_000):
+        """
+        Keeps finished spans and per-phase totals in process; handy for tests and benchmarks.
+        """
+        self.keep_spans = keep_spans
+        self.spans: List[Span] = []
+        self.phase_seconds: Dict[str, float] = defaultdict(float)
+        self.phase_counts: Dict[str, int] = defaultdict(int)
+        self.tokens: Dict[str, int] = defaultdict(int)
+        self.cost_usd = 0.0
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        self.phase_seconds[span.name] += span.duration
+        self.phase_counts[span.name] += 1
+        self.tokens["prompt"] += span.attributes.get("prompt_tokens", 0)
+        self.tokens["completion"] += span.attributes.get("completion_tokens", 0)
+        self.cost_usd += span.attributes.get("cost_usd", 0.0)
+        if len(self.spans) < self.keep_spans:
+            self.spans.append(span)
+
+    def summary(self) -> dict:
+        return {
+            "phases": {
+                name: {"count": self.phase_counts[name], "mean_ms": round(1000 * total / self.phase_counts[name], 3)}
+                for name, total in self.phase_seconds.items()
+            },
+            "tokens": dict(self.tokens),
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class LoggingExporter:
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        logger.log(self.level, f"{span.name} {span.duration * 1000:.2f}ms {span.attributes}")
+
+
+class OpenTelemetryExporter:
+    def __init__(self, tracer_name: str = "core"):
+        """
+        Mirrors spans into OpenTelemetry. Requires `opentelemetry-api` (and an SDK /
+        exporter configured by the application).
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryExporter requires the 'opentelemetry-api' package.") from e
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+
+    def on_start(self, span: Span):
+        parent = span.parent.exporter_data.get("otel") if span.parent is not None else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        span.exporter_data["otel"] = self._tracer.start_span(span.name, context=context)
+
+    def on_end(self, span: Span):
+        otel_span = span.exporter_data.pop("otel", None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        otel_span.end()
+
+
+class PrometheusExporter:
+    def __init__(self, registry=None, namespace: str = "llm"):
+        """
+        Publishes phase latencies, token counts and cost as Prometheus metrics.
+        Requires `prometheus_client`; serve them with its `start_http_server`.
+        """
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError as e:
+            raise ImportError("PrometheusExporter requires the 'prometheus_client' package.") from e
+        registry = registry or REGISTRY
+        self.phase_seconds = Histogram(f"{namespace}_phase_seconds", "Duration of instrumented phases.",
+                                       ["phase"], registry=registry)
+        self.tokens = Counter(f"{namespace}_tokens_total", "Tokens used by LLM calls.",
+                              ["model", "kind"], registry=registry)
+        self.cost = Counter(f"{namespace}_cost_usd_total", "Estimated cost of LLM calls.",
+                            ["model"], registry=registry)
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        self.phase_seconds.labels(span.name).observe(span.duration)
+        if "prompt_tokens" in span.attributes:
+            model = span.attributes.get("model") or "unknown"
+            self.tokens.labels(model, "prompt").inc(span.attributes["prompt_tokens"])
+            self.tokens.labels(model, "completion").inc(span.attributes["completion_tokens"])
+            self.cost.labels(model).inc(span.attributes.get("cost_usd", 0.0))
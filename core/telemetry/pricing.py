@@ -0,0 +1,24 @@
+from typing import Dict, Optional, Tuple
+
+# USD per million (prompt, completion) tokens, matched by longest model prefix.
+# Local models (llama, deepseek-coder, codellama served by Ollama) cost nothing per token.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5": (0.50, 1.50),
+}
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Returns the estimated USD cost of a call, or 0.0 for unpriced (local) models.
+    """
+    if not model:
+        return 0.0
+    matches = [prefix for prefix in MODEL_PRICING if model.startswith(prefix)]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICING[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
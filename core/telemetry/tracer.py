@@ -0,0 +1,189 @@
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from core.telemetry.pricing import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent", "attributes", "start", "end_time", "exporter_data", "_tracer", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent = parent
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end_time: Optional[float] = None
+        self.exporter_data: Dict[str, Any] = {}
+        self._tracer = tracer
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_time or time.perf_counter()) - self.start)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+            self._tracer._on_end(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """
+    Returned when tracing is disabled: one shared object whose methods do nothing.
+    """
+    __slots__ = ()
+    name = ""
+    attributes: Dict[str, Any] = {}
+    duration = 0.0
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Token totals of the innermost `collect_usage()` block, kept whether or not tracing is enabled
+_usage_sink: ContextVar[Optional[Dict[str, Any]]] = ContextVar("usage_sink", default=None)
+
+
+class Tracer:
+    def __init__(self, exporters: List[Any] = None, enabled: bool = True):
+        """
+        Records timed spans for the hot paths (memory reads, serialization, network
+        wait, time to first token, extraction, verification) plus token usage and cost.
+
+        Exporters receive `on_start(span)` and `on_end(span)` calls. When `enabled` is
+        False, `span()` returns a shared no-op object, so instrumented code costs one
+        attribute check per span.
+        """
+        self.exporters = list(exporters or [])
+        self.enabled = enabled
+
+    def span(self, name: str, **attributes):
+        """
+        Context manager timing a phase; nested spans record their parent.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return self.start_span(name, **attributes)
+
+    def start_span(self, name: str, **attributes):
+        """
+        Starts a span that is ended explicitly with `span.end()` (for phases that don't
+        map onto a `with` block, like time to first token). Not made current.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        span = Span(self, name, _current_span.get(), attributes)
+        for exporter in self.exporters:
+            try:
+                exporter.on_start(span)
+            except Exception as e:
+                logger.debug(f"Span exporter {exporter!r} failed on start: {e}")
+        return span
+
+    def _on_end(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.on_end(span)
+            except Exception as e:
+                logger.debug(f"Span exporter {exporter!r} failed on end: {e}")
+
+    def record_usage(self, model: Optional[str], prompt_tokens: int, completion_tokens: int):
+        """
+        Attaches token counts and estimated cost to the current span.
+        """
+        if not self.enabled:
+            return
+        span = _current_span.get()
+        if span is None:
+            return
+        span.attributes["model"] = model
+        span.attributes["prompt_tokens"] = prompt_tokens
+        span.attributes["completion_tokens"] = completion_tokens
+        span.attributes["cost_usd"] = estimate_cost(model, prompt_tokens, completion_tokens)
+
+
+_tracer = Tracer(enabled=False)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def configure(exporters: List[Any] = None, enabled: bool = True) -> Tracer:
+    """
+    Installs a new global tracer, e.g. `configure([PrometheusExporter()])`.
+    """
+    set_tracer(Tracer(exporters=exporters, enabled=enabled))
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """
+    Shortcut for `get_tracer().span(...)`.
+    """
+    return _tracer.span(name, **attributes)
+
+
+def start_span(name: str, **attributes):
+    return _tracer.start_span(name, **attributes)
+
+
+def record_usage(model: Optional[str], prompt_tokens: int, completion_tokens: int):
+    sink = _usage_sink.get()
+    if sink is not None:
+        sink["model"] = sink["model"] or model
+        sink["prompt_tokens"] += prompt_tokens
+        sink["completion_tokens"] += completion_tokens
+    _tracer.record_usage(model, prompt_tokens, completion_tokens)
+
+
+@contextmanager
+def collect_usage():
+    """
+    Sums the token usage reported by the requests made inside the block, including
+    tasks started from it: `with collect_usage() as usage: ...; usage["prompt_tokens"]`.
+    """
+    sink = {"model": None, "prompt_tokens": 0, "completion_tokens": 0}
+    token = _usage_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _usage_sink.reset(token)
@@ -1,7 +1,7 @@
-from core.adapters import DeepSeekAdapter,OpenAIAdapter
+from core.adapters import OpenAIAdapter
 from dotenv import load_dotenv
 import os
-from core.code_builder import extract_code
+from core.code_builder import CodeRefiner, extract_code
 import asyncio
 from core.memory.in_memory_adapter import InMemoryAdapter
 # Load variables from .env file
@@ -35,6 +35,8 @@ async def run_task():
         api_key=os.getenv("OPEN_AI_API_KEY"),  # Your OpenAI API key here
         model="gpt-4",  # Optionally override the model to use GPT-4
         temperature=0.7,
+        # Follow-ups are answered with edit blocks applied to the generated program
+        refiner=CodeRefiner(min_lines=10),
     )
 
     # First Task
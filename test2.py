@@ -63,5 +63,8 @@ async def run_task():
     result = await orchestrator.route_task(input_task)
     print(result)
 import asyncio  
+import logging
 if __name__ == "__main__":
+    # Orchestrator progress is reported through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     asyncio.run(run_task())
\ No newline at end of file
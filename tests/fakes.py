@@ -0,0 +1,61 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, NamedTuple
+
+from core.adapters.llm_adapter import LLMAdapter
+from core.errors.llm_error import LLMRequestError
+
+
+class ScriptedAdapter(LLMAdapter):
+    """
+    Adapter answering from `script`: each request takes the next entry, raising it if it is
+    an exception. A list entry is streamed as deltas by `model_stream`, and an exception
+    inside it fails the stream at that point. A `slow` entry is answered after a delay.
+    Once the script runs out, requests echo the last message.
+    """
+
+    def build_llm_config(self) -> dict:
+        return {"model": self.llm_kwargs["model"], "api_key": self.llm_kwargs["api_key"],
+                "temperature": self.llm_kwargs.get("temperature")}
+
+    def _next(self, messages_to_send: List[Dict]):
+        self.requests = getattr(self, "requests", []) + [list(messages_to_send)]
+        script = getattr(self, "script", [])
+        return script.pop(0) if script else f"echo: {messages_to_send[-1]['content']}"
+
+    async def send_request(self, messages_to_send: List[Dict], **request_options) -> str:
+        self.request_options = getattr(self, "request_options", []) + [request_options]
+        entry = self._next(messages_to_send)
+        if isinstance(entry, Slow):
+            await asyncio.sleep(entry.seconds)
+            entry = entry.reply
+        if isinstance(entry, BaseException):
+            raise entry
+        return "".join(entry) if isinstance(entry, list) else entry
+
+    async def model_stream(self, messages_to_send: List[Dict]) -> AsyncIterator[str]:
+        entry = self._next(messages_to_send)
+        for part in entry if isinstance(entry, list) else [entry]:
+            if isinstance(part, BaseException):
+                raise part
+            yield part
+
+
+async def scripted(*script, name: str = "Scripted", **llm_kwargs) -> ScriptedAdapter:
+    llm_kwargs.setdefault("model", "gpt-4")
+    llm_kwargs.setdefault("api_key", "test-key")
+    adapter = await ScriptedAdapter.create(name=name, system_message=f"You are {name}.", **llm_kwargs)
+    adapter.script = list(script)
+    return adapter
+
+
+class Slow(NamedTuple):
+    reply: object
+    seconds: float
+
+
+def slow(reply, seconds: float = 0.05) -> Slow:
+    return Slow(reply, seconds)
+
+
+def failure(status_code: int = 503, retryable: bool = None) -> LLMRequestError:
+    return LLMRequestError("scripted failure", status_code=status_code, retryable=retryable)
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+
+from core.adapters.adapter_pool import AdapterPool, CircuitBreaker
+from core.errors.llm_error import LLMRequestError, NoHealthyBackendError
+from tests.fakes import failure, scripted
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _open(breaker: CircuitBreaker, ago: float = 0.0) -> CircuitBreaker:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - ago
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allows_request()
+
+
+def test_checking_an_open_breaker_has_no_side_effects():
+    breaker = _open(CircuitBreaker(failure_threshold=1, reset_timeout=1), ago=2)
+    assert breaker.allows_request()
+    assert breaker.allows_request()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_breaker_allows_one_trial_at_a_time():
+    breaker = _open(CircuitBreaker(failure_threshold=1, reset_timeout=1), ago=2)
+    assert breaker.acquire()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allows_request()
+    assert not breaker.acquire()
+    breaker.release()
+    assert breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.opened_at -= 2
+    assert breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.acquire() and breaker.acquire()
+
+
+async def _pool(*backends, **kwargs) -> AdapterPool:
+    return await AdapterPool.create(name="Pool", system_message="You are a pool.", backends=list(backends), **kwargs)
+
+
+def test_ranking_does_not_lock_out_recovering_backends():
+    async def scenario():
+        primary, spare = await scripted(failure(), name="Primary"), await scripted(name="Spare")
+        pool = await _pool(primary, spare, failure_threshold=1, reset_timeout=0.05)
+        await pool.send_request(MESSAGES)  # Primary fails over to Spare and opens
+        await asyncio.sleep(0.06)
+        # Ranking alone (as when another backend is picked) must not use up the trial
+        pool._ranked_backends()
+        pool._ranked_backends()
+        primary_backend = pool.backends[0]
+        assert primary_backend.breaker.allows_request()
+        pool.strategy = "latency"  # Primary has no latency samples, so it ranks first
+        reply = await pool.send_request(MESSAGES)
+        return reply, primary_backend.breaker.state
+
+    reply, state = asyncio.run(scenario())
+    assert reply == "echo: hi"
+    assert state == CircuitBreaker.CLOSED
+
+
+def test_send_request_fails_over_and_raises_typed_errors():
+    async def scenario():
+        first, second = await scripted(failure(), name="First"), await scripted(failure(), name="Second")
+        pool = await _pool(first, second)
+        with pytest.raises(NoHealthyBackendError) as error:
+            await pool.send_request(MESSAGES)
+        return error.value, pool.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert [name for name, _ in error.errors] == ["First", "Second"]
+    assert [backend["failures"] for backend in stats] == [1, 1]
+
+
+def test_cancelled_hedge_releases_the_trial():
+    async def scenario():
+        slow, fast = await scripted(name="Slow"), await scripted(name="Fast")
+        send_request = slow.send_request
+
+        async def slow_request(messages, **options):
+            await asyncio.sleep(0.2)
+            return await send_request(messages, **options)
+
+        slow.send_request = slow_request
+        pool = await _pool(slow, fast, hedge=True, hedge_after=0.01, failure_threshold=1, reset_timeout=0)
+        slow_breaker = pool.backends[0].breaker
+        _open(slow_breaker, ago=1)
+        pool.strategy = "latency"
+        reply = await pool.send_request(MESSAGES)
+        await asyncio.sleep(0)
+        return reply, slow_breaker
+
+    reply, breaker = asyncio.run(scenario())
+    assert reply == "echo: hi"
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allows_request()
+
+
+async def _stream(pool: AdapterPool):
+    return [delta async for delta in pool.model_stream(MESSAGES)]
+
+
+def test_stream_fails_over_before_the_first_delta():
+    async def scenario():
+        broken, healthy = await scripted([failure()], name="Broken"), await scripted(["a", "b"], name="Healthy")
+        pool = await _pool(broken, healthy)
+        return await _stream(pool), pool.stats()
+
+    deltas, stats = asyncio.run(scenario())
+    assert deltas == ["a", "b"]
+    assert [(backend["requests"], backend["failures"]) for backend in stats] == [(1, 1), (1, 0)]
+
+
+def test_stream_failure_after_output_is_raised():
+    async def scenario():
+        flaky, spare = await scripted(["a", failure()], name="Flaky"), await scripted(name="Spare")
+        pool = await _pool(flaky, spare)
+        seen = []
+        with pytest.raises(LLMRequestError):
+            async for delta in pool.model_stream(MESSAGES):
+                seen.append(delta)
+        return seen, pool.stats()
+
+    seen, stats = asyncio.run(scenario())
+    assert seen == ["a"]
+    assert stats[0]["failures"] == 1
+    assert stats[1]["requests"] == 0
+
+
+def test_stream_raises_when_every_backend_fails():
+    async def scenario():
+        pool = await _pool(await scripted([failure()], name="One"), await scripted([failure()], name="Two"),
+                           failure_threshold=1)
+        with pytest.raises(NoHealthyBackendError) as first:
+            await _stream(pool)
+        with pytest.raises(NoHealthyBackendError) as second:
+            await _stream(pool)
+        return first.value, second.value
+
+    first, second = asyncio.run(scenario())
+    assert len(first.errors) == 2
+    assert second.errors == []  # every breaker is open now
+
+
+def test_pool_streams_through_stream_response():
+    async def scenario():
+        pool = await _pool(await scripted([failure()], name="Broken"), await scripted(["ok"], name="Healthy"))
+        return [delta async for delta in pool.stream_response("task")]
+
+    assert asyncio.run(scenario()) == ["ok"]
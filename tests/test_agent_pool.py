@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from core.agents.agent_pool import AgentPool, AgentTemplate
+from core.config.roles import MessageRole
+from tests.fakes import ScriptedAdapter
+
+TEMPLATE = AgentTemplate("Developer", "You write code.", ScriptedAdapter, {"model": "gpt-4", "api_key": "test-key"},
+                         seed_messages=[(MessageRole.USER, "Example task"), (MessageRole.ASSISTANT, "Example code")])
+
+
+async def _contents(agent):
+    return [message["content"] for message in await agent.adapter.memory.get_history(limit=100)]
+
+
+def test_pooled_agents_are_seeded_forks_reset_on_checkin():
+    async def scenario():
+        pool = await AgentPool(TEMPLATE, size=2).start()
+        async with pool.agent() as agent:
+            reply = await agent.run("Real task")
+            used = await _contents(agent)
+        again = await pool.checkout()
+        return pool, agent, again, reply, used, await _contents(again)
+
+    pool, agent, again, reply, used, reset = asyncio.run(scenario())
+    assert reply == "echo: Real task"
+    assert used == ["You write code.", "Example task", "Example code", "Real task", "echo: Real task"]
+    assert reset == ["You write code.", "Example task", "Example code"]
+    assert again is not agent  # the first idle agent comes back first, the used one queued behind it
+    assert agent.adapter.llm_config is pool._prototype.adapter.llm_config
+    assert (pool.stats.created, pool.stats.checkouts, pool.idle) == (2, 2, 1)
+
+
+def test_checkouts_wait_at_max_size_and_grow_below_it():
+    async def scenario():
+        bounded = await AgentPool(TEMPLATE, size=1, max_size=1).start()
+        first = await bounded.checkout()
+        waiting = asyncio.create_task(bounded.checkout())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        await bounded.checkin(first)
+        second = await waiting
+
+        growing = await AgentPool(TEMPLATE, size=0).start()
+        await asyncio.gather(growing.checkout(), growing.checkout())
+        with pytest.raises(ValueError, match="not checked out"):
+            await growing.checkin(first)
+        return second is first, bounded.stats.waits, growing.stats.created
+
+    assert asyncio.run(scenario()) == (True, 1, 2)
+
+
+def test_max_size_must_allow_the_initial_agents():
+    with pytest.raises(ValueError):
+        AgentPool(TEMPLATE, size=3, max_size=2)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from core.adapters.rate_limiter import RateLimiter, TokenBucket, get_rate_limiter
+from core.errors.llm_error import LLMRequestError
+from core.orchestrator.batch_runner import BatchRunner
+from tests.fakes import failure, scripted
+
+
+def test_retryable_failures_are_retried_with_backoff():
+    async def scenario():
+        adapter = await scripted(failure(503), failure(429), "done", max_retries=3, retry_backoff=0.001)
+        return await adapter.model_request([{"role": "user", "content": "hi"}]), adapter
+
+    reply, adapter = asyncio.run(scenario())
+    assert reply == "done"
+    assert len(adapter.requests) == 3
+
+
+def test_non_retryable_failures_are_not_retried():
+    async def scenario():
+        adapter = await scripted(failure(400), "unused", max_retries=3, retry_backoff=0.001, raise_errors=True)
+        with pytest.raises(LLMRequestError):
+            await adapter.model_request([{"role": "user", "content": "hi"}])
+        return adapter
+
+    assert len(asyncio.run(scenario()).requests) == 1
+
+
+def test_exhausted_retries_return_an_error_string_by_default():
+    async def scenario():
+        adapter = await scripted(failure(), failure(), failure(), max_retries=2, retry_backoff=0.001)
+        return await adapter.model_request([{"role": "user", "content": "hi"}])
+
+    assert asyncio.run(scenario()).startswith("Error: scripted failure")
+
+
+def test_retry_after_overrides_backoff():
+    async def scenario():
+        error = LLMRequestError("slow down", status_code=429, retry_after=0.05)
+        adapter = await scripted(error, "done", max_retries=1, retry_backoff=10)
+        start = time.perf_counter()
+        await adapter.model_request([{"role": "user", "content": "hi"}])
+        return time.perf_counter() - start
+
+    assert 0.05 <= asyncio.run(scenario()) < 1
+
+
+def test_token_bucket_waits_for_refill():
+    async def scenario():
+        bucket = TokenBucket(per_minute=600, capacity=2)  # 10 per second
+        start = time.perf_counter()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    assert 0.15 <= asyncio.run(scenario()) < 1
+
+
+def test_oversized_requests_are_clamped_to_the_bucket():
+    async def scenario():
+        bucket = TokenBucket(per_minute=60_000, capacity=100)
+        await asyncio.wait_for(bucket.acquire(10_000), timeout=1)
+        return bucket.tokens
+
+    assert asyncio.run(scenario()) == pytest.approx(0, abs=5)
+
+
+def test_rate_limiters_are_shared_per_endpoint_and_model():
+    limiter = get_rate_limiter("http://host/v1", "model-a", rpm=60)
+    assert get_rate_limiter("http://host/v1", "model-a", rpm=60) is limiter
+    assert get_rate_limiter("http://host/v1", "model-b", rpm=60) is not limiter
+    assert get_rate_limiter("http://host/v1", "model-a", rpm=120).rpm == 120
+    assert get_rate_limiter("http://host/v1", "model-a") is None
+    assert isinstance(limiter, RateLimiter)
+
+
+def test_batch_runner_bounds_concurrency_and_keeps_input_order():
+    async def scenario():
+        adapter = await scripted()
+        in_flight = peak = 0
+        send_request = adapter.send_request
+
+        async def slow_request(messages, **options):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await send_request(messages, **options)
+
+        adapter.send_request = slow_request
+        runner = BatchRunner(adapter, concurrency=3)
+        return await runner.run_all(f"task {i}" for i in range(10)), runner.stats, peak
+
+    results, stats, peak = asyncio.run(scenario())
+    assert [result.output for result in results] == [f"echo: task {i}" for i in range(10)]
+    assert stats.completed == 10 and stats.failed == 0
+    assert peak == 3
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.compare import compare, main
+
+
+def _report(**results):
+    return {"commit": "abc", "timestamp": "now", "settings": {}, "results": results}
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    base = _report(batch={"throughput_per_s": 100.0, "p95_ms": 50.0, "concurrency": 32})
+    head = _report(batch={"throughput_per_s": 80.0, "p95_ms": 40.0, "concurrency": 64})
+    rows = {metric: regressed for _, metric, _, _, _, regressed in compare(base, head, threshold=0.1)}
+    assert rows == {"throughput_per_s": True, "p95_ms": False}
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for name, report in (("base", base), ("head", head)):
+            paths.append(os.path.join(directory, f"{name}.json"))
+            with open(paths[-1], "w") as file:
+                json.dump(report, file)
+        assert main(paths) == 1
+        assert main(paths + ["--threshold", "0.5"]) == 0
+
+
+def test_quick_suite_writes_a_comparable_report():
+    with tempfile.TemporaryDirectory() as directory:
+        subprocess.run([sys.executable, "-m", "benchmarks.suite", "--quick", "--output", directory,
+                        "--workloads", "single_adapter", "agent_memory"], check=True, capture_output=True)
+        [name] = os.listdir(directory)
+        with open(os.path.join(directory, name)) as file:
+            report = json.load(file)
+    assert set(report["results"]) == {"single_adapter", "agent_memory"}
+    assert report["results"]["single_adapter"]["failed"] == 0
+    assert report["results"]["agent_memory"]["bytes_per_agent"] > 0
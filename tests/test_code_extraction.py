@@ -0,0 +1,47 @@
+import asyncio
+
+from core.code_builder import extract_code
+from core.code_builder.fence_parser import CodeBlock, IncrementalCodeExtractor, extract_code_stream, normalize_language
+
+REPLY = ("Here it is:\r\n````py title=demo.py\r\nprint('```')\r\nx = 1\r\n````\r\n"
+         "And a script:\n~~~bash\necho hi\n~~~\nDone.")
+
+
+def test_blocks_are_the_same_whatever_the_chunking():
+    expected = [CodeBlock("python", "print('```')\nx = 1"), CodeBlock("bash", "echo hi")]
+    for size in (1, 3, 7, len(REPLY)):
+        extractor = IncrementalCodeExtractor()
+        blocks = []
+        for start in range(0, len(REPLY), size):
+            blocks += extractor.feed(REPLY[start:start + size])
+        assert blocks + extractor.close() == expected, size
+
+
+def test_language_filter_and_unterminated_blocks():
+    extractor = IncrementalCodeExtractor("python3")
+    assert extractor.feed(REPLY) == [CodeBlock("python", "print('```')\nx = 1")]
+    extractor = IncrementalCodeExtractor()
+    assert extractor.feed("```js\nlet a = 1;\n") == []
+    assert extractor.close() == [CodeBlock("javascript", "let a = 1;", complete=False)]
+    assert normalize_language("{.Python3}") == "python" and normalize_language(None) == ""
+
+
+def test_extract_code_prefers_the_language_then_untagged_blocks():
+    assert extract_code("  x = 1\n") == ["x = 1"]
+    assert extract_code(REPLY) == ["print('```')\nx = 1"]
+    assert extract_code("```\nuntagged\n```\n```bash\necho\n```") == ["untagged"]
+    assert extract_code("```bash\necho\n```", language="python") == ["```bash\necho\n```"]
+
+
+def test_blocks_are_yielded_as_soon_as_they_close():
+    seen = []
+
+    async def deltas():
+        for delta in ["```python\n", "a = 1\n", "```\n", "more text"]:
+            seen.append(delta)
+            yield delta
+
+    async def scenario():
+        return [(block.code, len(seen)) async for block in extract_code_stream(deltas())]
+
+    assert asyncio.run(scenario()) == [("a = 1", 3)]
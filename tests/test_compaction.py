@@ -0,0 +1,45 @@
+import asyncio
+
+from core.adapters.llm_adapter import raising_errors
+from core.config.roles import MessageRole
+from core.memory.compacting_memory_adapter import CompactingMemoryAdapter
+from tests.fakes import failure, scripted
+
+TURN = "w w w w w w"  # 10 tokens with the message overhead
+
+
+def words(text: str) -> int:
+    return len(text.split())
+
+
+async def _fill(summarizer, turns: int = 3) -> CompactingMemoryAdapter:
+    memory = CompactingMemoryAdapter(summarizer, compact_at=30, keep_recent_tokens=10, max_tokens=100, counter=words)
+    await memory.add_message(MessageRole.SYSTEM, "system")
+    for _ in range(turns):
+        await memory.add_message(MessageRole.USER, TURN)
+    await memory.wait_for_compaction()
+    return memory
+
+
+def test_older_turns_are_folded_into_a_summary():
+    async def scenario():
+        summarizer = await scripted("The user sent filler.", name="Summarizer")
+        memory = await _fill(summarizer)
+        return memory, await memory.get_history(limit=100), summarizer.requests
+
+    memory, history, requests = asyncio.run(scenario())
+    assert memory.compactions == 1
+    assert [message["content"] for message in history] == [
+        "system", "Summary of the earlier conversation:\nThe user sent filler.", TURN]
+    # Two turns folded, the most recent one kept verbatim
+    assert requests[0][1]["content"].count(TURN) == 2
+
+
+def test_a_failed_summary_leaves_the_history_alone():
+    async def scenario():
+        returning = await _fill(await scripted(failure(retryable=False), name="Summarizer", max_retries=0))
+        with raising_errors():
+            raising = await _fill(await scripted(failure(retryable=False), name="Summarizer", max_retries=0))
+        return [(memory.compactions, len(await memory.get_history(limit=100))) for memory in (returning, raising)]
+
+    assert asyncio.run(scenario()) == [(0, 4), (0, 4)]
@@ -0,0 +1,68 @@
+import asyncio
+
+from core.agents.sk_agent import SKAgent
+from core.orchestrator.orchestrator import Orchestrator
+from tests.fakes import scripted, slow
+
+
+async def _orchestrator(developer_script, verifier_script, **kwargs) -> Orchestrator:
+    router = SKAgent(await scripted(name="Router"))
+    developer = SKAgent(await scripted(*developer_script, name="Developer"))
+    verifier = SKAgent(await scripted(*verifier_script, name="Verifier"))
+    return Orchestrator(router, developer, verifier, **kwargs)
+
+
+async def _history(agent: SKAgent):
+    return [(message["role"], message["content"]) for message in await agent.adapter.memory.get_history()][1:]
+
+
+def test_fan_out_returns_the_approved_candidate_and_keeps_it_in_memory():
+    async def scenario():
+        orchestrator = await _orchestrator(["first draft", "second draft"],
+                                           ["Verdict: REJECTED", "Verdict: APPROVED"], candidates=2)
+        code, review = await orchestrator._fan_out("Implement a function that parses dates")
+        return code, review, await _history(orchestrator.developer)
+
+    code, review, history = asyncio.run(scenario())
+    assert (code, review) == ("second draft", "Verdict: APPROVED")
+    assert history == [("user", "Implement a function that parses dates"), ("assistant", "second draft")]
+
+
+def test_fan_out_falls_back_to_the_first_rejection():
+    async def scenario():
+        orchestrator = await _orchestrator(["first draft", "second draft"],
+                                           ["Verdict: REJECTED - a", "Verdict: REJECTED - b"], candidates=2)
+        return await orchestrator._fan_out("Implement a function that parses dates")
+
+    assert asyncio.run(scenario()) == ("first draft", "Verdict: REJECTED - a")
+
+
+def test_speculative_draft_is_used_for_coding_and_dropped_otherwise():
+    async def scenario():
+        coding = await _orchestrator(["draft"], ["Verdict: APPROVED"], speculative=True)
+        coded = await coding.route_task("Implement a function that parses dates")
+        running = await _orchestrator(["draft"], ["Verdict: APPROVED"], speculative=True)
+        ran = await running.route_task("Run and deploy the service")
+        return coded, await _history(coding.developer), ran, await _history(running.developer)
+
+    coded, coding_history, ran, running_history = asyncio.run(scenario())
+    assert coded == "No executor available to execute the code."
+    assert coding_history[-1] == ("assistant", "draft")
+    assert ran == "No executor available for execution."
+    assert running_history == []
+
+
+def test_a_speculative_draft_stops_and_stays_out_of_memory_when_not_coding():
+    async def scenario():
+        # The slow review gives a running draft time to finish and touch the real agents
+        orchestrator = await _orchestrator(["draft"], [slow("Verdict: APPROVED")], speculative=True)
+        result = await orchestrator.route_task("Review this code:\n```python\nx = 1\n```")
+        await asyncio.sleep(0.1)
+        return (result, await _history(orchestrator.developer), await _history(orchestrator.verifier),
+                orchestrator.developer.adapter.script)
+
+    result, developer_history, verifier_history, developer_script = asyncio.run(scenario())
+    assert result == "Code verified and approved."
+    assert developer_history == [] and developer_script == ["draft"]
+    assert verifier_history == [("user", "Review this code:\n```python\nx = 1\n```"),
+                                ("assistant", "Verdict: APPROVED")]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.http_client import HttpClientConfig, close_async_clients, get_async_client
+from core.errors.llm_error import LLMRequestError
+
+
+def test_clients_are_shared_per_host_and_config():
+    async def scenario():
+        first = get_async_client("http://localhost:1/v1/chat/completions")
+        same_host = get_async_client("http://localhost:1/v1/models")
+        other_config = get_async_client("http://localhost:1/v1", HttpClientConfig(timeout=5.0))
+        other_host = get_async_client("http://localhost:2/v1")
+        await close_async_clients()
+        return first, same_host, other_config, other_host
+
+    first, same_host, other_config, other_host = asyncio.run(scenario())
+    assert first is same_host
+    assert first is not other_config
+    assert first is not other_host
+    assert first.is_closed
+
+
+def test_clients_are_per_event_loop():
+    async def client():
+        return get_async_client("http://localhost:1/v1")
+
+    assert asyncio.run(client()) is not asyncio.run(client())
+
+
+def _adapter(server: MockLLMServer, **llm_kwargs):
+    return DeepSeekAdapter.create(name="Test", system_message="You are a test.", api_key="key",
+                                  base_url=server.chat_url, max_retries=0, **llm_kwargs)
+
+
+def test_deepseek_requests_reuse_one_pooled_client():
+    async def scenario():
+        server = MockLLMServer(latency=0, reply="print('pooled')")
+        await server.start()
+        try:
+            adapter = await _adapter(server)
+            replies = await asyncio.gather(*(adapter.generate_response(f"task {i}") for i in range(5)))
+            clients = {id(adapter._get_client()) for _ in range(3)}
+        finally:
+            await close_async_clients()
+            await server.stop()
+        return replies, clients, server.requests_served
+
+    replies, clients, served = asyncio.run(scenario())
+    assert replies == ["print('pooled')"] * 5
+    assert len(clients) == 1
+    assert served == 5
+
+
+def test_deepseek_http_errors_become_typed_errors():
+    async def scenario():
+        server = MockLLMServer(latency=0, error_rate=1.0, error_status=429, retry_after=2)
+        await server.start()
+        try:
+            adapter = await _adapter(server)
+            with pytest.raises(LLMRequestError) as error:
+                await adapter.send_request([{"role": "user", "content": "hi"}])
+        finally:
+            await close_async_clients()
+            await server.stop()
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.retryable
+    assert error.retry_after == 2.0
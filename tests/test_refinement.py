@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from core.code_builder.patcher import apply_edit_blocks, apply_patch, apply_unified_diff, has_patch
+from core.code_builder.refiner import CodeRefiner
+from core.errors.patch_error import PatchError
+from core.memory.in_memory_adapter import InMemoryAdapter
+from core.memory.persistent_memory_adapter import PersistentMemoryAdapter
+from core.memory.sqlite_message_store import SQLiteMessageStore
+from tests.fakes import scripted
+
+CODE = "def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n"
+
+
+def _edit(search: str, replace: str) -> str:
+    return f"<<<<<<< SEARCH\n{search}=======\n{replace}>>>>>>> REPLACE"
+
+
+def test_edit_blocks_apply_in_order():
+    reply = _edit("    return a + b\n", "    return a + b + 0\n") + "\n" + _edit("", "\n\ndef neg(a):\n    return -a\n")
+    patched = apply_edit_blocks(CODE, reply)
+    assert "return a + b + 0" in patched
+    assert patched.endswith("def neg(a):\n    return -a\n")
+
+
+def test_edit_blocks_ignore_trailing_whitespace():
+    assert "return a * b" in apply_edit_blocks(CODE, _edit("def sub(a, b):   \n    return a - b\n",
+                                                             "def sub(a, b):\n    return a * b\n"))
+
+
+def test_edit_block_errors():
+    with pytest.raises(PatchError, match="no edit blocks"):
+        apply_edit_blocks(CODE, "just prose")
+    with pytest.raises(PatchError, match="does not match"):
+        apply_edit_blocks(CODE, _edit("    return a / b\n", "    return 0\n"))
+    with pytest.raises(PatchError, match="2 times"):
+        apply_edit_blocks(CODE, _edit("(a, b):\n", "(x, y):\n"))
+
+
+def test_unified_diff_placed_by_context_not_line_numbers():
+    diff = ("--- a/code.py\n+++ b/code.py\n"
+            "@@ -40,2 +40,2 @@\n def sub(a, b):\n-    return a - b\n+    return b - a\n")
+    assert has_patch(diff)
+    assert apply_unified_diff(CODE, diff) == CODE.replace("return a - b", "return b - a")
+    with pytest.raises(PatchError, match="does not match"):
+        apply_unified_diff(CODE, "@@ -1,1 +1,1 @@\n-def mul(a, b):\n+def mul(x, y):\n")
+
+
+def test_apply_patch_picks_the_format():
+    assert apply_patch(CODE, _edit("    return a + b\n", "    return b + a\n")) == CODE.replace("return a + b", "return b + a")
+    with pytest.raises(PatchError):
+        apply_patch(CODE, "no changes here")
+
+
+def _program(lines: int) -> str:
+    body = "\n".join(f"    total += {i}" for i in range(lines))
+    return f"def total():\n    total = 0\n{body}\n    return total"
+
+
+def test_refiner_keeps_large_programs_as_artifacts():
+    refiner = CodeRefiner(min_lines=10)
+    conversation = InMemoryAdapter()
+    compact, artifact = refiner.record(conversation, f"Here you go:\n```python\n{_program(20)}\n```")
+    assert artifact.version == 1
+    assert compact == f"Here you go:\n{artifact.reference()}"
+    updated = refiner.apply(conversation, artifact, _edit("    total += 3\n", "    total += 30\n"))
+    assert updated.version == 2 and "total += 30" in refiner.current(conversation).code
+    with pytest.raises(PatchError, match="does not compile"):
+        refiner.apply(conversation, updated, _edit("    return total\n", "    return total +\n"))
+    assert refiner.record(InMemoryAdapter(), f"```python\n{_program(2)}\n```")[1] is None
+
+
+def test_refiner_is_refused_on_memory_that_outlives_the_process():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            store = SQLiteMessageStore(os.path.join(directory, "memory.db"))
+            try:
+                with pytest.raises(ValueError, match="CodeRefiner"):
+                    await scripted(memory=PersistentMemoryAdapter(store, "dev"), refiner=CodeRefiner())
+                adapter = await scripted(refiner=CodeRefiner())
+                with pytest.raises(ValueError, match="CodeRefiner"):
+                    await adapter.fork(memory=PersistentMemoryAdapter(store, "fork"))
+                return await adapter.fork()
+            finally:
+                await store.close()
+
+        assert asyncio.run(scenario()).refiner is not None
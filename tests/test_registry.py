@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+from core.adapters import registry
+from core.adapters.registry import adapter_for_model, register_adapter
+from core.models import ModelPreferences
+from tests.fakes import ScriptedAdapter
+
+
+def _loaded_after(source: str):
+    probe = f"import sys\n{source}\nprint(','.join(m for m in ('openai', 'httpx', 'tiktoken') if m in sys.modules))"
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return completed.stdout.strip().split(",") if completed.stdout.strip() else []
+
+
+def test_provider_sdks_load_only_when_needed():
+    assert _loaded_after("import core.adapters") == []
+    assert "openai" not in _loaded_after("from core.adapters import DeepSeekAdapter")
+    assert "openai" in _loaded_after("from core.adapters import adapter_for_model\nadapter_for_model('gpt-4o')")
+
+
+def test_the_longest_registered_prefix_picks_the_adapter():
+    from core.adapters.deep_seek_adapter import DeepSeekAdapter
+    assert adapter_for_model("codellama:13b-python-q4") is DeepSeekAdapter
+    with pytest.raises(ValueError, match="Unsupported model"):
+        adapter_for_model("claude-2")
+    with pytest.raises(ValueError, match="must look like"):
+        register_adapter("scripted", "tests.fakes.ScriptedAdapter")
+
+
+def test_registered_prefixes_become_valid_models(monkeypatch):
+    monkeypatch.setattr(ModelPreferences, "VALID_MODEL_PREFIXES", ModelPreferences.VALID_MODEL_PREFIXES)
+    monkeypatch.setattr(registry, "_ADAPTERS", dict(registry._ADAPTERS))
+    register_adapter("scripted", "tests.fakes:ScriptedAdapter")
+    assert "scripted" in ModelPreferences.VALID_MODEL_PREFIXES
+    assert adapter_for_model("scripted-small") is ScriptedAdapter
+    assert registry._ADAPTERS["scripted"] is ScriptedAdapter
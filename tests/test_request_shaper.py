@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from core.adapters.request_shaper import RequestShaper
+from core.config.roles import MessageRole
+from core.memory.in_memory_adapter import InMemoryAdapter
+from core.memory.message import Message
+from tests.fakes import scripted
+
+
+def _turns(shaper: RequestShaper, turns: int):
+    """Shapes a conversation turn by turn; returns the prompts sent."""
+    conversation, history, prompts = InMemoryAdapter(), [], []
+    for turn in range(1, turns + 1):
+        history.append(Message(MessageRole.USER.value, f"task {turn}"))
+        prompts.append([message["content"] for message in shaper.shape(conversation, history, "system")])
+        history.append(Message(MessageRole.ASSISTANT.value, f"reply {turn}"))
+    return prompts
+
+
+def test_the_prefix_only_moves_once_per_block():
+    shaper = RequestShaper(max_messages=4, block_size=2)
+    prompts = _turns(shaper, 10)
+    assert prompts[2] == ["system", "task 3"]
+    assert prompts[3] == ["system", "task 3", "reply 3", "task 4"]
+    assert shaper.prefix_changes == 4
+    for previous, prompt in zip(prompts, prompts[1:]):
+        assert len(prompt) <= 5 and prompt[0] == "system" and prompt[1].startswith("task")
+        # Between trims each prompt extends the last one, so the server's cached prefix is reused
+        trimmed = prompt[1] != previous[1]
+        assert trimmed or prompt[:len(previous)] == previous
+
+
+def test_a_token_budget_trims_further():
+    shaper = RequestShaper(max_messages=10, max_tokens=20, block_size=1, counter=lambda text: len(text.split()))
+    # "system" costs 5 tokens and each turn 6, so at most two turns fit
+    assert all(len(prompt) <= 3 for prompt in _turns(shaper, 6))
+    with pytest.raises(ValueError):
+        RequestShaper(max_messages=0)
+
+
+def test_adapters_send_the_shaped_history():
+    async def scenario():
+        shaper = RequestShaper(max_messages=2, block_size=1)
+        adapter = await scripted(name="Local", shaper=shaper, memory=InMemoryAdapter(max_history=shaper.history_limit))
+        for turn in range(3):
+            await adapter.generate_response(f"task {turn}")
+        return adapter.requests
+
+    requests = asyncio.run(scenario())
+    assert [message["content"] for message in requests[-1]] == ["You are Local.", "task 2"]
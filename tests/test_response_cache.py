@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from core.cache.response_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_keys_depend_on_model_temperature_messages_and_options():
+    key = ResponseCache.make_key("gpt-4", 0.3, MESSAGES)
+    assert key == ResponseCache.make_key("gpt-4", 0.3, [dict(MESSAGES[0])])
+    assert key != ResponseCache.make_key("gpt-4", 0.7, MESSAGES)
+    assert key != ResponseCache.make_key("gpt-3.5", 0.3, MESSAGES)
+    assert key != ResponseCache.make_key("gpt-4", 0.3, MESSAGES, response_format={"type": "json_object"})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    async def scenario():
+        cache = ResponseCache(max_entries=2)
+        await cache.set("a", "A")
+        await cache.set("b", "B")
+        await cache.get("a")
+        await cache.set("c", "C")
+        return cache, [await cache.get(key) for key in "abc"]
+
+    cache, values = asyncio.run(scenario())
+    assert values == ["A", None, "C"]
+    assert cache.stats.evictions == 1
+
+
+def test_failures_are_not_cached():
+    async def scenario():
+        cache = ResponseCache()
+        await cache.set("a", "Error: timed out")
+        await cache.set("b", "")
+        return await cache.get("a"), await cache.get("b")
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+def test_expired_entries_are_misses():
+    async def scenario():
+        cache = ResponseCache(ttl=0.01)
+        await cache.set("a", "A")
+        await asyncio.sleep(0.02)
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
+
+
+def _rows(path: str) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def test_disk_tier_survives_restarts_and_keeps_its_size_bound():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.db")
+
+        async def fill():
+            cache = ResponseCache(max_entries=10, path=path, max_disk_entries=3)
+            for key in "abcd":
+                await cache.set(key, key.upper())
+            await cache.set("d", "D2")  # replacing a row doesn't grow the tier
+            cache.close()
+            return cache.stats.evictions
+
+        async def reopen():
+            cache = ResponseCache(max_entries=10, path=path, max_disk_entries=3)
+            values = [await cache.get(key) for key in "abcd"]
+            await cache.set("e", "E")
+            cache.close()
+            return values, cache.stats
+
+        assert asyncio.run(fill()) == 1
+        assert _rows(path) == 3
+        values, stats = asyncio.run(reopen())
+        assert values == [None, "B", "C", "D2"]
+        assert stats.disk_hits == 3
+        # The row count is restored on reconnect, so the bound still holds
+        assert _rows(path) == 3
+
+
+def test_full_disk_tier_sweeps_expired_rows_before_evicting():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.db")
+
+        async def scenario():
+            cache = ResponseCache(max_entries=10, path=path, max_disk_entries=2, ttl=0.05)
+            await cache.set("a", "A")
+            await cache.set("b", "B")
+            time.sleep(0.06)
+            await cache.set("c", "C")
+            cache.close()
+            return cache.stats.evictions
+
+        assert asyncio.run(scenario()) == 0
+        assert _rows(path) == 1
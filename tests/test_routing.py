@@ -0,0 +1,118 @@
+import asyncio
+
+from core.agents.sk_agent import SKAgent
+from core.orchestrator.orchestrator import Orchestrator
+from core.orchestrator.routing import ROUTE_RESPONSE_FORMAT, KeywordClassifier, RoutingEngine
+from tests.fakes import failure, scripted
+
+
+def test_keyword_classifier():
+    classifier = KeywordClassifier()
+    assert classifier("Implement a function that reverses a string")[0] == "coding"
+    assert classifier("Please review and verify this module")[0] == "verification"
+    assert classifier("Run and deploy the service")[0] == "execution"
+    assert classifier("What's the weather like?") == (None, 0.0)
+
+
+async def _engine(*router_replies, **llm_kwargs) -> RoutingEngine:
+    return RoutingEngine(SKAgent(await scripted(*router_replies, name="Router", **llm_kwargs)))
+
+
+def test_confident_rules_skip_the_router_and_are_cached():
+    async def scenario():
+        engine = await _engine()
+        decisions = [await engine.route("Implement a function that parses dates") for _ in range(2)]
+        return engine, decisions
+
+    engine, (first, second) = asyncio.run(scenario())
+    assert (first.route, first.source) == ("coding", "rules")
+    assert (second.route, second.source) == ("coding", "cache")
+    assert not getattr(engine.router.adapter, "requests", [])
+
+
+def test_router_llm_decides_when_the_rules_are_unsure():
+    async def scenario():
+        engine = await _engine('Sure: {"route": "execution", "confidence": 0.8}')
+        return await engine.route("Handle the nightly report"), engine.stats
+
+    decision, stats = asyncio.run(scenario())
+    assert (decision.route, decision.source, decision.confidence) == ("execution", "llm", 0.8)
+    assert stats.llm_decisions == 1
+
+
+def test_failed_or_invalid_router_answers_are_not_cached():
+    async def scenario():
+        engine = await _engine(failure(), "no idea", '{"route": "coding", "confidence": 0.9}',
+                               max_retries=0)
+        decisions = [await engine.route("Handle the nightly report") for _ in range(3)]
+        return decisions, engine.stats
+
+    decisions, stats = asyncio.run(scenario())
+    assert [decision.route for decision in decisions] == [None, None, "coding"]
+    assert stats.invalid_llm_outputs == 2
+    assert stats.cache_hits == 0
+
+
+def test_report_misroute_corrects_the_cache():
+    async def scenario():
+        engine = await _engine()
+        await engine.route("Run the tests")
+        engine.report_misroute("run   the TESTS", "verification")
+        return await engine.route("Run the tests"), engine.stats
+
+    decision, stats = asyncio.run(scenario())
+    assert (decision.route, decision.source) == ("verification", "cache")
+    assert stats.misroutes == 1
+
+
+async def _orchestrator(verifier_reply: str) -> Orchestrator:
+    agents = [SKAgent(await scripted(name=name)) for name in ("Router", "Developer", "Executor")]
+    verifier = SKAgent(await scripted(verifier_reply, name="Verifier"))
+    return Orchestrator(agents[0], agents[1], verifier, agents[2])
+
+
+def test_orchestrator_reports_verification_tasks_without_code_as_misroutes():
+    async def scenario():
+        orchestrator = await _orchestrator("REJECTED - there is no code")
+        result = await orchestrator.route_task("Please review and verify my plan for the week")
+        return result, orchestrator.routing.stats
+
+    result, stats = asyncio.run(scenario())
+    assert result.startswith("Code rejected")
+    assert stats.misroutes == 1
+
+
+def test_orchestrator_does_not_report_verification_of_code():
+    async def scenario():
+        orchestrator = await _orchestrator("APPROVED")
+        result = await orchestrator.route_task("Review and verify:\n```python\nprint(sum([1, 2]))\n```")
+        return result, orchestrator.routing.stats
+
+    result, stats = asyncio.run(scenario())
+    assert result == "Code verified and approved."
+    assert stats.misroutes == 0
+
+
+
+def test_router_falls_back_when_the_model_rejects_the_response_format():
+    async def scenario():
+        engine = await _engine(failure(status_code=400), '{"route": "execution", "confidence": 0.8}',
+                               failure(status_code=400), '{"route": "coding", "confidence": 0.7}', max_retries=0)
+        first = await engine.route("Handle the nightly report")
+        second = await engine.route("Handle the weekly report")
+        return first, second, engine.response_format, engine.router.adapter.request_options
+
+    first, second, response_format, options = asyncio.run(scenario())
+    assert (first.route, second.route) == ("execution", "coding")
+    assert response_format is None
+    assert [option.get("response_format") for option in options] == [
+        ROUTE_RESPONSE_FORMAT, {"type": "json_object"}, {"type": "json_object"}, None]
+
+
+def test_other_router_failures_are_not_retried_with_another_format():
+    async def scenario():
+        engine = await _engine(failure(status_code=401, retryable=False), max_retries=0)
+        return await engine.route("Handle the nightly report"), engine.response_format
+
+    decision, response_format = asyncio.run(scenario())
+    assert decision.route is None and response_format is ROUTE_RESPONSE_FORMAT
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from core.agents.sk_agent import SKAgent
+from core.code_builder.refiner import CodeRefiner
+from core.errors.llm_error import LLMRequestError
+from core.errors.replay_error import ReplayError
+from core.orchestrator.orchestrator import Orchestrator
+from core.orchestrator.run_log import JsonlRunLog, RunEvent, SQLiteRunLog
+from tests.fakes import failure, scripted
+
+TASK = "Implement a function that parses dates"
+PROGRAM = "def total():\n    total = 0\n" + "\n".join(f"    total += {i}" for i in range(20)) + "\n    return total"
+CODE = f"```python\n{PROGRAM}\n```"
+
+
+@pytest.mark.parametrize("log_type", [JsonlRunLog, SQLiteRunLog])
+def test_events_are_read_back_per_run(log_type):
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            log = log_type(os.path.join(directory, "runs.log"))
+            try:
+                for seq, run_id in enumerate(["a", "b", "a"]):
+                    await log.append(RunEvent(run_id, seq, "step", step="Developer", output=f"out {seq}"))
+                return [event.output for event in await log.events("a")], await log.runs()
+            finally:
+                await log.close()
+
+        outputs, runs = asyncio.run(scenario())
+        assert outputs == ["out 0", "out 2"]
+        assert runs == ["a", "b"]
+
+
+def test_jsonl_index_skips_a_torn_line_and_sees_appends_from_elsewhere():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "runs.jsonl")
+
+        async def scenario():
+            log, other = JsonlRunLog(path), JsonlRunLog(path)
+            try:
+                await log.append(RunEvent("a", 0, "run_started"))
+                with open(path, "a", encoding="utf-8") as file:
+                    file.write('{"run_id": "a", "seq": 1, "ki')  # cut short by a crash
+                assert [event.seq for event in await log.events("a")] == [0]
+                await other.append(RunEvent("a", 1, "step", output="done"))
+                await other.append(RunEvent("b", 0, "run_started"))
+                return await log.events("a"), await log.runs()
+            finally:
+                await log.close()
+                await other.close()
+
+        events, runs = asyncio.run(scenario())
+        assert [(event.seq, event.output) for event in events] == [(0, ""), (1, "done")]
+        assert runs == ["a", "b"]
+
+
+async def _orchestrator(log, developer_script=(), router_script=(), replay=False, **developer_kwargs):
+    router = SKAgent(await scripted(*router_script, name="Router", max_retries=0))
+    developer = SKAgent(await scripted(*developer_script, name="Developer", max_retries=0, **developer_kwargs))
+    verifier = SKAgent(await scripted("Verdict: APPROVED", name="Verifier"))
+    return Orchestrator(router, developer, verifier, run_log=log, replay=replay)
+
+
+def test_a_failed_step_is_not_recorded_and_resuming_retries_it():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            log = JsonlRunLog(os.path.join(directory, "runs.jsonl"))
+            try:
+                failing = await _orchestrator(log, [failure(retryable=False)])
+                with pytest.raises(LLMRequestError):
+                    await failing.route_task(TASK, run_id="run")
+                assert [event.step for event in await log.events("run")] == ["", "route"]
+
+                resumed = await _orchestrator(log, [CODE])
+                result = await resumed.route_task(TASK, run_id="run")
+                return result, resumed.last_run.stats, await log.events("run")
+            finally:
+                await log.close()
+
+        result, stats, events = asyncio.run(scenario())
+        assert result == "No executor available to execute the code."
+        assert stats.replayed_steps == 1 and stats.recorded_steps == 2
+        assert [event.kind for event in events][-1] == "run_finished"
+
+
+def test_an_unroutable_decision_is_not_recorded_and_the_run_stays_open():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            log = JsonlRunLog(os.path.join(directory, "runs.jsonl"))
+            try:
+                confused = await _orchestrator(log, router_script=["no idea"])
+                first = await confused.route_task("Handle the nightly report", run_id="run")
+                assert [event.kind for event in await log.events("run")] == ["run_started"]
+
+                resumed = await _orchestrator(log, [CODE], router_script=['{"route": "coding", "confidence": 0.9}'])
+                second = await resumed.route_task("Handle the nightly report", run_id="run")
+                return first, second, await log.events("run")
+            finally:
+                await log.close()
+
+        first, second, events = asyncio.run(scenario())
+        assert first == "Unknown task type. Could not route."
+        assert second == "No executor available to execute the code."
+        assert events[-1].kind == "run_finished" and events[-1].output == second
+
+
+def test_replay_needs_every_step_and_puts_code_back_into_the_refiner():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            log = JsonlRunLog(os.path.join(directory, "runs.jsonl"))
+            try:
+                await (await _orchestrator(log, [CODE])).route_task(TASK, run_id="run")
+                with pytest.raises(ReplayError):
+                    await (await _orchestrator(log, replay=True)).route_task(TASK, run_id="other")
+
+                # The run is finished, but a replay still walks through its steps
+                refiner = CodeRefiner(min_lines=10)
+                orchestrator = await _orchestrator(log, replay=True, refiner=refiner)
+                result = await orchestrator.route_task(TASK, run_id="run")
+                developer = orchestrator.developer.adapter
+                return (result, orchestrator.last_run.stats, refiner.current(developer.memory),
+                        getattr(developer, "requests", []), await log.events("run"))
+            finally:
+                await log.close()
+
+        result, stats, artifact, requests, events = asyncio.run(scenario())
+        assert result == "No executor available to execute the code."
+        assert (stats.replayed_steps, stats.recorded_steps, stats.same_result) == (3, 0, True)
+        assert artifact is not None and artifact.code == PROGRAM
+        assert requests == []
+        assert [event.kind for event in events].count("run_finished") == 1
+
+
+def test_concurrent_runs_on_one_orchestrator_are_recorded_apart():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            log = JsonlRunLog(os.path.join(directory, "runs.jsonl"))
+            try:
+                orchestrator = await _orchestrator(log, [CODE, CODE])
+                await asyncio.gather(orchestrator.route_task(TASK, run_id="a"), orchestrator.route_task(TASK, run_id="b"))
+                return [[event.kind for event in await log.events(run_id)] for run_id in ("a", "b")]
+            finally:
+                await log.close()
+
+        for kinds in asyncio.run(scenario()):
+            assert kinds == ["run_started", "step", "step", "step", "run_finished"]
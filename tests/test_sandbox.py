@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.agents.sk_agent import SKAgent
+from core.executor.sandbox import SandboxExecutor, SandboxLimits
+from core.orchestrator.orchestrator import Orchestrator
+from tests.fakes import scripted
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    executor = SandboxExecutor(workers=2).start()
+    yield executor
+    executor.shutdown()
+
+
+def test_code_and_tests_run_together(sandbox):
+    code = "def add(a, b):\n    return a + b\nprint('loaded')\n"
+    tests = "from solution import add\nassert add(2, 3) == 5\n"
+    passed, failed = asyncio.run(sandbox.run_many([(code, tests), (code, "from solution import add\nassert add(2, 3) == 6\n")]))
+    assert (passed.status, passed.returncode, passed.tests_run) == ("passed", 0, True)
+    assert passed.stdout.startswith("loaded\n")
+    assert failed.status == "failed" and "AssertionError" in failed.stderr
+    assert "Code and tests failed" in failed.summary()
+
+
+def test_runaway_code_is_stopped(sandbox):
+    result = asyncio.run(sandbox.run("while True:\n    pass\n", limits=SandboxLimits(timeout=0.5, cpu_seconds=5)))
+    assert result.status == "timeout" and result.returncode is None
+
+
+def test_execution_tasks_run_in_the_sandbox(sandbox):
+    async def scenario():
+        agents = [SKAgent(await scripted(name=name)) for name in ("Router", "Developer", "Verifier")]
+        orchestrator = Orchestrator(*agents, sandbox=sandbox)
+        return [await orchestrator.route_task(f"Run this:\n```python\n{code}\n```") for code in ("x = 1", "raise SystemExit(3)")]
+
+    ok, failed = asyncio.run(scenario())
+    assert ok == "Code executed successfully."
+    assert failed.startswith("Code execution failed: Execution result: Code failed (exit code 3")
+
+
+
+def test_the_first_run_starts_the_workers_off_the_event_loop(monkeypatch):
+    executor = SandboxExecutor(workers=1)
+    started_on = []
+    start = executor.start
+
+    def recording_start():
+        started_on.append(threading.current_thread())
+        return start()
+
+    monkeypatch.setattr(executor, "start", recording_start)
+
+    async def scenario():
+        return await asyncio.gather(executor.run("x = 1"), executor.run("y = 2"))
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert [result.status for result in results] == ["passed", "passed"]
+    assert started_on and threading.main_thread() not in started_on
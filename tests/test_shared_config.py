@@ -0,0 +1,45 @@
+import asyncio
+import gc
+
+import pytest
+
+from core.adapters import llm_adapter
+from tests.fakes import scripted
+
+
+def test_agents_with_the_same_settings_share_one_frozen_config():
+    async def scenario():
+        return await asyncio.gather(*(scripted(name=f"Agent{i}", temperature=0.2) for i in range(3)),
+                                    scripted(temperature=0.2, api_key="other-key"))
+
+    first, second, third, other_key = asyncio.run(scenario())
+    assert first.llm_config is second.llm_config is third.llm_config
+    assert first.llm_kwargs is second.llm_kwargs
+    assert other_key.llm_config is not first.llm_config
+    assert other_key.llm_config["api_key"] == "other-key"
+    with pytest.raises(TypeError):
+        first.llm_config["temperature"] = 1.0
+
+
+def test_shared_configs_are_bounded_and_keep_credentials_out_of_keys():
+    async def scenario():
+        return await scripted(api_key="sk-secret-value", temperature=0.123)
+
+    adapter = asyncio.run(scenario())
+    keys = [key for key in llm_adapter._SHARED_CONFIGS.keys() if key[0] is type(adapter)]
+    assert keys
+    assert all("sk-secret-value" not in map(str, (value for _, value in settings)) for _, settings in keys)
+
+    key = next(key for key, config in llm_adapter._SHARED_CONFIGS.items() if config is adapter._config)
+    del adapter
+    gc.collect()
+    assert key not in llm_adapter._SHARED_CONFIGS
+
+
+def test_unhashable_settings_are_built_per_agent():
+    async def scenario():
+        return await scripted(stop=["\n"]), await scripted(stop=["\n"])
+
+    first, second = asyncio.run(scenario())
+    assert first.llm_config is not second.llm_config
+    assert first.llm_kwargs["stop"] == ["\n"]
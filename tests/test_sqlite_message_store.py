@@ -0,0 +1,117 @@
+import asyncio
+import gc
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from core.config.roles import MessageRole
+from core.memory.persistent_memory_adapter import PersistentMemoryAdapter
+from core.memory.sqlite_message_store import SQLiteMessageStore
+from tests.fakes import scripted
+
+
+def test_history_survives_a_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.db")
+
+        async def write():
+            store = SQLiteMessageStore(path)
+            memory = PersistentMemoryAdapter(store, "agent-1")
+            await memory.add_message(MessageRole.SYSTEM, "You are a test.")
+            for turn in range(5):
+                await memory.add_message(MessageRole.USER, f"question {turn}")
+                await memory.add_message(MessageRole.ASSISTANT, f"answer {turn}")
+            await PersistentMemoryAdapter(store, "agent-2").add_message(MessageRole.USER, "other")
+            await store.close()
+
+        async def read():
+            store = SQLiteMessageStore(path)
+            memory = PersistentMemoryAdapter(store, "agent-1")
+            history = await memory.get_history(limit=3)
+            await memory.clear_history()
+            cleared = await memory.get_history()
+            other = await PersistentMemoryAdapter(store, "agent-2").get_history()
+            await store.close()
+            return history, cleared, other
+
+        asyncio.run(write())
+        history, cleared, other = asyncio.run(read())
+        assert [message["content"] for message in history] == ["You are a test.", "answer 3", "question 4", "answer 4"]
+        assert cleared == []
+        assert [message["content"] for message in other] == ["other"]
+
+
+def test_restarted_agents_keep_one_pinned_system_prompt():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.db")
+
+        async def restart(turn: int):
+            store = SQLiteMessageStore(path)
+            try:
+                adapter = await scripted(name="Developer", memory=PersistentMemoryAdapter(store, "developer"))
+                await adapter.generate_response(f"task {turn}")
+                return await adapter.memory.get_history(limit=100), await adapter.memory.get_history(limit=2)
+            finally:
+                await store.close()
+
+        for turn in range(3):
+            history, recent = asyncio.run(restart(turn))
+        assert [message["role"] for message in history] == ["system"] + ["user", "assistant"] * 3
+        assert [message["content"] for message in recent] == ["You are Developer.", "task 2", "echo: task 2"]
+
+
+def test_reads_see_buffered_appends():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            store = SQLiteMessageStore(os.path.join(directory, "memory.db"), flush_interval=60)
+            await store.append("c", "user", "hello")
+            history = await store.fetch_last("c", 10)
+            await store.close()
+            return history
+
+        assert asyncio.run(scenario()) == [{"role": "user", "content": "hello"}]
+
+
+def test_close_closes_every_connection():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            store = SQLiteMessageStore(os.path.join(directory, "memory.db"))
+            await store.append("c", "user", "hello")
+            await asyncio.gather(*(store.fetch_last("c", 10) for _ in range(8)))
+            connections = list(store._connections)
+            await store.close()
+            return connections, store._connections
+
+        connections, remaining = asyncio.run(scenario())
+        assert len(connections) >= 2  # writer and at least one reader
+        assert remaining == []
+        for db in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                db.execute("SELECT 1")
+
+
+def test_failed_batches_reach_waiters_without_unretrieved_warnings():
+    with tempfile.TemporaryDirectory() as directory:
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            unhandled = []
+            loop.set_exception_handler(lambda _, context: unhandled.append(context))
+            store = SQLiteMessageStore(os.path.join(directory, "memory.db"))
+
+            def broken(rows):
+                raise sqlite3.OperationalError("disk I/O error")
+
+            store._write = broken
+            # Nobody waits on this batch
+            await store.append("a", "user", "lost")
+            await asyncio.sleep(0.05)
+            await store.append("b", "user", "lost too")
+            with pytest.raises(sqlite3.OperationalError):
+                await store.fetch_last("b", 10)
+            gc.collect()
+            await asyncio.sleep(0)
+            return unhandled
+
+        assert asyncio.run(scenario()) == []
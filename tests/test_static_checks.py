@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from core.agents.sk_agent import SKAgent
+from core.executor.static_checker import StaticChecker, check_source
+from core.orchestrator.orchestrator import Orchestrator
+from core.orchestrator.review import is_approved
+from tests.fakes import scripted
+
+GOOD = "```python\ndef add(a, b):\n    return a + b\n```"
+BROKEN = "```python\ndef add(a, b)\n    return a + b\n```"
+
+
+@pytest.mark.parametrize("review", [
+    "APPROVED", "APPROVED.", "**Approved** - looks good", "Verdict: APPROVED", "**Verdict:**\nAPPROVED",
+    "The code is correct and handles edge cases.\nAPPROVED", "No issues found. APPROVED",
+    "Looks good, no problems. APPROVED", "No issues found, approved.", "If you ask me: APPROVED",
+])
+def test_approvals(review):
+    assert is_approved(review)
+
+
+@pytest.mark.parametrize("review", [
+    "This cannot be approved: it crashes on empty input. REJECTED", "Not yet approved.",
+    "Would be approved if fixed; REJECTED", "Would be approved if the tests passed.", "NOT APPROVED",
+    "Approved once the bug is fixed", "Not **approved**", "It would not be approved.", "Verdict: REJECTED\nIt could have been approved with tests.",
+    "REJECTED - Static checks failed", "Looks fine to me", "", None,
+])
+def test_rejections(review):
+    assert not is_approved(review)
+
+
+def test_check_source_findings():
+    assert check_source("def add(a, b):\n    return a + b\n").passed
+    assert [issue.check for issue in check_source("Error: Request timed out.").errors] == ["not-code"]
+    assert [issue.check for issue in check_source("def add(a, b)\n    pass").errors] == ["syntax"]
+    assert [issue.check for issue in check_source("x = '\\0' \0").errors] == ["syntax"]
+    aliased = check_source("import subprocess as sp\nsp.run(['ls'])\n")
+    assert [issue.check for issue in aliased.errors] == ["forbidden-call"]
+    imported = check_source("import jwt\n", forbidden_imports={"jwt"}, check_imports=False)
+    assert [issue.check for issue in imported.errors] == ["forbidden-import"]
+    # Assignments to a name that merely starts like an error report are code
+    assert check_source("error = 1\n").passed
+
+
+async def _orchestrator(developer_replies, verifier_replies=()) -> Orchestrator:
+    router, executor = SKAgent(await scripted(name="Router")), SKAgent(await scripted(name="Executor"))
+    developer = SKAgent(await scripted(*developer_replies, name="Developer"))
+    verifier = SKAgent(await scripted(*verifier_replies, name="Verifier"))
+    return Orchestrator(router, developer, verifier, executor, static_checker=StaticChecker(check_imports=False),
+                        fix_attempts=1)
+
+
+def _requests(agent: SKAgent) -> int:
+    return len(getattr(agent.adapter, "requests", []))
+
+
+def test_drafts_fixed_after_feedback_still_reach_the_verifier_and_save_nothing():
+    async def scenario():
+        orchestrator = await _orchestrator([BROKEN, GOOD], ["APPROVED"])
+        result = await orchestrator.route_task("Implement a function that adds two numbers")
+        return result, orchestrator
+
+    result, orchestrator = asyncio.run(scenario())
+    stats = orchestrator.verification_stats
+    assert result == "Code executed and saved successfully."
+    assert _requests(orchestrator.verifier) == 1
+    assert (stats.static_failures, stats.llm_calls_saved) == (1, 0)
+
+
+def test_drafts_rejected_by_the_checks_alone_count_as_saved_calls():
+    async def scenario():
+        orchestrator = await _orchestrator([BROKEN, BROKEN])
+        result = await orchestrator.route_task("Implement a function that adds two numbers")
+        return result, orchestrator
+
+    result, orchestrator = asyncio.run(scenario())
+    stats = orchestrator.verification_stats
+    assert result.startswith("Code rejected: REJECTED - Static checks failed")
+    assert _requests(orchestrator.verifier) == 0
+    assert (stats.static_failures, stats.llm_calls_saved) == (2, 1)
+
+
+def test_savings_are_counted_per_task():
+    async def scenario():
+        orchestrator = await _orchestrator([])
+        orchestrator.candidates = 2
+        reported = []
+        orchestrator._report_savings = lambda task_stats: reported.append(task_stats.llm_calls_saved)
+        developer_replies = {"Implement a function that adds two numbers": [BROKEN] * 4,
+                             "Implement a function that multiplies numbers": [GOOD] * 4}
+
+        async def task(text: str):
+            forked = await orchestrator.fork()
+            forked._report_savings = orchestrator._report_savings
+            forked.developer.adapter.script = developer_replies[text]
+            forked.verifier.adapter.script = ["APPROVED"] * 2
+            return await forked.route_task(text)
+
+        await asyncio.gather(*(task(text) for text in developer_replies))
+        return sorted(reported), orchestrator.verification_stats
+
+    reported, stats = asyncio.run(scenario())
+    # Both candidates of the broken task were rejected statically; the other task saved nothing
+    assert reported == [0, 2]
+    assert stats.llm_calls_saved == 2
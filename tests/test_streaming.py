@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.adapters.deep_seek_adapter import DeepSeekAdapter
+from core.adapters.http_client import close_async_clients
+from core.adapters.llm_adapter import LLMAdapter
+from core.errors.llm_error import LLMRequestError
+from tests.fakes import ScriptedAdapter, failure, scripted
+
+
+async def _collect(stream):
+    return [delta async for delta in stream]
+
+
+async def _history(adapter):
+    return [(message["role"], message["content"]) for message in await adapter.memory.get_history()]
+
+
+def test_stream_commits_the_assembled_reply():
+    async def scenario():
+        adapter = await scripted(["print(", "'hi'", ")"])
+        return await _collect(adapter.stream_response("say hi")), await _history(adapter)
+
+    deltas, history = asyncio.run(scenario())
+    assert deltas == ["print(", "'hi'", ")"]
+    assert history[-2:] == [("user", "say hi"), ("assistant", "print('hi')")]
+
+
+def test_failed_stream_raises_and_commits_nothing():
+    async def scenario():
+        adapter = await scripted(["partial ", failure()], raise_errors=True)
+        seen = []
+        with pytest.raises(LLMRequestError):
+            async for delta in adapter.stream_response("task"):
+                seen.append(delta)
+        return seen, await _history(adapter)
+
+    seen, history = asyncio.run(scenario())
+    assert seen == ["partial "]
+    assert all(role != "assistant" for role, _ in history)
+
+
+def test_failed_stream_yields_an_error_but_keeps_it_out_of_memory():
+    async def scenario():
+        adapter = await scripted(["partial ", failure()])
+        return await _collect(adapter.stream_response("task")), await _history(adapter)
+
+    deltas, history = asyncio.run(scenario())
+    assert deltas[-1].startswith("Error: scripted failure")
+    assert all(role != "assistant" for role, _ in history)
+
+
+def test_stream_stopped_by_the_consumer_commits_what_was_received():
+    async def scenario():
+        adapter = await scripted(["one ", "two ", "three"])
+        stream = adapter.stream_response("count")
+        assert await stream.__anext__() == "one "
+        await stream.aclose()
+        return await _history(adapter)
+
+    assert asyncio.run(scenario())[-1] == ("assistant", "one ")
+
+
+def test_deepseek_stream_failures_raise():
+    async def scenario():
+        server = MockLLMServer(latency=0, error_rate=1.0, error_status=503)
+        await server.start()
+        try:
+            adapter = await DeepSeekAdapter.create(name="Test", system_message="You are a test.", api_key="key",
+                                                   base_url=server.chat_url)
+            with pytest.raises(LLMRequestError) as error:
+                await _collect(adapter.model_stream([{"role": "user", "content": "hi"}]))
+        finally:
+            await close_async_clients()
+            await server.stop()
+        return error.value
+
+    assert asyncio.run(scenario()).status_code == 503
+
+
+def test_failed_request_commits_nothing_either():
+    async def scenario():
+        adapter = await scripted(failure(retryable=False), "fine", max_retries=0)
+        first = await adapter.generate_response("task")
+        second = await adapter.generate_response("again")
+        return first, second, await _history(adapter)
+
+    first, second, history = asyncio.run(scenario())
+    assert first.startswith("Error: scripted failure")
+    assert second == "fine"
+    assert history[1:] == [("user", "task"), ("user", "again"), ("assistant", "fine")]
+
+
+class _Unstreamed(ScriptedAdapter):
+    model_stream = LLMAdapter.model_stream
+
+
+def test_a_streamed_call_takes_one_rate_limit_slot():
+    async def scenario():
+        adapter = await _Unstreamed.create(name="Plain", system_message="You are plain.", model="gpt-4",
+                                           api_key="test-key")
+        slots = []
+
+        async def acquire(messages_to_send):
+            slots.append(len(messages_to_send))
+
+        adapter._acquire_rate_limit = acquire
+        return await _collect(adapter.stream_response("hi")), slots
+
+    deltas, slots = asyncio.run(scenario())
+    assert deltas == ["echo: hi"]
+    assert slots == [2]
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from core import telemetry
+from core.agents.sk_agent import SKAgent
+from core.orchestrator.orchestrator import Orchestrator
+from core.telemetry.tracer import NOOP_SPAN
+from tests.fakes import scripted
+
+
+@pytest.fixture
+def exporter():
+    previous = telemetry.get_tracer()
+    exporter = telemetry.InMemoryExporter()
+    telemetry.configure([exporter])
+    yield exporter
+    telemetry.set_tracer(previous)
+
+
+def test_spans_nest_and_carry_usage_and_errors(exporter):
+    with telemetry.collect_usage() as usage:
+        with telemetry.span("outer", task="t") as outer:
+            with telemetry.span("inner") as inner:
+                telemetry.record_usage("gpt-4", 10, 5)
+            with pytest.raises(ValueError):
+                with telemetry.span("failing"):
+                    raise ValueError("boom")
+    assert inner.parent is outer and outer.parent is None
+    assert (inner.attributes["prompt_tokens"], inner.attributes["completion_tokens"]) == (10, 5)
+    assert exporter.spans[1].attributes["error"] == "ValueError"
+    assert [span.name for span in exporter.spans] == ["inner", "failing", "outer"]
+    assert usage == {"model": "gpt-4", "prompt_tokens": 10, "completion_tokens": 5}
+    assert dict(exporter.tokens) == {"prompt": 10, "completion": 5}
+
+
+def test_disabled_tracing_hands_out_the_shared_noop_span():
+    tracer = telemetry.Tracer(enabled=False)
+    assert tracer.span("anything") is NOOP_SPAN and tracer.start_span("ttft") is NOOP_SPAN
+    with telemetry.collect_usage() as usage:
+        telemetry.record_usage("gpt-4", 3, 4)
+    assert usage["prompt_tokens"] == 3
+
+
+def test_an_orchestrated_task_is_traced_end_to_end(exporter):
+    async def scenario():
+        agents = [SKAgent(await scripted(*replies, name=name))
+                  for name, replies in (("Router", ()), ("Developer", ("x = 1",)), ("Verifier", ("Verdict: APPROVED",)))]
+        return await Orchestrator(*agents).route_task("Implement a function that parses dates")
+
+    assert asyncio.run(scenario()) == "No executor available to execute the code."
+    counts = exporter.phase_counts
+    assert counts["orchestrator.task"] == counts["orchestrator.route"] == 1
+    assert counts["orchestrator.develop"] == counts["orchestrator.verify"] == 1
+    assert counts["llm.generate"] == 2 and counts["memory.read"] == 2
+    task = next(span for span in exporter.spans if span.name == "orchestrator.task")
+    route = next(span for span in exporter.spans if span.name == "orchestrator.route")
+    assert route.parent is task and route.attributes["route"] == "coding"
@@ -0,0 +1,41 @@
+import asyncio
+
+from core.config.roles import MessageRole
+from core.memory.token_window_adapter import TokenWindowMemoryAdapter
+
+
+def words(text: str) -> int:
+    return len(text.split())
+
+
+async def _contents(memory):
+    return [message["content"] for message in await memory.get_history()]
+
+
+def test_oldest_messages_are_evicted_and_the_system_message_is_pinned():
+    async def scenario():
+        # Each message costs its words plus 4 tokens of overhead
+        memory = TokenWindowMemoryAdapter(max_tokens=20, counter=words)
+        await memory.add_message(MessageRole.SYSTEM, "You are terse.")
+        for content in ("one two", "three four", "five six"):
+            await memory.add_message(MessageRole.USER, content)
+        return memory.total_tokens, await _contents(memory), [m["content"] for m in await memory.get_history(limit=1)]
+
+    total, history, last = asyncio.run(scenario())
+    assert total == 19
+    assert history == ["You are terse.", "three four", "five six"]
+    assert last == ["You are terse.", "five six"]
+
+
+def test_the_newest_message_is_kept_even_over_budget():
+    async def scenario():
+        memory = TokenWindowMemoryAdapter(max_tokens=10, counter=words)
+        await memory.add_message(MessageRole.USER, "short")
+        await memory.add_message(MessageRole.ASSISTANT, "a reply far longer than the whole budget allows")
+        contents = await _contents(memory)
+        await memory.clear_history()
+        return contents, memory.total_tokens, await _contents(memory)
+
+    contents, total, cleared = asyncio.run(scenario())
+    assert contents == ["a reply far longer than the whole budget allows"]
+    assert (total, cleared) == (0, [])